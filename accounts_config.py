@@ -62,3 +62,36 @@ def get_all_accounts():
         list: Список словників з конфігураціями акаунтів
     """
     return AVAILABLE_ACCOUNTS
+
+# Функція для отримання шляху до збереженої HTML сторінки акаунту
+def get_page_file(username, page_type):
+    """
+    Повертає ім'я файлу для збереженої HTML сторінки акаунту
+    
+    Окремі файли для кожного акаунту дозволяють скрапити кілька акаунтів одночасно.
+    Для акаунту за замовчуванням зберігаються старі імена файлів.
+    
+    Args:
+        username (str): Ім'я користувача в Instagram
+        page_type (str): Тип сторінки (posts, reels)
+        
+    Returns:
+        str: Ім'я HTML файлу
+    """
+    if username == "default":
+        return f"instagram_{page_type}.html"
+    return f"instagram_{page_type}_{username}.html"
+
+# Функція для отримання шляху до файлу з перехопленими JSON відповідями
+def get_capture_file(username, page_type):
+    """
+    Повертає ім'я файлу з JSON відповідями Instagram, перехопленими під час скрапінгу сторінки
+    
+    Args:
+        username (str): Ім'я користувача в Instagram
+        page_type (str): Тип сторінки (posts, reels)
+        
+    Returns:
+        str: Ім'я JSON файлу
+    """
+    return get_page_file(username, page_type)[:-len(".html")] + ".json"
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Колонковий експорт та аналітика постів на pandas
+
+Таблиця posts акаунту (або всіх акаунтів, account="all") завантажується в
+DataFrame з типізованими стовпцями (категорії для post_type та account, дати,
+булеві значення) і може бути збережена у Parquet або Feather для аналітиків
+замість повторного розбору CSV.
+Агрегати (пости за день/тиждень, частка reels, розподіл довжини описів)
+рахуються векторно засобами pandas.
+
+Для Parquet та Feather потрібен pyarrow.
+
+Приклад використання:
+```python
+from analytics import load_posts_frame, compute_analytics, write_columnar
+
+df = load_posts_frame("dliavsikhta")
+print(compute_analytics(df, freq="W"))
+write_columnar(df, "dliavsikhta.parquet")
+```
+
+```bash
+python analytics.py --account dliavsikhta --output dliavsikhta.parquet
+```
+"""
+
+import io
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from export_stream import iter_rows
+from log_config import setup_logging
+
+logger = logging.getLogger("Analytics")
+
+# Підтримувані колонкові формати: формат -> (MIME тип, розширення файлу)
+COLUMNAR_FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "feather": ("application/vnd.apache.arrow.file", "feather"),
+}
+
+# Частоти агрегації постів за часом
+ANALYTICS_FREQUENCIES = {"D": "D", "W": "W-MON", "M": "MS"}
+
+# Межі інтервалів довжини опису (символів) для гістограми
+CAPTION_LENGTH_BINS = [0, 1, 50, 100, 200, 500, 1000, 2200, np.inf]
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def load_posts_frame(account_username="default", post_type=None):
+    """Завантажує пости акаунту в DataFrame з типізованими стовпцями
+
+    Рядки читаються тим самим кодом, що й потоковий експорт, тому для "all"
+    пости беруться з баз усіх акаунтів (federated).
+
+    Args:
+        account_username (str, optional): Ім'я акаунту Instagram або "all". Defaults to "default".
+        post_type (str, optional): Тип постів (post, reel). Defaults to None (усі).
+
+    Returns:
+        pandas.DataFrame: Пости з додатковими стовпцями published_at та caption_length
+    """
+    rows = iter_rows(account_username, post_type)
+    columns = next(rows)
+    df = pd.DataFrame.from_records(list(rows), columns=columns)
+
+    df = df.astype({
+        "id": "int64",
+        "post_type": pd.CategoricalDtype(["post", "reel"]),
+        "account": "category",
+        "media_url": "string",
+        "description": "string",
+        "username": "string",
+        "local_path": "string",
+        "media_key": "string",
+    })
+    df["is_video"] = df["is_video"].fillna(0).astype(bool)
+    df["parsed_date"] = pd.to_datetime(df["parsed_date"], format=DATE_FORMAT, errors="coerce")
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format=DATE_FORMAT, errors="coerce")
+    # Час публікації відомий лише для постів з JSON відповідей, інакше беремо час парсингу
+    df["published_at"] = df["timestamp"].fillna(df["parsed_date"])
+    df["caption_length"] = df["description"].fillna("").str.len().astype("int32")
+    return df
+
+
+def write_columnar(df, target, fmt="parquet"):
+    """Зберігає DataFrame у колонковому форматі
+
+    Args:
+        df (pandas.DataFrame): Пости з load_posts_frame
+        target (str | file): Шлях або бінарний файловий об'єкт
+        fmt (str, optional): parquet або feather. Defaults to "parquet".
+    """
+    if fmt == "parquet":
+        df.to_parquet(target, index=False, compression="zstd")
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(target, compression="zstd")
+    else:
+        raise ValueError(f"Непідтримуваний колонковий формат: {fmt}")
+
+
+def export_columnar(account_username="default", fmt="parquet", post_type=None):
+    """Повертає пости акаунту як вміст файлу Parquet або Feather
+
+    Args:
+        account_username (str, optional): Ім'я акаунту Instagram або "all". Defaults to "default".
+        fmt (str, optional): parquet або feather. Defaults to "parquet".
+        post_type (str, optional): Тип постів (post, reel). Defaults to None (усі).
+
+    Returns:
+        bytes: Вміст файлу
+    """
+    buffer = io.BytesIO()
+    write_columnar(load_posts_frame(account_username, post_type), buffer, fmt)
+    return buffer.getvalue()
+
+
+def compute_analytics(df, freq="D"):
+    """Рахує агрегати по постах векторно
+
+    Args:
+        df (pandas.DataFrame): Пости з load_posts_frame
+        freq (str, optional): Період агрегації: D (день), W (тиждень), M (місяць). Defaults to "D".
+
+    Returns:
+        dict: Кількість постів за періодами, частка reels та розподіл довжини описів
+    """
+    rule = ANALYTICS_FREQUENCIES.get(freq, "D")
+    total = len(df)
+
+    # Кількість постів та reels за періодами
+    per_period = (
+        df.set_index("published_at")
+          .groupby([pd.Grouper(freq=rule), "post_type"], observed=False)
+          .size()
+          .unstack("post_type", fill_value=0)
+          .reindex(columns=["post", "reel"], fill_value=0)
+    )
+    per_period["total"] = per_period["post"] + per_period["reel"]
+    per_period["reel_ratio"] = (per_period["reel"] / per_period["total"].where(per_period["total"] > 0)).round(4)
+    per_period.index = per_period.index.strftime("%Y-%m-%d")
+
+    lengths = df["caption_length"]
+    histogram = pd.cut(lengths, bins=CAPTION_LENGTH_BINS, right=False).value_counts(sort=False)
+    by_type = df.groupby("post_type", observed=False)["caption_length"].agg(["count", "mean", "median"])
+
+    reels = int((df["post_type"] == "reel").sum())
+    return {
+        "total_posts": total,
+        "reels": reels,
+        "reel_ratio": round(reels / total, 4) if total else 0.0,
+        "videos": int(df["is_video"].sum()),
+        "first_published": df["published_at"].min().strftime(DATE_FORMAT) if total else None,
+        "last_published": df["published_at"].max().strftime(DATE_FORMAT) if total else None,
+        "frequency": freq if freq in ANALYTICS_FREQUENCIES else "D",
+        "per_period": [
+            {"period": period, "post": int(post), "reel": int(reel), "total": int(count),
+             "reel_ratio": None if pd.isna(ratio) else float(ratio)}
+            for period, post, reel, count, ratio in zip(per_period.index, per_period["post"], per_period["reel"],
+                                                        per_period["total"], per_period["reel_ratio"])
+        ],
+        "caption_length": {
+            "mean": round(float(lengths.mean()), 1) if total else 0.0,
+            "median": float(lengths.median()) if total else 0.0,
+            "p90": float(lengths.quantile(0.9)) if total else 0.0,
+            "max": int(lengths.max()) if total else 0,
+            "empty": int((lengths == 0).sum()),
+            "histogram": [
+                {"from": int(interval.left), "to": None if np.isinf(interval.right) else int(interval.right), "count": int(count)}
+                for interval, count in histogram.items()
+            ],
+            "by_type": {
+                post_type: {"count": int(row["count"]),
+                            "mean": round(float(row["mean"]), 1) if row["count"] else 0.0,
+                            "median": float(row["median"]) if row["count"] else 0.0}
+                for post_type, row in by_type.iterrows()
+            },
+        },
+    }
+
+
+def get_account_analytics(account_username="default", freq="D", post_type=None):
+    """Завантажує пости акаунту та рахує по них аналітику
+
+    Args:
+        account_username (str, optional): Ім'я акаунту Instagram або "all". Defaults to "default".
+        freq (str, optional): Період агрегації (D, W, M). Defaults to "D".
+        post_type (str, optional): Тип постів (post, reel). Defaults to None (усі).
+
+    Returns:
+        dict: Результат compute_analytics з іменем акаунту
+    """
+    result = compute_analytics(load_posts_frame(account_username, post_type), freq)
+    result["account"] = account_username
+    return result
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description="Колонковий експорт та аналітика постів")
+    args_parser.add_argument("--account", default="default", help="Ім'я акаунту")
+    args_parser.add_argument("--type", choices=["post", "reel"], help="Тип постів")
+    args_parser.add_argument("--output", help="Файл .parquet або .feather для експорту")
+    args_parser.add_argument("--freq", default="W", choices=list(ANALYTICS_FREQUENCIES), help="Період агрегації")
+    args = args_parser.parse_args()
+
+    df = load_posts_frame(args.account, args.type)
+    if args.output:
+        fmt = "feather" if args.output.endswith(".feather") else "parquet"
+        write_columnar(df, args.output, fmt)
+        logger.info(f"Збережено {len(df)} постів у {args.output}")
+
+    result = compute_analytics(df, args.freq)
+    logger.info(f"Постів: {result['total_posts']}, reels: {result['reels']} ({result['reel_ratio']:.1%})")
+    for row in result["per_period"]:
+        logger.info(f"{row['period']}: {row['total']} (reels: {row['reel']})")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    main()
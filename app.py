@@ -7,20 +7,30 @@
 
 import os
 import time
+import atexit
 import sqlite3
-import threading
 import logging
 from datetime import datetime
-from pathlib import Path
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_from_directory
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 
 # Імпортуємо функції з наших модулів
-from selen import get_page_with_pagination
-from parser import main_parser, init_db
-from accounts_config import get_account_config, get_all_accounts
+from accounts_config import get_all_accounts
 from url_manager import get_urls, set_urls
+from db_pool import db_connection, init_pools, close_pools
+from post_stats import get_account_stats
+from export_stream import EXPORT_FORMATS, stream_export, export_filename
+from federated import ALL_ACCOUNTS, federated_stats, federated_search
+from post_search import search_posts
+from thumbnails import get_thumbnails
+from log_stream import install as install_log_stream, iter_sse, recent_logs
+from log_config import LOG_FILE, setup_logging, read_logs
+from run_metrics import prometheus_text, list_runs
+from job_queue import (JOB_HANDLERS, ACTIVE_STATES, QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED,
+                       JOB_UNCLAIMED_WARNING, init_queue, enqueue, get_job, list_jobs, find_active_job,
+                       find_unclaimed_jobs, cancel_job, start_workers, stop_workers, worker_log_pattern,
+                       worker_log_files)
 
 # Завантажуємо змінні оточення
 load_dotenv()
@@ -42,22 +52,19 @@ def display_account(account):
     else:
         return str(account)
 
+# Шаблонний фільтр для мініатюр зображення: список пар (ширина, шлях)
+@app.template_filter('thumbnails')
+def thumbnails_filter(local_path):
+    """Повертає наявні мініатюри WebP локального зображення"""
+    return get_thumbnails(local_path)
+
 # Створюємо директорію для завантажень, якщо вона не існує
 os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
-# Налаштування логування
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("flask_app.log", encoding="utf-8")
-    ]
-)
 logger = logging.getLogger("FlaskApp")
 
-# Глобальні змінні для відстеження стану
-scraping_status = {
+# Стан скрапінгу, коли жодного завдання ще не запускали
+IDLE_STATUS = {
     "is_running": False,
     "start_time": None,
     "end_time": None,
@@ -67,55 +74,25 @@ scraping_status = {
     "duplicates_skipped": 0
 }
 
-def get_db_connection(account_username="default"):
-    """Створює з'єднання з базою даних
-    Якщо база даних не існує, вона буде створена автоматично.
+# Межі кількості записів на сторінці постів та пошуку (per_page)
+MAX_PER_PAGE = 100
+
+# Стани завдань черги -> стани скрапінгу, які показує головна сторінка
+JOB_STATUS_MAP = {
+    QUEUED: "running",
+    RUNNING: "running",
+    COMPLETED: "completed",
+    FAILED: "error",
+    CANCELLED: "cancelled",
+}
+
+def is_known_account(account, allow_all=True):
+    """Перевіряє, що акаунт є в конфігурації (або це "all" - усі акаунти)
     
-    Args:
-        account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
-        
-    Returns:
-        sqlite3.Connection: З'єднання з базою даних
+    Невідомий акаунт не можна передавати далі: get_account_config мовчки
+    підставляє базу акаунту за замовчуванням.
     """
-    # Отримуємо конфігурацію акаунту
-    account_config = get_account_config(account_username)
-    database_name = account_config["database"]
-    
-    # Перевіряємо, чи існує директорія для зображень
-    images_folder = account_config["images_folder"]
-    img_dir = Path(f"static/img/{images_folder}")
-    img_dir.mkdir(parents=True, exist_ok=True)
-    logger.info(f"Перевірено директорію для зображень акаунту {account_username}: {img_dir}")
-    
-    # Створюємо з'єднання з базою даних
-    conn = sqlite3.connect(database_name)
-    conn.row_factory = sqlite3.Row
-    
-    # Перевіряємо, чи існує таблиця posts
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='posts'")
-    if not cursor.fetchone():
-        logger.info(f"Створюємо таблицю posts для акаунту {account_username} в базі {database_name}")
-        
-        # Створюємо таблицю для постів
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS posts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            post_type TEXT,
-            media_url TEXT,
-            description TEXT,
-            timestamp TEXT,
-            username TEXT,
-            is_video INTEGER,
-            parsed_date TEXT,
-            local_path TEXT,
-            account TEXT
-        )
-        ''')
-        conn.commit()
-        logger.info(f"Таблицю posts створено успішно в базі {database_name}")
-    
-    return conn
+    return (allow_all and account == ALL_ACCOUNTS) or account in [acc["username"] for acc in get_all_accounts()]
 
 def get_stats(account_username="default"):
     """Отримує статистику з бази даних
@@ -127,104 +104,82 @@ def get_stats(account_username="default"):
         dict: Статистика постів
     """
     try:
-        conn = get_db_connection(account_username)
-        cursor = conn.cursor()
-        
-        stats = {}
+        stats = get_account_stats(account_username)
         stats["account"] = account_username
         
-        # Перевіряємо, чи існує таблиця posts
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='posts'")
-        if not cursor.fetchone():
-            logger.warning(f"Таблиця posts не існує для акаунту {account_username}. База даних порожня.")
-            return {"account": account_username, "total_posts": 0, "regular_posts": 0, "reels": 0, "local_images": 0, "last_update": ""}
-        
-        # Загальна кількість постів для акаунту
-        cursor.execute("SELECT COUNT(*) FROM posts WHERE account = ?", (account_username,))
-        stats["total_posts"] = cursor.fetchone()[0]
-        
-        # Кількість звичайних постів для акаунту
-        cursor.execute("SELECT COUNT(*) FROM posts WHERE post_type = 'post' AND account = ?", (account_username,))
-        stats["regular_posts"] = cursor.fetchone()[0]
-        
-        # Кількість reels для акаунту
-        cursor.execute("SELECT COUNT(*) FROM posts WHERE post_type = 'reel' AND account = ?", (account_username,))
-        stats["reels"] = cursor.fetchone()[0]
-        
-        # Кількість локальних зображень для акаунту
-        cursor.execute("SELECT COUNT(*) FROM posts WHERE local_path IS NOT NULL AND local_path != '' AND account = ?", (account_username,))
-        stats["local_images"] = cursor.fetchone()[0]
-        
-        # Останнє оновлення для акаунту
-        cursor.execute("SELECT MAX(parsed_date) FROM posts WHERE account = ?", (account_username,))
-        last_update = cursor.fetchone()[0]
-        stats["last_update"] = last_update if last_update else ""
-        
         # Отримуємо список всіх доступних акаунтів
         stats["available_accounts"] = get_all_accounts()
         
-        conn.close()
         return stats
     except Exception as e:
         logger.error(f"Помилка при отриманні статистики для акаунту {account_username}: {str(e)}")
         return {"account": account_username, "total_posts": 0, "regular_posts": 0, "reels": 0, "local_images": 0, "last_update": "", "available_accounts": get_all_accounts()}
 
 
-def run_scraper(account_username="default"):
-    """Запускає процес скрапінгу в окремому потоці
+def get_scraping_status(account_username=None):
+    """Повертає стан останнього завдання скрапінгу з черги
     
     Args:
-        account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
+        account_username (str, optional): Ім'я акаунту. Defaults to None (будь-який акаунт).
+        
+    Returns:
+        dict: Стан у форматі головної сторінки та /status
     """
-    global scraping_status
+    jobs = list_jobs(kind="scrape", account_username=account_username, limit=1)
+    if not jobs:
+        return dict(IDLE_STATUS)
+    
+    job = jobs[0]
+    result = job["result"] or {}
+    return {
+        "job_id": job["id"],
+        "account": job["account"],
+        "is_running": job["state"] in ACTIVE_STATES,
+        "state": job["state"],
+        "status": JOB_STATUS_MAP[job["state"]],
+        "message": job["message"],
+        "progress": job["progress"],
+        "attempts": job["attempts"],
+        "start_time": job["started_at"],
+        "end_time": job["finished_at"],
+        "added_count": result.get("added_count", 0),
+        "duplicates_skipped": result.get("duplicates_skipped", 0)
+    }
+
+def get_accounts_status():
+    """Повертає стан останнього завдання скрапінгу кожного акаунту
     
-    try:
-        # Отримуємо конфігурацію акаунту
-        account_config = get_account_config(account_username)
-        database_name = account_config["database"]
-        
-        scraping_status["is_running"] = True
-        scraping_status["start_time"] = datetime.now()
-        scraping_status["status"] = "running"
-        scraping_status["message"] = f"Запуск скрапінгу для акаунту {account_username}..."
-        scraping_status["progress"] = 10
-        scraping_status["duplicates_skipped"] = 0
-        scraping_status["account"] = account_username
-        
-        # Запускаємо скрапінг
-        logger.info(f"Запуск скрапінгу Instagram для акаунту {account_username}...")
-        scraping_status["message"] = f"Скрапінг Instagram для акаунту {account_username}..."
-        scraping_status["progress"] = 30
-        get_page_with_pagination(account_username)
-        
-        # Запускаємо парсинг
-        logger.info(f"Запуск парсингу HTML для акаунту {account_username}...")
-        scraping_status["message"] = f"Парсинг HTML для акаунту {account_username}..."
-        scraping_status["progress"] = 60
-        
-        # Запускаємо парсер для конкретного акаунту
-        added_count, skipped_count = main_parser(account_username)
-        
-        # Оновлюємо статус з інформацією про дублікати
-        scraping_status["duplicates_skipped"] = skipped_count
-        scraping_status["added_count"] = added_count
-        logger.info(f"Додано {added_count} нових записів, пропущено {skipped_count} дублікатів контенту")
-        
-        # Завершуємо процес
-        scraping_status["status"] = "completed"
-        scraping_status["message"] = f"Скрапінг та парсинг для акаунту {account_username} успішно завершено. Додано: {added_count}, пропущено: {skipped_count} дублікатів."
-        scraping_status["progress"] = 100
-        scraping_status["end_time"] = datetime.now()
-        logger.info(f"Процес скрапінгу та парсингу для акаунту {account_username} завершено успішно")
-        
-    except Exception as e:
-        logger.error(f"Помилка при скрапінгу для акаунту {account_username}: {e}")
-        scraping_status["status"] = "error"
-        scraping_status["message"] = f"Помилка для акаунту {account_username}: {str(e)}"
-        scraping_status["progress"] = 0
+    Returns:
+        dict: is_running, стан кожного акаунту (accounts) та підсумок, коли всі завдання завершено
+    """
+    entries = {}
+    for account in get_all_accounts():
+        jobs = list_jobs(kind="scrape", account_username=account["username"], limit=1)
+        if not jobs:
+            continue
+        job = jobs[0]
+        result = job["result"] or {}
+        entries[account["username"]] = {
+            "job_id": job["id"],
+            "state": job["state"],
+            "status": JOB_STATUS_MAP[job["state"]],
+            "progress": job["progress"],
+            "message": job["message"],
+            "added_count": result.get("added_count", 0),
+            "duplicates_skipped": result.get("duplicates_skipped", 0),
+        }
     
-    finally:
-        scraping_status["is_running"] = False
+    is_running = any(entry["state"] in ACTIVE_STATES for entry in entries.values())
+    summary = {}
+    if entries and not is_running:
+        summary = {
+            "accounts": len(entries),
+            "completed": sum(1 for entry in entries.values() if entry["state"] == COMPLETED),
+            "failed": sum(1 for entry in entries.values() if entry["state"] == FAILED),
+            "added_count": sum(entry["added_count"] for entry in entries.values()),
+            "duplicates_skipped": sum(entry["duplicates_skipped"] for entry in entries.values()),
+        }
+    return {"is_running": is_running, "accounts": entries, "summary": summary}
 
 @app.route('/')
 def index():
@@ -238,111 +193,270 @@ def index():
     # Якщо URL немає, показуємо попередження
     show_warning = not url_dopys
     
-    return render_template('index.html', stats=stats, status=scraping_status, 
-                          url_dopys=url_dopys, url_reels=url_reels, show_warning=show_warning)
+    return render_template('index.html', stats=stats, status=get_scraping_status(), 
+                          url_dopys=url_dopys, url_reels=url_reels, show_warning=show_warning,
+                          accounts_status=get_accounts_status())
 
 @app.route('/start_scraping', methods=['POST'])
 def start_scraping():
-    """Запускає процес скрапінгу"""
-    global scraping_status
+    """Додає завдання скрапінгу до черги; його виконає процес-воркер"""
+    # Отримуємо акаунт та режим з форми
+    account = request.form.get('account', 'default')
+    incremental = request.form.get('incremental') == 'on'
     
-    if scraping_status["is_running"]:
-        flash("Процес скрапінгу вже запущено!", "warning")
+    if not is_known_account(account, allow_all=False):
+        flash(f"Невідомий акаунт: {account}", "danger")
         return redirect(url_for('index'))
     
-    # Отримуємо акаунт з форми
-    account = request.form.get('account', 'default')
-    
-    # Запускаємо скрапінг у окремому потоці
-    thread = threading.Thread(target=run_scraper, args=(account,))
-    thread.daemon = True
-    thread.start()
+    if find_active_job("scrape", account):
+        flash(f"Скрапінг для акаунту {account} вже в черзі або виконується!", "warning")
+        return redirect(url_for('index', account=account))
     
-    flash(f"Процес скрапінгу для акаунту {account} запущено!", "success")
+    job_id = enqueue("scrape", account, {"incremental": incremental})
+    flash(f"Скрапінг для акаунту {account} додано до черги (завдання {job_id})!", "success")
     return redirect(url_for('index', account=account))
 
+@app.route('/start_scraping_all', methods=['POST'])
+def start_scraping_all():
+    """Додає до черги завдання скрапінгу для кожного обраного акаунту
+    
+    Скільки акаунтів обробляється одночасно, визначає кількість воркерів черги (JOB_WORKERS).
+    """
+    accounts = request.form.getlist('accounts') or [account["username"] for account in get_all_accounts()]
+    incremental = request.form.get('incremental') == 'on'
+    
+    unknown = [account for account in accounts if not is_known_account(account, allow_all=False)]
+    if unknown:
+        flash(f"Невідомі акаунти: {', '.join(unknown)}", "danger")
+        return redirect(url_for('index'))
+    
+    queued, active = [], []
+    for account in accounts:
+        if find_active_job("scrape", account):
+            active.append(account)
+        else:
+            queued.append(enqueue("scrape", account, {"incremental": incremental}))
+    
+    if queued:
+        flash(f"Скрапінг {len(queued)} акаунтів додано до черги (завдання {', '.join(map(str, queued))})!", "success")
+    if active:
+        flash(f"Вже в черзі або виконуються: {', '.join(active)}", "warning")
+    return redirect(url_for('index'))
+
+@app.route('/status/accounts')
+def status_accounts():
+    """Повертає стан останнього завдання скрапінгу кожного акаунту у форматі JSON"""
+    return jsonify(get_accounts_status())
+
 @app.route('/status')
 def status():
     """Повертає поточний статус скрапінгу у форматі JSON"""
-    return jsonify(scraping_status)
+    return jsonify(get_scraping_status(request.args.get('account')))
+
+@app.route('/api/jobs', methods=['GET'])
+def api_jobs():
+    """Повертає останні завдання черги
+    
+    Параметри запиту: state, kind, account, limit.
+    """
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    return jsonify(list_jobs(request.args.get('state'), request.args.get('kind'), request.args.get('account'), limit))
+
+@app.route('/api/jobs', methods=['POST'])
+def api_enqueue_job():
+    """Додає завдання до черги
+    
+    Параметри (JSON або форма): kind (за замовчуванням scrape), account, incremental, max_attempts.
+    """
+    data = request.get_json(silent=True) or request.form
+    kind = data.get('kind', 'scrape')
+    account = data.get('account', 'default')
+    if kind not in JOB_HANDLERS:
+        return jsonify({"error": f"Невідомий тип завдання: {kind}"}), 400
+    if not is_known_account(account, allow_all=False):
+        return jsonify({"error": f"Невідомий акаунт: {account}"}), 400
+    
+    active = find_active_job(kind, account)
+    if active:
+        return jsonify(active), 409
+    
+    incremental = data.get('incremental') in (True, 'true', 'on', '1', 1)
+    try:
+        max_attempts = int(data['max_attempts']) if data.get('max_attempts') else None
+    except ValueError:
+        return jsonify({"error": "max_attempts має бути числом"}), 400
+    job_id = enqueue(kind, account, {"incremental": incremental}, max_attempts)
+    return jsonify(get_job(job_id)), 202
+
+@app.route('/api/jobs/<int:job_id>')
+def api_job(job_id):
+    """Повертає стан і прогрес завдання"""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Завдання не знайдено"}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<int:job_id>/cancel', methods=['POST'])
+def api_cancel_job(job_id):
+    """Скасовує завдання в черзі або надсилає запит на скасування виконуваного"""
+    if not cancel_job(job_id):
+        return jsonify({"error": "Завдання вже завершене або не існує"}), 409
+    return jsonify(get_job(job_id))
+
+@app.route('/stats')
+def stats_json():
+    """Повертає статистику акаунту у форматі JSON (з кешу post_stats)"""
+    account = request.args.get('account', 'default')
+    stats = get_stats(account)
+    stats.pop("available_accounts", None)
+    return jsonify(stats)
 
 @app.route('/get_logs')
 def get_logs():
-    """Повертає останні записи з лог-файлу"""
+    """Повертає останні записи логу з буфера в пам'яті (без читання лог-файлу)"""
+    return jsonify({"logs": recent_logs(request.args.get('limit', 50, type=int))})
+
+@app.route('/api/logs')
+def api_logs():
+    """Повертає останні записи лог-файлу веб-інтерфейсу (source=web) або воркерів (source=jobs)
+
+    Фільтри: level (мінімальний рівень), account, run_id, name; limit - кількість записів.
+    Файл читається з кінця, тому запит не переглядає всю історію логу. Логи
+    воркерів (окремий файл на воркер) об'єднуються за часом.
+    """
+    log_files = {"web": LOG_FILE, "jobs": worker_log_files()}
+    source = request.args.get('source', 'jobs')
+    if source not in log_files:
+        return jsonify({"error": f"Невідоме джерело логу: {source}"}), 400
     try:
-        # Читаємо останні 50 рядків з лог-файлу
-        log_file = "flask_app.log"
-        if os.path.exists(log_file):
-            with open(log_file, 'r', encoding='latin-1') as f:
-                logs = f.readlines()
-                # Залишаємо тільки останні 50 рядків
-                logs = logs[-50:] if len(logs) > 50 else logs
-                # Видаляємо зайві переноси рядків
-                logs = [log.strip() for log in logs if log.strip()]
-                return jsonify({"logs": logs})
-        else:
-            return jsonify({"logs": ["Log file not found"]})
-    except Exception as e:
-        logger.error(f"Помилка при читанні логів: {e}")
-        return jsonify({"logs": [f"Помилка при читанні логів: {e}"]}), 500
+        records = read_logs(log_files[source],
+                            limit=min(request.args.get('limit', 100, type=int), 1000),
+                            level=request.args.get('level') or None,
+                            account=request.args.get('account') or None,
+                            run_id=request.args.get('run_id') or None,
+                            name=request.args.get('name') or None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"source": source, "logs": records})
+
+@app.route('/events')
+def events_stream():
+    """Потік Server-Sent Events: зміни стану скрапінгу (status) та нові записи логу (log)"""
+    response = Response(stream_with_context(iter_sse(request.headers.get('Last-Event-ID'))),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# Завдання, про які вже попереджено, що їх не бере жоден воркер
+_unclaimed_warned = set()
+
+def warn_unclaimed_jobs():
+    """Попереджає в лозі (один раз на завдання), якщо завдання в черзі не бере жоден воркер"""
+    jobs = [job for job in find_unclaimed_jobs() if job["id"] not in _unclaimed_warned]
+    if jobs:
+        _unclaimed_warned.update(job["id"] for job in jobs)
+        logger.warning(f"Завдання {', '.join(str(job['id']) for job in jobs)} чекають воркера понад "
+                       f"{JOB_UNCLAIMED_WARNING:.0f} с: запустіть python job_queue.py worker або перевірте JOB_WORKERS")
+
+def get_dashboard_status():
+    """Стан для подій status: останнє завдання скрапінгу та завдання кожного акаунту"""
+    # Викликається періодично потоком подій, тому тут же перевіряємо, що черга обробляється
+    warn_unclaimed_jobs()
+    return {"scraping": get_scraping_status(), "accounts": get_accounts_status()}
+
+def parse_page_cursor(value):
+    """Розбирає курсор сторінки постів формату "parsed_date|id"
+    
+    Args:
+        value (str): Значення курсору з URL
+        
+    Returns:
+        tuple: (parsed_date, id) або None, якщо курсор відсутній чи некоректний
+    """
+    if not value or "|" not in value:
+        return None
+    parsed_date, post_id = value.rsplit("|", 1)
+    if not post_id.isdigit():
+        return None
+    return parsed_date, int(post_id)
+
+def make_page_cursor(post):
+    """Формує курсор сторінки постів з рядка бази даних"""
+    return f"{post['parsed_date']}|{post['id']}"
+
+def fetch_posts_page(conn, account, post_types, per_page, after=None, before=None):
+    """Вибирає сторінку постів пагінацією за курсором (keyset) по (parsed_date, id)
+    
+    Кожен тип постів вибирається окремим підзапитом по індексу
+    idx_posts_feed (account, post_type, parsed_date, id), тому час запиту не залежить
+    від того, наскільки далеко від початку знаходиться сторінка.
+    
+    Args:
+        conn (sqlite3.Connection): З'єднання з базою даних
+        account (str): Ім'я акаунту Instagram
+        post_types (list): Типи постів (post, reel)
+        per_page (int): Кількість постів на сторінці
+        after (tuple, optional): Курсор останнього посту попередньої сторінки. Defaults to None.
+        before (tuple, optional): Курсор першого посту наступної сторінки. Defaults to None.
+        
+    Returns:
+        tuple: Пости сторінки (від новіших до старших), чи є новіші та чи є старші пости
+    """
+    # Для переходу назад вибираємо новіші пости за зростанням і потім розвертаємо
+    backward = before is not None and after is None
+    cursor_value = before if backward else after
+    direction = "ASC" if backward else "DESC"
+    
+    subqueries = []
+    params = []
+    for post_type in post_types:
+        condition = "account = ? AND post_type = ?"
+        params.extend([account, post_type])
+        if cursor_value:
+            condition += f" AND (parsed_date, id) {'>' if backward else '<'} (?, ?)"
+            params.extend(cursor_value)
+        subqueries.append(
+            f"SELECT * FROM (SELECT * FROM posts WHERE {condition} "
+            f"ORDER BY parsed_date {direction}, id {direction} LIMIT ?)"
+        )
+        params.append(per_page + 1)
+    
+    query = " UNION ALL ".join(subqueries) + f" ORDER BY parsed_date {direction}, id {direction} LIMIT ?"
+    params.append(per_page + 1)
+    rows = conn.execute(query, params).fetchall()
+    
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backward:
+        return list(reversed(rows)), has_more, True
+    return rows, cursor_value is not None, has_more
 
 @app.route('/posts')
 def posts():
     """Сторінка з постами"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), MAX_PER_PAGE)
     post_type = request.args.get('type', 'all')
     account = request.args.get('account', 'default')
-    
-    # Обчислюємо зміщення для пагінації
-    offset = (page - 1) * per_page
-    
-    conn = get_db_connection(account)
-    cursor = conn.cursor()
+    after = parse_page_cursor(request.args.get('after'))
+    before = parse_page_cursor(request.args.get('before'))
+    if not after and not before:
+        page = 1
     
     # Отримуємо список всіх доступних акаунтів
     available_accounts = get_all_accounts()
     
-    # Перевіряємо, чи існує таблиця posts
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='posts'")
-    if not cursor.fetchone():
-        logger.warning(f"Таблиця posts не існує для акаунту {account}. База даних порожня.")
-        return render_template('posts.html', posts=[], page=page, per_page=per_page, 
-                           total_posts=0, post_type=post_type, account=account, 
-                           available_accounts=available_accounts)
-    
-    # Формуємо SQL запит залежно від типу постів та акаунту
-    if post_type == 'post':
-        cursor.execute("SELECT COUNT(*) FROM posts WHERE post_type = 'post' AND account = ?", (account,))
-        query = "SELECT * FROM posts WHERE post_type = 'post' AND account = ? ORDER BY parsed_date DESC LIMIT ? OFFSET ?"
-        params = (account, per_page, offset)
-    elif post_type == 'reel':
-        cursor.execute("SELECT COUNT(*) FROM posts WHERE post_type = 'reel' AND account = ?", (account,))
-        query = "SELECT * FROM posts WHERE post_type = 'reel' AND account = ? ORDER BY parsed_date DESC LIMIT ? OFFSET ?"
-        params = (account, per_page, offset)
-    else:
-        cursor.execute("SELECT COUNT(*) FROM posts WHERE account = ?", (account,))
-        query = "SELECT * FROM posts WHERE account = ? ORDER BY parsed_date DESC LIMIT ? OFFSET ?"
-        params = (account, per_page, offset)
-    
-    # Загальна кількість постів
-    total_posts = cursor.fetchone()[0]
-    
-    # Пагінація
-    cursor.execute(query, params)
-    posts = cursor.fetchall()
-    
-    # Діагностика: виводимо інформацію про пости
-    logger.info(f"Знайдено {len(posts)} постів типу '{post_type}'")
-    if posts:
-        sample_post = dict(posts[0])
-        logger.info(f"Приклад посту: {sample_post}")
-        logger.info(f"Ключі в пості: {list(sample_post.keys())}")
+    post_types = [post_type] if post_type in ('post', 'reel') else ['post', 'reel']
+    with db_connection(account) as conn:
+        posts, has_newer, has_older = fetch_posts_page(conn, account, post_types, per_page, after, before)
     
-    # Загальна кількість сторінок
+    # Загальна кількість постів з кешу статистики
+    stats = get_stats(account)
+    total_posts = {'post': stats["regular_posts"], 'reel': stats["reels"]}.get(post_type, stats["total_posts"])
     total_pages = (total_posts + per_page - 1) // per_page
     
-    conn.close()
+    logger.debug(f"Знайдено {len(posts)} постів типу '{post_type}' для акаунту {account}")
     
     return render_template(
         'posts.html', 
@@ -353,7 +467,39 @@ def posts():
         post_type=post_type,
         total_posts=total_posts,
         account=account,
-        available_accounts=available_accounts
+        available_accounts=available_accounts,
+        newer_cursor=make_page_cursor(posts[0]) if posts and has_newer else None,
+        older_cursor=make_page_cursor(posts[-1]) if posts and has_older else None
+    )
+
+@app.route('/search')
+def search():
+    """Сторінка повнотекстового пошуку постів за описами"""
+    query = request.args.get('q', '').strip()
+    account = request.args.get('account', 'all')
+    post_type = request.args.get('type', 'all')
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), MAX_PER_PAGE)
+    
+    results, total = [], 0
+    if query:
+        try:
+            results, total = search_posts(query, account, post_type, page, per_page)
+        except sqlite3.OperationalError as e:
+            logger.error(f"Помилка пошуку '{query}': {e}")
+            flash(f"Помилка пошуку: {e}", "danger")
+    
+    return render_template(
+        'search.html',
+        query=query,
+        results=results,
+        total=total,
+        page=page,
+        per_page=per_page,
+        total_pages=(total + per_page - 1) // per_page,
+        account=account,
+        post_type=post_type,
+        available_accounts=get_all_accounts()
     )
 
 @app.route('/settings', methods=['GET', 'POST'])
@@ -434,79 +580,155 @@ def settings():
 @app.route('/export', methods=['GET'])
 def export():
     """Сторінка експорту даних"""
-    return render_template('export.html')
+    return render_template('export.html', available_accounts=get_all_accounts())
 
-@app.route('/export/json', methods=['GET'])
-def export_json():
-    """Експортує дані у форматі JSON"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM posts")
-    posts = cursor.fetchall()
+def export_response(fmt):
+    """Формує потокову відповідь експорту з фільтрами з параметрів запиту
     
-    # Конвертуємо результати у список словників
-    result = []
-    for post in posts:
-        post_dict = {}
-        for key in post.keys():
-            post_dict[key] = post[key]
-        result.append(post_dict)
+    Параметри запиту: account (або all для всіх акаунтів), type (post, reel),
+    date_from, date_to (YYYY-MM-DD), gzip=1.
     
-    conn.close()
+    Args:
+        fmt (str): Формат (json, ndjson, csv)
+        
+    Returns:
+        flask.Response: Потокова відповідь з файлом експорту
+    """
+    account = request.args.get('account', 'default')
+    if not is_known_account(account):
+        return jsonify({"error": f"Невідомий акаунт: {account}"}), 400
+    post_type = request.args.get('type')
+    date_from = request.args.get('date_from') or None
+    date_to = request.args.get('date_to') or None
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'on')
     
-    # Створюємо тимчасовий файл
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"instagram_export_{timestamp}.json"
-    filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        import json
-        json.dump(result, f, ensure_ascii=False, indent=4)
-    
-    return send_from_directory(
-        app.config["UPLOAD_FOLDER"],
-        filename,
-        as_attachment=True
+    filename = export_filename(fmt, account, post_type, timestamp, compress)
+    mimetype = "application/gzip" if compress else EXPORT_FORMATS[fmt][0]
+    
+    chunks = stream_export(fmt, account, post_type, date_from, date_to, compress)
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
+@app.route('/export/json', methods=['GET'])
+def export_json():
+    """Експортує дані у форматі JSON"""
+    return export_response("json")
+
+@app.route('/export/ndjson', methods=['GET'])
+def export_ndjson():
+    """Експортує дані у форматі NDJSON (один JSON об'єкт на рядок)"""
+    return export_response("ndjson")
+
 @app.route('/export/csv', methods=['GET'])
 def export_csv():
     """Експортує дані у форматі CSV"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM posts")
-    posts = cursor.fetchall()
-    
-    # Отримуємо назви стовпців
-    column_names = [description[0] for description in cursor.description]
+    return export_response("csv")
+
+@app.route('/export/parquet', methods=['GET'])
+def export_parquet():
+    """Експортує пости акаунту (або всіх, account=all) у колонковому форматі Parquet або Feather (format=feather)"""
+    account = request.args.get('account', 'default')
+    if not is_known_account(account):
+        return jsonify({"error": f"Невідомий акаунт: {account}"}), 400
+    post_type = request.args.get('type')
+    fmt = request.args.get('format', 'parquet')
     
-    conn.close()
+    try:
+        from analytics import COLUMNAR_FORMATS, export_columnar
+        if fmt not in COLUMNAR_FORMATS:
+            return jsonify({"error": f"Непідтримуваний формат: {fmt}"}), 400
+        data = export_columnar(account, fmt, post_type)
+    except ImportError as e:
+        logger.error(f"Для колонкового експорту потрібні pandas та pyarrow: {e}")
+        return jsonify({"error": f"Колонковий експорт недоступний: {e}"}), 503
     
-    # Створюємо тимчасовий файл
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"instagram_export_{timestamp}.csv"
-    filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        import csv
-        writer = csv.writer(f)
-        writer.writerow(column_names)
-        for post in posts:
-            writer.writerow(post)
-    
-    return send_from_directory(
-        app.config["UPLOAD_FOLDER"],
-        filename,
-        as_attachment=True
+    filename = f"instagram_export_{account}_{timestamp}.{COLUMNAR_FORMATS[fmt][1]}"
+    return Response(
+        data,
+        mimetype=COLUMNAR_FORMATS[fmt][0],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
-# Ініціалізуємо базу даних при запуску
-from parser import init_db
+@app.route('/api/analytics')
+def api_analytics():
+    """Повертає аналітику постів акаунту у форматі JSON
+    
+    Параметри запиту: account (або all для всіх акаунтів), type (post, reel), freq (D, W, M).
+    """
+    account = request.args.get('account', 'default')
+    if not is_known_account(account):
+        return jsonify({"error": f"Невідомий акаунт: {account}"}), 400
+    post_type = request.args.get('type')
+    freq = request.args.get('freq', 'D')
+    
+    try:
+        from analytics import get_account_analytics
+        return jsonify(get_account_analytics(account, freq, post_type))
+    except ImportError as e:
+        logger.error(f"Для аналітики потрібен pandas: {e}")
+        return jsonify({"error": f"Аналітика недоступна: {e}"}), 503
+
+@app.route('/api/federated/stats')
+def api_federated_stats():
+    """Повертає статистику всіх акаунтів, отриману одним запитом по їхніх базах"""
+    accounts = request.args.getlist('accounts') or None
+    return jsonify(federated_stats(accounts))
+
+@app.route('/api/federated/search')
+def api_federated_search():
+    """Шукає пости за текстом опису в базах усіх акаунтів
+    
+    Параметри запиту: q, type (post, reel), accounts (можна кілька), limit.
+    """
+    text = request.args.get('q', '').strip()
+    if not text:
+        return jsonify({"error": "Параметр q обов'язковий"}), 400
+    accounts = request.args.getlist('accounts') or None
+    post_type = request.args.get('type')
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    return jsonify(federated_search(text, accounts, post_type, limit))
+
+@app.route('/metrics')
+def metrics():
+    """Накопичені метрики етапів скрапінгу та парсингу у текстовому форматі Prometheus"""
+    accounts = request.args.getlist('accounts') or None
+    return Response(prometheus_text(accounts), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/runs')
+def api_runs():
+    """Повертає останні запуски акаунту з тривалістю, байтами та кількістю елементів кожного етапу"""
+    account = request.args.get('account', 'default')
+    limit = min(request.args.get('limit', 20, type=int), 200)
+    return jsonify({"account": account, "runs": list_runs(account, limit)})
+
+def init_app():
+    """Налаштовує веб-процес: логування, пули з'єднань, черга завдань та буфер подій"""
+    setup_logging(LOG_FILE)
+    
+    # Створюємо пули з'єднань та перевіряємо схеми баз усіх акаунтів один раз при запуску
+    init_pools()
+    atexit.register(close_pools)
+    init_queue()
+    
+    # Буфер подій для /events: логи веб-процесу, лог воркерів черги та зміни стану
+    install_log_stream(status_fn=get_dashboard_status, follow_files=[worker_log_pattern()])
 
-# Переконуємося, що таблиці існують
-init_db()
+# Процеси пулів spawn (наприклад, мініатюр) імпортують головний модуль як __mp_main__:
+# їм не потрібні ні пули, ні ще один обробник flask_app.log, ні потоки подій
+if __name__ != "__mp_main__":
+    init_app()
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    use_reloader = os.getenv("FLASK_USE_RELOADER", "True").lower() == "true"
+    # З перезавантажувачем app.py виконується у двох процесах: воркери черги запускає лише робочий
+    # (WERKZEUG_RUN_MAIN), а не процес, що стежить за файлами. Без перезавантажувача - цей процес.
+    # З JOB_WORKERS=0 (та під WSGI сервером) воркери запускаються окремо: python job_queue.py worker
+    if not use_reloader or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_workers()
+        atexit.register(stop_workers)
+    app.run(debug=True, use_reloader=use_reloader, host='0.0.0.0', port=5000)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Бенчмарк парсингу збережених сторінок: BeautifulSoup (html.parser) проти потокового lxml екстрактора
+
+Кожен варіант запускається в окремому процесі, щоб коректно виміряти пікове
+використання пам'яті (RSS). Якщо файл сторінки не передано, генерується
+синтетична сторінка з потрібною кількістю постів.
+
+Приклад використання:
+```bash
+python benchmarks/bench_html_extract.py --items 2000
+python benchmarks/bench_html_extract.py --file instagram_posts.html --kind posts
+```
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_extractor import POST_CONTAINER_CLASS, POST_CAPTION_CLASS, REEL_TITLE_CLASS
+from fixtures import generate_page
+
+
+def legacy_extract(path, kind):
+    """Попередня реалізація parser.parse_posts / parse_reels на BeautifulSoup"""
+    from bs4 import BeautifulSoup
+
+    with open(path, "r", encoding="utf-8") as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+
+    items = []
+    if kind == "posts":
+        for img in soup.find_all("img"):
+            if img.get('src') and not img.get('src').endswith('.ico'):
+                items.append({'post_type': 'post', 'media_url': img.get('src'),
+                              'description': img.get('alt', '') if img.get('alt') else '',
+                              'timestamp': '', 'username': '', 'is_video': False})
+        for i, container in enumerate(soup.find_all("div", class_=POST_CONTAINER_CLASS)):
+            caption = container.find("span", class_=POST_CAPTION_CLASS)
+            if caption and i < len(items):
+                items[i]['description'] = caption.text.strip()
+    else:
+        for video in soup.find_all("video"):
+            if video.get('src'):
+                items.append({'post_type': 'reel', 'media_url': video.get('src'), 'description': '',
+                              'timestamp': '', 'username': '', 'is_video': True})
+        if not items:
+            for img in soup.find_all("img"):
+                if img.get('src') and not img.get('src').endswith('.ico'):
+                    items.append({'post_type': 'reel', 'media_url': img.get('src'),
+                                  'description': img.get('alt', '') if img.get('alt') else '',
+                                  'timestamp': '', 'username': '', 'is_video': True})
+        for i, title in enumerate(soup.find_all("h1", class_=REEL_TITLE_CLASS)):
+            if i < len(items):
+                items[i]['description'] = title.text.strip()
+    return items
+
+
+def streaming_extract(path, kind):
+    """Нова реалізація на lxml"""
+    from html_extractor import iter_posts, iter_reels
+
+    return list(iter_posts(path) if kind == "posts" else iter_reels(path))
+
+
+def run_child(engine, path, kind):
+    """Виконується в дочірньому процесі: парсить сторінку і друкує метрики у JSON"""
+    extract = legacy_extract if engine == "bs4" else streaming_extract
+    started = time.perf_counter()
+    items = extract(path, kind)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        "engine": engine,
+        "items": len(items),
+        "seconds": round(elapsed, 4),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "checksum": hash(json.dumps(items, ensure_ascii=False, sort_keys=True)),
+    }))
+
+
+def measure(engine, path, kind):
+    output = subprocess.check_output(
+        [sys.executable, os.path.abspath(__file__), "--child", engine, "--file", path, "--kind", kind],
+        env=dict(os.environ, PYTHONHASHSEED="0"),
+    )
+    return json.loads(output)
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description="Бенчмарк парсингу HTML сторінок Instagram")
+    args_parser.add_argument("--file", help="Збережена сторінка для парсингу")
+    args_parser.add_argument("--kind", choices=["posts", "reels"], default="posts", help="Тип сторінки")
+    args_parser.add_argument("--items", type=int, default=1000, help="Кількість постів у синтетичній сторінці")
+    args_parser.add_argument("--child", choices=["bs4", "lxml"], help=argparse.SUPPRESS)
+    args = args_parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.file, args.kind)
+        return
+
+    path = args.file
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(), f"instagram_{args.kind}.html")
+        generate_page(path, args.items, args.kind)
+
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"Сторінка: {path} ({size_mb:.1f} МБ)")
+
+    results = [measure(engine, path, args.kind) for engine in ("bs4", "lxml")]
+    for result in results:
+        print(f"{result['engine']:>5}: {result['items']} елементів, {result['seconds']:.3f} с, пік RSS {result['peak_rss_mb']} МБ")
+
+    legacy, streaming = results
+    if legacy["checksum"] != streaming["checksum"]:
+        print("УВАГА: результати парсерів відрізняються")
+    print(f"Прискорення: {legacy['seconds'] / max(streaming['seconds'], 1e-9):.1f}x, "
+          f"економія пам'яті: {legacy['peak_rss_mb'] - streaming['peak_rss_mb']:.1f} МБ")
+
+
+if __name__ == "__main__":
+    main()
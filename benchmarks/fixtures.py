@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Фікстури сторінок Instagram для бенчмарків
+
+Синтетичні фікстури генеруються для кожного розміру з FIXTURE_SIZES: HTML
+сторінки постів та reels і перехоплені GraphQL відповіді у форматі
+func.f_auch.JsonCapture. Записані фікстури беруться з архіву сторінок
+(page_archive.py) реального акаунту і масштабуються до тих самих розмірів:
+вміст сторінки повторюється, а URL медіа в кожній копії змінюються так, щоб
+ключі медіа залишались унікальними.
+
+Фікстури зберігаються в benchmarks/fixtures/ і не додаються в git (записані
+сторінки містять реальні дані акаунтів).
+
+Приклад використання:
+```bash
+python benchmarks/fixtures.py generate --sizes 100 1000 10000
+python benchmarks/fixtures.py record --account dliavsikhta
+```
+"""
+
+import os
+import re
+import sys
+import copy
+import json
+import math
+import argparse
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_extractor import POST_CONTAINER_CLASS, POST_CAPTION_CLASS, REEL_TITLE_CLASS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE_SIZES = (100, 1000, 10000)
+PAGE_KINDS = ("posts", "reels")
+
+# Кількість медіа в одній відповіді GraphQL стрічки Instagram
+GRAPHQL_PAGE_SIZE = 12
+GRAPHQL_URL = "https://www.instagram.com/graphql/query"
+
+# Ідентифікатор ресурсу CDN у шляху URL (див. func.f_media.ASSET_ID_RE)
+ASSET_PATH_RE = re.compile(r"(\d+)(_\d+_\d+_n\.[a-z0-9]+)$", re.IGNORECASE)
+SRC_ATTR_RE = re.compile(r'(\ssrc=")([^"]+)(")')
+
+
+def fixture_path(source, kind, fmt, items):
+    """Повертає шлях до файлу фікстури
+
+    Args:
+        source (str): synthetic або ім'я акаунту записаних сторінок
+        kind (str): posts або reels
+        fmt (str): html або json
+        items (int): Кількість медіа
+
+    Returns:
+        str: Шлях у FIXTURES_DIR
+    """
+    prefix = "instagram" if fmt == "html" else "graphql"
+    return os.path.join(FIXTURES_DIR, source, f"{prefix}_{kind}_{items}.{fmt}")
+
+
+def _media_url(i):
+    return (f"https://instagram.flwo6-1.fna.fbcdn.net/v/t51.2885-15/{100000 + i}_{200000 + i}_{300000 + i}_n.jpg"
+            f"?stp=dst-jpg_e35&_nc_ohc=abc{i}&oh=00_{i:08x}&oe=684E25D3")
+
+
+def generate_page(path, items, kind="posts"):
+    """Генерує синтетичну сторінку, схожу на збережену сторінку Instagram"""
+    filler = "<div class=\"x9f619 x1n2onr6 x1ja2u2z\"><span class=\"x1lliihq\">" + "lorem ipsum " * 20 + "</span></div>"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<!DOCTYPE html><html><head><title>Instagram</title>")
+        f.write("<link rel=\"icon\" href=\"/favicon.ico\"><script>" + "var x=1;" * 2000 + "</script></head><body>")
+        f.write("<img src=\"https://static.cdninstagram.com/favicon.ico\">")
+        for i in range(items):
+            url = _media_url(i)
+            if kind == "posts":
+                f.write(f"<div class=\"{POST_CONTAINER_CLASS}\"><a href=\"/p/C{i:09d}/\">")
+                f.write(f"<img alt=\"Фото {i} від club_okinawa_karate\" src=\"{url}\" class=\"x5yr21d xu96u03\">")
+                f.write(f"<span class=\"{POST_CAPTION_CLASS}\">Тренування <b>№{i}</b></span></a>{filler}</div>")
+            else:
+                f.write(f"<div class=\"x1qjc9v5\"><video src=\"https://instagram.flwo6-1.fna.fbcdn.net/o1/v/t16/f2/{i}.mp4\"></video>")
+                f.write(f"<h1 class=\"{REEL_TITLE_CLASS}\">Reel {i} #karate</h1>{filler}</div>")
+        f.write("</body></html>")
+
+
+def _graphql_node(i, kind):
+    """Вузол медіа у форматі API v1 / xdt GraphQL"""
+    url = _media_url(i)
+    return {
+        "pk": str(3000000000000000000 + i),
+        "code": f"C{i:09d}",
+        "taken_at": 1717000000 + i * 3600,
+        "media_type": 2 if kind == "reels" else 1,
+        "product_type": "clips" if kind == "reels" else "feed",
+        "image_versions2": {"candidates": [
+            {"url": url, "width": 1080, "height": 1350},
+            {"url": url.replace("dst-jpg_e35", "dst-jpg_e35_s640x640"), "width": 640, "height": 800},
+        ]},
+        "caption": {"text": f"Тренування №{i} #karate #okinawa"},
+        "user": {"username": "club_okinawa_karate", "pk": "1234567890"},
+        "like_count": i % 500,
+        "comment_count": i % 40,
+    }
+
+
+def _graphql_responses(nodes):
+    """Розбиває вузли на відповіді стрічки по GRAPHQL_PAGE_SIZE у форматі JsonCapture"""
+    responses = []
+    for start in range(0, len(nodes), GRAPHQL_PAGE_SIZE):
+        edges = [{"node": node, "cursor": node.get("pk")} for node in nodes[start:start + GRAPHQL_PAGE_SIZE]]
+        responses.append({"url": GRAPHQL_URL, "payload": {"data": {
+            "xdt_api__v1__feed__user_timeline_graphql_connection": {
+                "edges": edges,
+                "page_info": {"has_next_page": start + GRAPHQL_PAGE_SIZE < len(nodes)},
+            }
+        }}})
+    return responses
+
+
+def generate_graphql(path, items, kind="posts"):
+    """Генерує синтетичні перехоплені відповіді GraphQL стрічки"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(_graphql_responses([_graphql_node(i, kind) for i in range(items)]), f, ensure_ascii=False)
+
+
+def generate_synthetic(sizes=FIXTURE_SIZES, force=False):
+    """Створює синтетичні фікстури, яких ще немає
+
+    Returns:
+        list: Шляхи створених файлів
+    """
+    created = []
+    for items in sizes:
+        for kind in PAGE_KINDS:
+            for fmt, generate in (("html", generate_page), ("json", generate_graphql)):
+                path = fixture_path("synthetic", kind, fmt, items)
+                if os.path.exists(path) and not force:
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                generate(path, items, kind)
+                created.append(path)
+    return created
+
+
+def variant_url(url, copy_index):
+    """Повертає URL медіа для копії copy_index з іншим ключем медіа
+
+    Для URL з CDN змінюється ідентифікатор ресурсу в шляху, для інших URL
+    додається параметр запиту.
+    """
+    if not copy_index:
+        return url
+    parsed = urllib.parse.urlparse(url)
+    path, count = ASSET_PATH_RE.subn(lambda m: f"{m.group(1)}{copy_index:05d}{m.group(2)}", parsed.path, count=1)
+    if count:
+        return parsed._replace(path=path).geturl()
+    query = f"{parsed.query}&bench={copy_index}" if parsed.query else f"bench={copy_index}"
+    return parsed._replace(query=query).geturl()
+
+
+def scale_html(source_path, target_path, items, kind):
+    """Повторює вміст body записаної сторінки, поки вона не міститиме щонайменше items медіа"""
+    from html_extractor import iter_posts, iter_reels
+
+    per_copy = sum(1 for _ in (iter_posts(source_path) if kind == "posts" else iter_reels(source_path)))
+    if not per_copy:
+        raise ValueError(f"У сторінці {source_path} не знайдено медіа")
+
+    with open(source_path, "r", encoding="utf-8") as f:
+        html = f.read()
+    body_start = html.find(">", html.find("<body")) + 1
+    body_end = html.rfind("</body>")
+    if body_start <= 0 or body_end < body_start:
+        body_start, body_end = 0, len(html)
+    body = html[body_start:body_end]
+
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    with open(target_path, "w", encoding="utf-8") as f:
+        f.write(html[:body_start])
+        for copy_index in range(math.ceil(items / per_copy)):
+            f.write(SRC_ATTR_RE.sub(lambda m: m.group(1) + variant_url(m.group(2), copy_index) + m.group(3), body))
+        f.write(html[body_end:])
+
+
+def _media_nodes(payload):
+    """Вузли медіа з відповідей так само, як їх знаходить parser.parse_json_payloads"""
+    nodes, stack = [], [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            if (node.get("code") or node.get("shortcode")) and ("image_versions2" in node or "display_url" in node):
+                nodes.append(node)
+                continue
+            stack.extend(reversed(list(node.values())))
+    return nodes
+
+
+def _variant_node(node, copy_index):
+    node = copy.deepcopy(node)
+    if copy_index:
+        for key in ("code", "shortcode"):
+            if node.get(key):
+                node[key] = f"{node[key]}_{copy_index}"
+        for candidate in (node.get("image_versions2") or {}).get("candidates") or []:
+            candidate["url"] = variant_url(candidate.get("url"), copy_index)
+        for key in ("display_url", "thumbnail_src"):
+            if node.get(key):
+                node[key] = variant_url(node[key], copy_index)
+    return node
+
+
+def scale_graphql(source_path, target_path, items):
+    """Створює відповіді GraphQL з items вузлами медіа, повторюючи вузли записаних відповідей"""
+    with open(source_path, "r", encoding="utf-8") as f:
+        nodes = _media_nodes(json.load(f))
+    if not nodes:
+        raise ValueError(f"У відповідях {source_path} не знайдено медіа")
+
+    scaled = [_variant_node(nodes[i % len(nodes)], i // len(nodes)) for i in range(items)]
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    with open(target_path, "w", encoding="utf-8") as f:
+        json.dump(_graphql_responses(scaled), f, ensure_ascii=False)
+
+
+def record_fixtures(account_username, sizes=FIXTURE_SIZES):
+    """Створює записані фікстури з останніх знімків акаунту в архіві сторінок
+
+    Returns:
+        list: Шляхи створених файлів
+    """
+    import shutil
+    from page_archive import list_captures, open_capture
+
+    created = []
+    for kind in PAGE_KINDS:
+        captures = list_captures(account_username, kind)
+        for fmt in ("html", "json"):
+            matching = [capture for capture in captures if capture["kind"] == fmt]
+            if not matching:
+                print(f"{account_username}/{kind}: знімків {fmt} в архіві немає")
+                continue
+
+            original = fixture_path(account_username, kind, fmt, "recorded")
+            os.makedirs(os.path.dirname(original), exist_ok=True)
+            with open_capture(matching[-1]) as reader, open(original, "wb") as f:
+                shutil.copyfileobj(reader, f)
+            created.append(original)
+
+            for items in sizes:
+                target = fixture_path(account_username, kind, fmt, items)
+                if fmt == "html":
+                    scale_html(original, target, items, kind)
+                else:
+                    scale_graphql(original, target, items)
+                created.append(target)
+    return created
+
+
+def list_fixtures(sizes=FIXTURE_SIZES):
+    """Повертає наявні фікстури потрібних розмірів: синтетичні та записані
+
+    Returns:
+        list: Словники з полями source, kind, format, items, path
+    """
+    sources = sorted(os.listdir(FIXTURES_DIR)) if os.path.isdir(FIXTURES_DIR) else []
+    fixtures = []
+    for source in sources:
+        for items in sizes:
+            for kind in PAGE_KINDS:
+                for fmt in ("html", "json"):
+                    path = fixture_path(source, kind, fmt, items)
+                    if os.path.exists(path):
+                        fixtures.append({"source": source, "kind": kind, "format": fmt, "items": items, "path": path})
+    return fixtures
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description="Фікстури сторінок Instagram для бенчмарків")
+    subparsers = args_parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = subparsers.add_parser("generate", help="Створити синтетичні фікстури")
+    generate_parser.add_argument("--sizes", type=int, nargs="+", default=list(FIXTURE_SIZES), help="Кількість медіа")
+    generate_parser.add_argument("--force", action="store_true", help="Перестворити наявні фікстури")
+
+    record_parser = subparsers.add_parser("record", help="Створити фікстури з архіву сторінок акаунту")
+    record_parser.add_argument("--account", required=True, help="Ім'я акаунту")
+    record_parser.add_argument("--sizes", type=int, nargs="+", default=list(FIXTURE_SIZES), help="Кількість медіа")
+    args = args_parser.parse_args()
+
+    if args.command == "generate":
+        created = generate_synthetic(args.sizes, args.force)
+    else:
+        created = record_fixtures(args.account, args.sizes)
+    for path in created:
+        print(f"{path} ({os.path.getsize(path) / (1024 * 1024):.1f} МБ)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Локальний HTTP сервер, що замінює CDN Instagram у бенчмарках
+
+На будь-який шлях сервер відповідає одним із зображень з static/img/ (вибір
+стабільний для шляху), додаючи затримку, щоб завантаження медіа поводилось як
+запити до віддаленого CDN. Файли читаються в пам'ять при запуску.
+
+Приклад використання:
+```python
+from image_server import ImageServer
+
+with ImageServer(latency=0.05) as server:
+    url = f"{server.base_url}/v/t51.2885-15/1_2_3_n.jpg"
+```
+
+```bash
+python benchmarks/image_server.py --port 8766 --latency 0.05 --jitter 0.02
+```
+"""
+
+import os
+import time
+import zlib
+import random
+import argparse
+import mimetypes
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGE_ROOT = os.path.join(REPO_DIR, "static", "img")
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".heic"}
+
+
+def load_images(root=IMAGE_ROOT):
+    """Завантажує зображення каталогу (без мініатюр) у пам'ять
+
+    Returns:
+        list: Пари (тип вмісту, байти), впорядковані за шляхом
+    """
+    images = []
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if name != "thumbs")
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+            with open(os.path.join(directory, filename), "rb") as f:
+                images.append((mimetypes.guess_type(filename)[0] or "application/octet-stream", f.read()))
+    return images
+
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Заголовки та тіло йдуть окремими записами; без TCP_NODELAY keep-alive з'єднання
+    # чекають затримане підтвердження (~40 мс) і спотворюють заміри
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        content_type, body = server.images[zlib.crc32(self.path.encode()) % len(server.images)]
+        with server.lock:
+            server.requests += 1
+            server.bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ImageServer(ThreadingHTTPServer):
+    """Сервер зображень у фоновому потоці
+
+    Attributes:
+        base_url (str): Адреса сервера (http://127.0.0.1:<port>)
+        requests (int): Кількість обслужених запитів
+        bytes_sent (int): Кількість відданих байт
+    """
+
+    daemon_threads = True
+
+    def __init__(self, root=IMAGE_ROOT, latency=0.02, jitter=0.0, host="127.0.0.1", port=0):
+        self.images = load_images(root)
+        if not self.images:
+            raise ValueError(f"У каталозі {root} немає зображень")
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        super().__init__((host, port), _ImageHandler)
+        self.base_url = f"http://{host}:{self.server_address[1]}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="image-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description="Локальний сервер зображень замість CDN Instagram")
+    args_parser.add_argument("--root", default=IMAGE_ROOT, help="Каталог зображень")
+    args_parser.add_argument("--host", default="127.0.0.1", help="Адреса")
+    args_parser.add_argument("--port", type=int, default=8766, help="Порт")
+    args_parser.add_argument("--latency", type=float, default=0.02, help="Затримка відповіді, секунди")
+    args_parser.add_argument("--jitter", type=float, default=0.0, help="Випадкова додаткова затримка, секунди")
+    args = args_parser.parse_args()
+
+    server = ImageServer(args.root, args.latency, args.jitter, args.host, args.port)
+    print(f"{len(server.images)} зображень на {server.base_url} (затримка {args.latency} с)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
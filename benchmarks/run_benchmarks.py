@@ -0,0 +1,411 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Офлайн бенчмарки парсингу, збереження в базу та веб-інтерфейсу
+
+Для кожного сценарію та розміру фікстури (benchmarks/fixtures.py) запускається
+окремий процес у тимчасовому каталозі, тому бази даних, зображення та пік
+пам'яті (RSS) одного вимірювання не впливають на інші. Завантаження медіа в
+save_to_db йдуть на локальний сервер зображень (benchmarks/image_server.py) із
+заданою затримкою, тож авторизація в Instagram не потрібна.
+
+Сценарії:
+- parse_posts, parse_reels, parse_json_payloads - парсинг HTML та GraphQL фікстур
+- save_to_db - збереження постів з завантаженням медіа та мініатюрами
+- get_stats, /posts, /export/json, /export/ndjson, /export/csv, /export/parquet -
+  читання з бази, заповненої постами фікстури
+
+Для кожного вимірювання звітуються p50/p99 тривалості виклику, пропускна
+здатність (елементів за секунду) та пік RSS. Результати зберігаються в JSON;
+з --compare вони порівнюються з базовими, і код виходу 1 означає регресію.
+Вимірювання, що завершилось помилкою, та базовий результат без відповідного
+нового теж вважаються регресіями.
+
+Приклад використання:
+```bash
+python benchmarks/run_benchmarks.py --update-baseline            # зберегти базові результати
+python benchmarks/run_benchmarks.py --compare --tolerance 0.2    # перевірити регресії
+python benchmarks/run_benchmarks.py --scenarios parse_posts save_to_db --sizes 100 1000 --latency 0.05
+```
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import urllib.parse
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from fixtures import FIXTURE_SIZES, generate_synthetic, list_fixtures, fixture_path
+
+RESULTS_FILE = os.path.join(BENCH_DIR, "results.json")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+
+# Акаунт, у базу якого пишуть сценарії (база та папка зображень створюються в тимчасовому каталозі)
+BENCH_ACCOUNT = "default"
+POSTS_PER_PAGE = 24
+
+PARSE_SCENARIOS = {
+    "parse_posts": ("posts", "html"),
+    "parse_reels": ("reels", "html"),
+    "parse_json_payloads": (None, "json"),
+}
+DB_SCENARIOS = ["save_to_db", "get_stats", "/posts", "/export/json", "/export/ndjson", "/export/csv",
+                "/export/parquet"]
+SCENARIOS = list(PARSE_SCENARIOS) + DB_SCENARIOS
+
+# Показники, за якими шукаються регресії: (ключ, чи краще більше значення)
+COMPARED_METRICS = [("p50_ms", False), ("p99_ms", False), ("items_per_second", True), ("peak_rss_mb", False)]
+# Тривалості, коротші за цей поріг, порівнюються лише за пам'яттю: відносний шум там завеликий
+MIN_COMPARED_MS = 1.0
+
+
+def percentile(values, p):
+    """Перцентиль методом найближчого рангу"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _summary(latencies, items, extra=None):
+    total = sum(latencies)
+    result = {
+        "items": items,
+        "repeat": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(total / len(latencies) * 1000, 3),
+        "calls_per_second": round(len(latencies) / total, 2) if total else None,
+        "items_per_second": round(items * len(latencies) / total, 1) if total else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    result.update(extra or {})
+    return result
+
+
+def _timed(call, repeat, warmup=1):
+    for _ in range(warmup):
+        call()
+    latencies, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = call()
+        latencies.append(time.perf_counter() - started)
+    return latencies, result
+
+
+def _fixture_items(path):
+    """Пости фікстури у форматі parser.parse_posts"""
+    from parser import parse_posts
+
+    return parse_posts(path)
+
+
+def _seed_database(items):
+    """Заповнює базу акаунту постами фікстури (кожен четвертий - reel)"""
+    from parser import init_db
+    from accounts_config import get_account_config
+    from func.f_media import get_media_key
+
+    conn = init_db(get_account_config(BENCH_ACCOUNT)["database"])
+    rows = [
+        ("reel" if i % 4 == 0 else "post", item["media_url"], item["description"], item["timestamp"],
+         item["username"], int(i % 4 == 0), f"2025-01-01 00:00:{i % 60:02d}", None, BENCH_ACCOUNT,
+         get_media_key(item["media_url"]))
+        for i, item in enumerate(items)
+    ]
+    with conn:
+        conn.executemany('''
+        INSERT OR IGNORE INTO posts (post_type, media_url, description, timestamp, username, is_video, parsed_date, local_path, account, media_key)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+    conn.close()
+
+
+def _bench_parse(scenario, path, repeat):
+    import parser
+
+    func = getattr(parser, scenario)
+    latencies, result = _timed(lambda: func(path), repeat)
+    return _summary(latencies, len(result))
+
+
+def _bench_save_to_db(path, repeat, media_base):
+    from parser import init_db
+    from accounts_config import get_account_config
+
+    account_config = get_account_config(BENCH_ACCOUNT)
+    images_dir = os.path.join("static", "img", account_config["images_folder"])
+    base = urllib.parse.urlparse(media_base)
+    items = [dict(item, media_url=urllib.parse.urlparse(item["media_url"])._replace(
+                 scheme=base.scheme, netloc=base.netloc).geturl())
+             for item in _fixture_items(path)]
+
+    import parser
+
+    latencies, added = [], 0
+    for _ in range(repeat):
+        # Кожне повторення пише в порожню базу та порожню папку зображень
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(account_config["database"] + suffix):
+                os.remove(account_config["database"] + suffix)
+        shutil.rmtree(images_dir, ignore_errors=True)
+        os.makedirs(images_dir, exist_ok=True)
+        conn = init_db(account_config["database"])
+        try:
+            started = time.perf_counter()
+            added, _ = parser.save_to_db(items, conn, BENCH_ACCOUNT)
+            latencies.append(time.perf_counter() - started)
+        finally:
+            conn.close()
+    downloaded = sum(1 for name in os.listdir(images_dir) if os.path.isfile(os.path.join(images_dir, name)))
+    return _summary(latencies, len(items), {"added": added, "downloaded": downloaded})
+
+
+def _bench_read(scenario, path, repeat):
+    items = _fixture_items(path)
+    _seed_database(items)
+
+    if scenario == "get_stats":
+        from db_pool import db_connection
+        from post_stats import compute_stats
+
+        def call():
+            with db_connection(BENCH_ACCOUNT) as conn:
+                return compute_stats(conn, BENCH_ACCOUNT)
+
+        latencies, _ = _timed(call, repeat)
+        return _summary(latencies, len(items))
+
+    import app
+
+    client = app.app.test_client()
+    url = (f"/posts?account={BENCH_ACCOUNT}&per_page={POSTS_PER_PAGE}" if scenario == "/posts"
+           else f"{scenario}?account={BENCH_ACCOUNT}")
+
+    def call():
+        response = client.get(url)
+        body = response.get_data()
+        if response.status_code != 200:
+            raise RuntimeError(f"{url}: HTTP {response.status_code}")
+        return len(body)
+
+    latencies, size = _timed(call, repeat)
+    return _summary(latencies, min(len(items), POSTS_PER_PAGE) if scenario == "/posts" else len(items),
+                    {"response_bytes": size})
+
+
+def run_child(args):
+    """Виконується в дочірньому процесі: одне вимірювання, результат у JSON"""
+    from log_config import setup_logging
+
+    setup_logging(level=os.getenv("LOG_LEVEL", "WARNING"))
+    if args.child in PARSE_SCENARIOS:
+        result = _bench_parse(args.child, args.fixture, args.repeat)
+    elif args.child == "save_to_db":
+        result = _bench_save_to_db(args.fixture, args.repeat, args.media_base)
+    else:
+        result = _bench_read(args.child, args.fixture, args.repeat)
+    print(json.dumps(result))
+
+
+def measure(scenario, fixture, repeat, media_base=None, env=None):
+    """Запускає вимірювання в окремому процесі з тимчасовим робочим каталогом"""
+    workdir = tempfile.mkdtemp(prefix="instagram_bench_")
+    command = [sys.executable, os.path.abspath(__file__), "--child", scenario, "--fixture", fixture["path"],
+               "--repeat", str(repeat)]
+    if media_base:
+        command += ["--media-base", media_base]
+    try:
+        output = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+        if output.returncode != 0:
+            raise RuntimeError(output.stderr.strip().splitlines()[-1] if output.stderr.strip() else "помилка процесу")
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return dict({"scenario": scenario, "source": fixture["source"], "kind": fixture["kind"],
+                 "format": fixture["format"], "size": fixture["items"]}, **result)
+
+
+def plan(scenarios, sizes):
+    """Повертає пари (сценарій, фікстура) для запуску
+
+    Сценарії парсингу виконуються на всіх наявних фікстурах (синтетичних та
+    записаних), сценарії бази - на синтетичній сторінці постів.
+    """
+    fixtures = list_fixtures(sizes)
+    runs = []
+    for scenario in scenarios:
+        if scenario in PARSE_SCENARIOS:
+            kind, fmt = PARSE_SCENARIOS[scenario]
+            runs += [(scenario, fixture) for fixture in fixtures
+                     if fixture["format"] == fmt and (kind is None or fixture["kind"] == kind)]
+        else:
+            runs += [(scenario, {"source": "synthetic", "kind": "posts", "format": "html", "items": items,
+                                 "path": fixture_path("synthetic", "posts", "html", items)}) for items in sizes]
+    return runs
+
+
+def _result_key(result):
+    return result["scenario"], result["source"], result["kind"], result["format"], result["size"]
+
+
+def _label(result):
+    return f"{result['scenario']} [{result['source']} {result['kind']}/{result['format']} {result['size']}]"
+
+
+def compare(results, baseline, tolerance, failures=(), scenarios=None, sizes=None):
+    """Порівнює результати з базовими
+
+    Args:
+        results (list): Нові результати
+        baseline (dict): Базовий звіт
+        tolerance (float): Допустиме погіршення
+        failures (list, optional): Вимірювання, що завершились помилкою. Defaults to ().
+        scenarios (list, optional): Сценарії цього запуску; базові результати інших не перевіряються.
+            Defaults to None (усі).
+        sizes (list, optional): Розміри цього запуску. Defaults to None (усі).
+
+    Returns:
+        list: Рядки з описом регресій
+    """
+    base = {_result_key(result): result for result in baseline["results"]}
+    regressions = [f"{_label(failure)}: помилка - {failure['error']}" for failure in failures]
+
+    # Базовий результат, якого немає серед нових, означає, що сценарій зламався або зник
+    measured = {_result_key(result) for result in results} | {_result_key(failure) for failure in failures}
+    for key, previous in base.items():
+        if key in measured:
+            continue
+        if (scenarios is None or previous["scenario"] in scenarios) and (sizes is None or previous["size"] in sizes):
+            regressions.append(f"{_label(previous)}: немає результату")
+
+    for result in results:
+        previous = base.get(_result_key(result))
+        if previous is None:
+            continue
+        noisy = max(previous["p50_ms"], result["p50_ms"]) < MIN_COMPARED_MS
+        for metric, higher_is_better in COMPARED_METRICS:
+            if noisy and metric != "peak_rss_mb":
+                continue
+            old, new = previous.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{_label(result)}: {metric} {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description="Офлайн бенчмарки Instagram скрапера")
+    args_parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS, help="Сценарії")
+    args_parser.add_argument("--sizes", type=int, nargs="+", default=list(FIXTURE_SIZES), help="Розміри фікстур")
+    args_parser.add_argument("--repeat", type=int, default=5, help="Повторень кожного вимірювання")
+    args_parser.add_argument("--latency", type=float, default=0.02, help="Затримка сервера зображень, секунди")
+    args_parser.add_argument("--jitter", type=float, default=0.0, help="Випадкова додаткова затримка, секунди")
+    args_parser.add_argument("--no-thumbnails", action="store_true", help="Не створювати мініатюри в save_to_db")
+    args_parser.add_argument("--output", default=RESULTS_FILE, help="Файл результатів")
+    args_parser.add_argument("--compare", nargs="?", const=BASELINE_FILE, help="Порівняти з базовими результатами")
+    args_parser.add_argument("--tolerance", type=float, default=0.2, help="Допустиме погіршення (0.2 = 20%%)")
+    args_parser.add_argument("--update-baseline", action="store_true", help="Зберегти результати як базові")
+    args_parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args_parser.add_argument("--fixture", help=argparse.SUPPRESS)
+    args_parser.add_argument("--media-base", help=argparse.SUPPRESS)
+    args = args_parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    generate_synthetic(args.sizes)
+    env = dict(os.environ, LOG_LEVEL=os.getenv("LOG_LEVEL", "WARNING"))
+    if args.no_thumbnails:
+        env["THUMBNAILS_ENABLED"] = "False"
+
+    server = None
+    if "save_to_db" in args.scenarios:
+        from image_server import ImageServer
+
+        server = ImageServer(latency=args.latency, jitter=args.jitter).start()
+        print(f"Сервер зображень: {server.base_url}, {len(server.images)} зображень, затримка {args.latency} с")
+
+    results, failures = [], []
+    try:
+        for scenario, fixture in plan(args.scenarios, args.sizes):
+            label = f"{scenario} [{fixture['source']} {fixture['kind']}/{fixture['format']} {fixture['items']}]"
+            try:
+                result = measure(scenario, fixture, args.repeat, server.base_url if server else None, env)
+            except Exception as e:
+                print(f"{label}: помилка - {str(e)}")
+                failures.append({"scenario": scenario, "source": fixture["source"], "kind": fixture["kind"],
+                                 "format": fixture["format"], "size": fixture["items"], "error": str(e)})
+                continue
+            results.append(result)
+            print(f"{label}: p50 {result['p50_ms']:.1f} мс, p99 {result['p99_ms']:.1f} мс, "
+                  f"{result['items_per_second']} елементів/с, пік RSS {result['peak_rss_mb']} МБ")
+    finally:
+        if server:
+            server.stop()
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {"repeat": args.repeat, "latency": args.latency, "jitter": args.jitter,
+                     "thumbnails": not args.no_thumbnails},
+        "results": results,
+        "failures": failures,
+    }
+    paths = [args.output]
+    if args.update_baseline:
+        if failures:
+            print("Базові результати не оновлено: частина вимірювань завершилась помилкою")
+        else:
+            paths.append(BASELINE_FILE)
+    for path in paths:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Результати збережено у {path}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance, failures, args.scenarios, args.sizes)
+        if regressions:
+            print(f"Регресії відносно {args.compare} (допуск {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"Регресій відносно {args.compare} не знайдено")
+    elif failures:
+        print(f"Вимірювань з помилкою: {len(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
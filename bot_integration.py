@@ -19,19 +19,12 @@ from dotenv import load_dotenv
 # Імпортуємо функції з наших модулів
 from selen import get_page_with_pagination
 from parser import main_parser, init_db
+from log_config import setup_logging
+from run_metrics import record_run
 
 # Завантажуємо змінні середовища
 load_dotenv()
 
-# Налаштування логування
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("bot_integration.log", encoding="utf-8")
-    ]
-)
 logger = logging.getLogger("InstagramBot")
 
 # Отримуємо налаштування з .env
@@ -39,6 +32,7 @@ WEBSITE_API_URL = os.getenv("WEBSITE_API_URL")
 API_KEY = os.getenv("API_KEY")
 UPDATE_INTERVAL = int(os.getenv("UPDATE_INTERVAL", "3600"))  # За замовчуванням 1 година
 DB_PATH = os.getenv("DB_PATH", "instagram_data.db")
+INCREMENTAL_SCRAPE = os.getenv("INCREMENTAL_SCRAPE", "True").lower() == "true"  # Обробляти лише нові пости
 
 def get_last_update_time():
     """Отримує час останнього оновлення з файлу"""
@@ -64,13 +58,14 @@ def save_last_update_time():
 def get_new_content():
     """Отримує новий контент з Instagram"""
     try:
-        # Запускаємо скрапінг
-        logger.info("Запуск скрапінгу Instagram...")
-        get_page_with_pagination()
-        
-        # Запускаємо парсинг
-        logger.info("Запуск парсингу HTML...")
-        main_parser()
+        with record_run("default"):
+            # Запускаємо скрапінг
+            logger.info("Запуск скрапінгу Instagram...")
+            get_page_with_pagination(incremental=INCREMENTAL_SCRAPE)
+            
+            # Запускаємо парсинг
+            logger.info("Запуск парсингу HTML...")
+            main_parser(incremental=INCREMENTAL_SCRAPE)
         
         logger.info("Отримання контенту завершено успішно")
         return True
@@ -174,4 +169,5 @@ def main():
         logger.error("Не вдалося отримати новий контент")
 
 if __name__ == "__main__":
+    setup_logging("bot_integration.log")
     main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Пул з'єднань з базами даних акаунтів
+
+Для кожної бази даних акаунту тримається невеликий пул відкритих з'єднань SQLite,
+тому веб-інтерфейс не відкриває нове з'єднання на кожен запит. Схема бази
+перевіряється один раз при створенні пулу, а не при кожному запиті.
+
+Бази працюють у режимі WAL: читачі веб-інтерфейсу не блокуються довгою
+транзакцією запису скрапера, а скрапер не чекає на читачів.
+
+Приклад використання:
+```python
+from db_pool import db_connection
+
+with db_connection("dliavsikhta") as conn:
+    rows = conn.execute("SELECT * FROM posts LIMIT 10").fetchall()
+```
+"""
+
+import os
+import queue
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+
+from accounts_config import get_account_config, get_all_accounts
+
+logger = logging.getLogger("DBPool")
+
+# Налаштування пулу та SQLite (можна перевизначити через .env)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))  # З'єднань на одну базу
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # Очікування вільного з'єднання, секунди
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(128 * 1024 * 1024)))
+
+
+def configure_connection(conn):
+    """Налаштовує з'єднання SQLite: режим WAL та прагми для швидкого читання
+
+    Режим WAL зберігається у файлі бази, тому достатньо ввімкнути його один раз,
+    а інші прагми діють лише для поточного з'єднання.
+
+    Args:
+        conn (sqlite3.Connection): З'єднання з базою даних
+
+    Returns:
+        sqlite3.Connection: Те саме з'єднання
+    """
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+class ConnectionPool:
+    """Пул з'єднань з однією базою даних
+
+    З'єднання створюються за потреби, але не більше size одночасно. Після
+    використання з'єднання повертається в пул; незавершена транзакція
+    відкочується, щоб наступний користувач отримав чисте з'єднання.
+    """
+
+    def __init__(self, database_name, size=None):
+        self.database_name = database_name
+        self.size = size or DB_POOL_SIZE
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _create(self):
+        conn = sqlite3.connect(self.database_name, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return configure_connection(conn)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"Пул з'єднань з {self.database_name} закрито")
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+
+        if create:
+            try:
+                return self._create()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=DB_POOL_TIMEOUT)
+        except queue.Empty:
+            raise TimeoutError(f"Немає вільного з'єднання з {self.database_name} за {DB_POOL_TIMEOUT} с")
+
+    def _release(self, conn, broken=False):
+        if conn.in_transaction:
+            conn.rollback()
+        if broken or self._closed:
+            conn.close()
+            with self._lock:
+                self._created -= 1
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Видає з'єднання з пулу на час блоку with
+
+        Yields:
+            sqlite3.Connection: З'єднання з row_factory = sqlite3.Row
+        """
+        conn = self._acquire()
+        broken = False
+        try:
+            yield conn
+        except sqlite3.DatabaseError:
+            broken = True
+            raise
+        finally:
+            self._release(conn, broken)
+
+    def close(self):
+        """Закриває всі вільні з'єднання; зайняті закриються при поверненні"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _ensure_schema(database_name):
+    """Створює базу та застосовує до неї нові міграції схеми"""
+    from db_schema import migrate_database
+
+    migrate_database(database_name)
+
+
+def get_pool(account_username="default"):
+    """Повертає пул з'єднань з базою акаунту, створюючи його за потреби
+
+    При створенні пулу один раз перевіряється схема бази.
+
+    Args:
+        account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
+
+    Returns:
+        ConnectionPool: Пул з'єднань
+    """
+    database_name = get_account_config(account_username)["database"]
+    pool = _pools.get(database_name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(database_name)
+            if pool is None:
+                _ensure_schema(database_name)
+                pool = ConnectionPool(database_name)
+                _pools[database_name] = pool
+                logger.info(f"Створено пул з'єднань ({pool.size}) для бази {database_name}")
+    return pool
+
+
+@contextmanager
+def db_connection(account_username="default"):
+    """Видає з'єднання з базою акаунту з пулу на час блоку with
+
+    Args:
+        account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
+
+    Yields:
+        sqlite3.Connection: З'єднання з row_factory = sqlite3.Row
+    """
+    with get_pool(account_username).connection() as conn:
+        yield conn
+
+
+def init_pools():
+    """Створює пули та оновлює схеми баз усіх акаунтів (викликається при запуску)"""
+    for account in get_all_accounts():
+        get_pool(account["username"])
+
+
+def close_pools():
+    """Закриває всі пули з'єднань"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
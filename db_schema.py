@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Схема баз даних акаунтів та її версійні міграції
+
+Схема описується лише тут: послідовністю пронумерованих міграцій. Номер
+останньої застосованої міграції зберігається в самій базі (PRAGMA user_version),
+тому для актуальної бази перевірка схеми - це одне читання заголовка файлу, а
+нові індекси та стовпці безпечно додаються до існуючих робочих баз.
+
+Кожна міграція виконується в окремій транзакції разом зі зміною user_version.
+Міграції написані так, щоб їх можна було застосувати до старих баз, створених
+до появи версій (user_version = 0), де частина схеми вже існує.
+
+Міграції застосовуються один раз при запуску веб-інтерфейсу (db_pool.init_pools)
+та при відкритті бази парсером (parser.init_db).
+
+Приклад використання:
+```bash
+python db_schema.py             # застосувати міграції до баз усіх акаунтів
+python db_schema.py --status    # показати версії схеми баз
+```
+
+Щоб змінити схему, додайте нову функцію міграції в кінець MIGRATIONS.
+Застосовані міграції змінювати не можна.
+"""
+
+import os
+import sqlite3
+import logging
+import argparse
+
+from accounts_config import get_all_accounts
+from db_pool import configure_connection
+from func.f_media import get_media_key
+from log_config import setup_logging
+
+logger = logging.getLogger("DBSchema")
+
+
+def _migration_create_posts(conn, account_username):
+    """Таблиця posts; старим таблицям додаються стовпці local_path та account"""
+    cursor = conn.cursor()
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS posts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        post_type TEXT,
+        media_url TEXT,
+        description TEXT,
+        timestamp TEXT,
+        username TEXT,
+        is_video INTEGER,
+        parsed_date TEXT,
+        local_path TEXT,
+        account TEXT,
+        media_key TEXT
+    )
+    ''')
+
+    columns = _table_columns(conn, "posts")
+    if "local_path" not in columns:
+        logger.info("Додаємо стовпець local_path до таблиці posts")
+        cursor.execute("ALTER TABLE posts ADD COLUMN local_path TEXT")
+    if "account" not in columns:
+        logger.info(f"Додаємо стовпець account до таблиці posts (записи належать акаунту {account_username})")
+        cursor.execute("ALTER TABLE posts ADD COLUMN account TEXT")
+        cursor.execute("UPDATE posts SET account = ?", (account_username,))
+
+
+def _migration_media_key(conn, account_username):
+    """Стовпець media_key з унікальним індексом
+
+    Для існуючих записів ключ обчислюється з media_url. Якщо кілька записів мають
+    однаковий ключ (дублікати з різними підписами URL), ключ отримує лише найстаріший.
+    """
+    cursor = conn.cursor()
+    if "media_key" not in _table_columns(conn, "posts"):
+        logger.info("Додаємо стовпець media_key до таблиці posts")
+        cursor.execute("ALTER TABLE posts ADD COLUMN media_key TEXT")
+
+    cursor.execute("SELECT id, media_url FROM posts WHERE media_key IS NULL ORDER BY id")
+    rows = cursor.fetchall()
+    if rows:
+        cursor.execute("SELECT media_key FROM posts WHERE media_key IS NOT NULL")
+        seen_keys = {row[0] for row in cursor.fetchall()}
+        updates = []
+        for post_id, media_url in rows:
+            media_key = get_media_key(media_url)
+            if media_key and media_key not in seen_keys:
+                seen_keys.add(media_key)
+                updates.append((media_key, post_id))
+        cursor.executemany("UPDATE posts SET media_key = ? WHERE id = ?", updates)
+        logger.info(f"Заповнено media_key для {len(updates)} записів")
+
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_posts_media_key ON posts(media_key)")
+
+
+def _migration_indexes(conn, account_username):
+    """Індекси для пошуку дублікатів, статистики та сторінки постів"""
+    cursor = conn.cursor()
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_posts_media_url ON posts(media_url)")
+    # Покриваючий індекс для статистики (post_stats): запит не звертається до таблиці
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_posts_stats ON posts(account, post_type, parsed_date, local_path)")
+    # Індекс для пагінації сторінки постів за курсором (parsed_date, id)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_posts_feed ON posts(account, post_type, parsed_date, id)")
+    # Індекс (account, post_type) є префіксом індексу статистики
+    cursor.execute("DROP INDEX IF EXISTS idx_posts_account_type")
+
+
+def _migration_fts(conn, account_username):
+    """Повнотекстовий індекс FTS5 за описами постів та тригери його синхронізації
+
+    Індекс posts_fts зберігає лише токени (external content), самі описи читаються
+    з таблиці posts. Токенізатор unicode61 коректно обробляє кирилицю та регістр,
+    а remove_diacritics 2 дозволяє знаходити "cafe" за запитом "café".
+    """
+    cursor = conn.cursor()
+    if "posts_fts" in _table_names(conn):
+        return
+
+    try:
+        cursor.execute('''
+        CREATE VIRTUAL TABLE posts_fts USING fts5(
+            description,
+            content='posts',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        ''')
+    except sqlite3.OperationalError as e:
+        # Версія схеми все одно збільшується: /search без posts_fts шукає через LIKE (post_search)
+        logger.warning(f"Повнотекстовий пошук недоступний (FTS5 не підтримується), "
+                       f"пошук виконуватиметься через LIKE: {str(e)}")
+        return
+
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, description) VALUES (new.id, new.description);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, description) VALUES ('delete', old.id, old.description);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF description ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, description) VALUES ('delete', old.id, old.description);
+        INSERT INTO posts_fts(rowid, description) VALUES (new.id, new.description);
+    END
+    ''')
+
+    # Індексуємо пости, що вже є в базі
+    cursor.execute("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
+    logger.info("Створено повнотекстовий індекс posts_fts")
+
+
+def _migration_run_metrics(conn, account_username):
+    """Таблиці підсумків запусків та накопичених метрик етапів (run_metrics)"""
+    cursor = conn.cursor()
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id TEXT NOT NULL,
+        account TEXT NOT NULL,
+        started_at TEXT,
+        finished_at TEXT,
+        seconds REAL,
+        status TEXT,
+        stages TEXT,
+        PRIMARY KEY (run_id, account)
+    )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_account ON runs(account, started_at)")
+    # Лічильники всіх запусків: /metrics читає кілька рядків замість історії запусків
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS stage_metrics (
+        account TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        calls INTEGER NOT NULL DEFAULT 0,
+        errors INTEGER NOT NULL DEFAULT 0,
+        seconds REAL NOT NULL DEFAULT 0,
+        bytes INTEGER NOT NULL DEFAULT 0,
+        items INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (account, stage)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS stage_buckets (
+        account TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        le REAL NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (account, stage, le)
+    )
+    ''')
+
+
+# Міграції у порядку застосування: версія схеми = позиція в списку (з 1)
+MIGRATIONS = [
+    _migration_create_posts,
+    _migration_media_key,
+    _migration_indexes,
+    _migration_fts,
+    _migration_run_metrics,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def _table_columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _table_names(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def get_schema_version(conn):
+    """Повертає версію схеми бази (кількість застосованих міграцій)
+
+    Args:
+        conn (sqlite3.Connection): З'єднання з базою даних
+
+    Returns:
+        int: Значення PRAGMA user_version
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn, account_username="default"):
+    """Застосовує до бази міграції, яких у ній ще немає
+
+    Кожна міграція виконується в транзакції BEGIN IMMEDIATE, тому два процеси,
+    що одночасно відкривають стару базу, не застосують одну міграцію двічі.
+
+    Args:
+        conn (sqlite3.Connection): З'єднання з базою даних без відкритої транзакції
+        account_username (str, optional): Акаунт, якому належать записи старих баз без стовпця account.
+            Defaults to "default".
+
+    Returns:
+        int: Кількість застосованих міграцій
+    """
+    if get_schema_version(conn) >= SCHEMA_VERSION:
+        return 0
+
+    applied = 0
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Версію перечитуємо під блокуванням: міграцію міг застосувати інший процес
+            version = get_schema_version(conn)
+            if version >= SCHEMA_VERSION:
+                conn.rollback()
+                break
+            migration = MIGRATIONS[version]
+            logger.info(f"Міграція схеми {version + 1}: {migration.__doc__.splitlines()[0]}")
+            migration(conn, account_username)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.commit()
+            applied += 1
+        except Exception:
+            conn.rollback()
+            raise
+    return applied
+
+
+def get_database_account(database_name):
+    """Повертає акаунт, якому належить база
+
+    Args:
+        database_name (str): Шлях до файлу бази даних
+
+    Returns:
+        str: Ім'я акаунту або "default", якщо базу використовує кілька акаунтів
+    """
+    owners = [account["username"] for account in get_all_accounts() if account["database"] == database_name]
+    return owners[0] if len(owners) == 1 else "default"
+
+
+def migrate_database(database_name, account_username=None):
+    """Відкриває базу акаунту, створюючи її за потреби, та оновлює схему
+
+    Args:
+        database_name (str): Шлях до файлу бази даних
+        account_username (str, optional): Акаунт, якому належать записи старих баз.
+            Defaults to None (визначається за accounts_config).
+
+    Returns:
+        int: Кількість застосованих міграцій
+    """
+    directory = os.path.dirname(os.path.abspath(database_name))
+    os.makedirs(directory, exist_ok=True)
+
+    conn = configure_connection(sqlite3.connect(database_name))
+    try:
+        version = get_schema_version(conn)
+        applied = apply_migrations(conn, account_username or get_database_account(database_name))
+    finally:
+        conn.close()
+    if applied:
+        logger.info(f"Схему бази {database_name} оновлено з версії {version} до {version + applied}")
+    return applied
+
+
+def migrate_all_accounts():
+    """Оновлює схему баз даних усіх акаунтів з accounts_config
+
+    Returns:
+        dict: База даних -> кількість застосованих міграцій або None у разі помилки
+    """
+    results = {}
+    for account in get_all_accounts():
+        database_name = account["database"]
+        if database_name in results:
+            continue
+        try:
+            results[database_name] = migrate_database(database_name)
+        except sqlite3.Error as e:
+            logger.error(f"Помилка міграції бази {database_name}: {str(e)}")
+            results[database_name] = None
+    return results
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description="Міграції схеми баз даних акаунтів")
+    args_parser.add_argument("--status", action="store_true", help="Показати версії схеми без змін")
+    args = args_parser.parse_args()
+
+    if args.status:
+        for account in get_all_accounts():
+            database_name = account["database"]
+            if not os.path.exists(database_name):
+                logger.info(f"{account['username']}: база {database_name} не існує")
+                continue
+            conn = sqlite3.connect(database_name)
+            try:
+                version = get_schema_version(conn)
+            finally:
+                conn.close()
+            logger.info(f"{account['username']}: {database_name}, версія схеми {version} з {SCHEMA_VERSION}")
+        return
+
+    for database_name, applied in migrate_all_accounts().items():
+        if applied is None:
+            logger.error(f"{database_name}: міграцію не виконано")
+        else:
+            logger.info(f"{database_name}: застосовано міграцій {applied}, версія схеми {SCHEMA_VERSION}")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Потоковий експорт постів у JSON, NDJSON та CSV
+
+Рядки читаються з бази частинами (cursor.fetchmany) і одразу перетворюються в
+частини відповіді, тому пам'ять не залежить від розміру таблиці, а тимчасові
+файли не створюються. За потреби потік стискається в gzip на льоту.
+
+Приклад використання:
+```python
+from export_stream import stream_export
+
+with open("reels.ndjson.gz", "wb") as f:
+    for chunk in stream_export("ndjson", "dliavsikhta", post_type="reel", date_from="2025-01-01", compress=True):
+        f.write(chunk)
+```
+"""
+
+import os
+import io
+import csv
+import json
+import zlib
+import logging
+
+from db_pool import db_connection
+from federated import ALL_ACCOUNTS, iter_federated_posts
+
+logger = logging.getLogger("ExportStream")
+
+# Кількість рядків, що читаються з бази за один раз
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "500"))
+
+# Формат -> (MIME тип, розширення файлу)
+EXPORT_FORMATS = {
+    "json": ("application/json", "json"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+
+def build_filters(account="default", post_type=None, date_from=None, date_to=None):
+    """Формує умову WHERE та параметри для фільтрів експорту
+
+    Args:
+        account (str, optional): Ім'я акаунту Instagram або None для всіх. Defaults to "default".
+        post_type (str, optional): Тип постів (post, reel). Defaults to None (усі).
+        date_from (str, optional): Початкова дата парсингу (YYYY-MM-DD), включно. Defaults to None.
+        date_to (str, optional): Кінцева дата парсингу (YYYY-MM-DD), включно. Defaults to None.
+
+    Returns:
+        tuple: Рядок умови та список параметрів
+    """
+    conditions = []
+    params = []
+    if account:
+        conditions.append("account = ?")
+        params.append(account)
+    if post_type in ("post", "reel"):
+        conditions.append("post_type = ?")
+        params.append(post_type)
+    if date_from:
+        conditions.append("parsed_date >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("parsed_date < date(?, '+1 day')")
+        params.append(date_to)
+    return " AND ".join(conditions) or "1", params
+
+
+def iter_rows(account="default", post_type=None, date_from=None, date_to=None, fetch_size=None):
+    """Читає відфільтровані пости з бази частинами
+
+    З'єднання з пулу утримується лише поки генератор не вичерпано або не закрито.
+    Для account="all" пости читаються з баз усіх акаунтів (federated).
+
+    Args:
+        account (str, optional): Ім'я акаунту Instagram або "all". Defaults to "default".
+        post_type (str, optional): Тип постів (post, reel). Defaults to None (усі).
+        date_from (str, optional): Початкова дата парсингу, включно. Defaults to None.
+        date_to (str, optional): Кінцева дата парсингу, включно. Defaults to None.
+        fetch_size (int, optional): Рядків за один fetchmany. Defaults to EXPORT_FETCH_SIZE.
+
+    Yields:
+        tuple: Спочатку список назв стовпців, потім кортежі значень рядків
+    """
+    if account == ALL_ACCOUNTS:
+        where, params = build_filters(None, post_type, date_from, date_to)
+        yield from iter_federated_posts(where, params)
+        return
+
+    where, params = build_filters(account, post_type, date_from, date_to)
+    with db_connection(account) as conn:
+        cursor = conn.execute(f"SELECT * FROM posts WHERE {where} ORDER BY id", params)
+        yield [description[0] for description in cursor.description]
+        while True:
+            rows = cursor.fetchmany(fetch_size or EXPORT_FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                yield tuple(row)
+
+
+def _iter_json(rows):
+    columns = next(rows)
+    yield "["
+    separator = "\n"
+    for row in rows:
+        yield separator + json.dumps(dict(zip(columns, row)), ensure_ascii=False)
+        separator = ",\n"
+    yield "\n]\n"
+
+
+def _iter_ndjson(rows):
+    columns = next(rows)
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n"
+
+
+def _iter_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+_WRITERS = {"json": _iter_json, "ndjson": _iter_ndjson, "csv": _iter_csv}
+
+
+def _batched(chunks, size=64 * 1024):
+    """Об'єднує дрібні частини в блоки приблизно заданого розміру"""
+    parts = []
+    total = 0
+    for chunk in chunks:
+        parts.append(chunk)
+        total += len(chunk)
+        if total >= size:
+            yield b"".join(parts)
+            parts = []
+            total = 0
+    if parts:
+        yield b"".join(parts)
+
+
+def _gzip(chunks):
+    """Стискає потік байтів у формат gzip на льоту"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(fmt, account="default", post_type=None, date_from=None, date_to=None, compress=False):
+    """Повертає генератор частин експорту у заданому форматі
+
+    Args:
+        fmt (str): Формат (json, ndjson, csv)
+        account (str, optional): Ім'я акаунту Instagram або "all". Defaults to "default".
+        post_type (str, optional): Тип постів (post, reel). Defaults to None (усі).
+        date_from (str, optional): Початкова дата парсингу, включно. Defaults to None.
+        date_to (str, optional): Кінцева дата парсингу, включно. Defaults to None.
+        compress (bool, optional): Стискати потік у gzip. Defaults to False.
+
+    Returns:
+        generator: Частини відповіді в байтах
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Непідтримуваний формат експорту: {fmt}")
+
+    logger.info(f"Потоковий експорт {fmt}{' (gzip)' if compress else ''} для акаунту {account}")
+    rows = iter_rows(account, post_type, date_from, date_to)
+    chunks = _batched(part.encode("utf-8") for part in _WRITERS[fmt](rows))
+    return _gzip(chunks) if compress else chunks
+
+
+def export_filename(fmt, account, post_type, timestamp, compress=False):
+    """Формує ім'я файлу експорту
+
+    Args:
+        fmt (str): Формат (json, ndjson, csv)
+        account (str): Ім'я акаунту Instagram
+        post_type (str): Тип постів (post, reel) або None
+        timestamp (str): Мітка часу для імені файлу
+        compress (bool, optional): Чи стиснений файл. Defaults to False.
+
+    Returns:
+        str: Ім'я файлу
+    """
+    suffix = f"_{post_type}" if post_type in ("post", "reel") else ""
+    name = f"instagram_export_{account}{suffix}_{timestamp}.{EXPORT_FORMATS[fmt][1]}"
+    return name + ".gz" if compress else name
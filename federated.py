@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Запити одразу до баз даних усіх акаунтів
+
+Кожен акаунт зберігає пости в окремому файлі бази. Цей модуль приєднує
+(ATTACH) бази акаунтів до одного з'єднання і виконує той самий запит по всіх
+них як UNION ALL за один прохід, замість відкриття окремого з'єднання для
+кожного акаунту в циклі. SQLite дозволяє приєднати обмежену кількість баз
+(за замовчуванням 10), тому бази обробляються пакетами.
+
+Приклад використання:
+```python
+from federated import federated_stats, federated_search
+
+for row in federated_stats():
+    print(row["account"], row["total_posts"])
+
+posts = federated_search("карате", limit=20)
+```
+"""
+
+import os
+import heapq
+import sqlite3
+import logging
+from contextlib import contextmanager
+
+from accounts_config import get_account_config, get_all_accounts
+from post_stats import STATS_AGGREGATES
+
+logger = logging.getLogger("Federated")
+
+# Значення параметра account, що означає всі акаунти
+ALL_ACCOUNTS = "all"
+
+# Стовпці таблиці posts у фіксованому порядку (у старих базах порядок може відрізнятися)
+POST_COLUMNS = ["id", "post_type", "media_url", "description", "timestamp", "username",
+                "is_video", "parsed_date", "local_path", "account", "media_key"]
+
+# Скільки баз приєднувати до одного з'єднання (не більше ліміту SQLITE_LIMIT_ATTACHED)
+FEDERATED_ATTACH_BATCH = int(os.getenv("FEDERATED_ATTACH_BATCH", "10"))
+
+# Кількість рядків, що читаються з бази за один раз
+FEDERATED_FETCH_SIZE = int(os.getenv("FEDERATED_FETCH_SIZE", "500"))
+
+
+def get_account_databases(accounts=None):
+    """Повертає файли баз даних обраних акаунтів
+
+    Акаунти, що використовують одну базу, об'єднуються, а бази, яких ще немає
+    на диску, пропускаються.
+
+    Args:
+        accounts (list, optional): Імена акаунтів. Defaults to None (усі акаунти).
+
+    Returns:
+        list: Шляхи до файлів баз даних
+    """
+    usernames = accounts or [account["username"] for account in get_all_accounts()]
+    databases = []
+    for username in usernames:
+        database_name = get_account_config(username)["database"]
+        if database_name not in databases and os.path.exists(database_name):
+            databases.append(database_name)
+    return databases
+
+
+@contextmanager
+def attached(databases):
+    """Відкриває з'єднання з приєднаними базами лише для читання
+
+    Args:
+        databases (list): Шляхи до файлів баз, не більше FEDERATED_ATTACH_BATCH
+
+    Yields:
+        tuple: З'єднання та список псевдонімів приєднаних баз (db0, db1, ...)
+    """
+    if len(databases) > _attach_limit():
+        raise ValueError(f"Не можна приєднати більше {_attach_limit()} баз до одного з'єднання")
+    conn = sqlite3.connect("file::memory:", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        aliases = []
+        for index, database_name in enumerate(databases):
+            alias = f"db{index}"
+            path = os.path.abspath(database_name).replace("?", "%3f").replace("#", "%23")
+            conn.execute(f"ATTACH DATABASE ? AS {alias}", (f"file:{path}?mode=ro",))
+            aliases.append(alias)
+        yield conn, aliases
+    finally:
+        conn.close()
+
+
+def _attach_limit():
+    """Повертає кількість баз, які можна приєднати до одного з'єднання"""
+    conn = sqlite3.connect(":memory:")
+    try:
+        return max(1, min(FEDERATED_ATTACH_BATCH, conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)))
+    finally:
+        conn.close()
+
+
+def _batches(databases):
+    size = _attach_limit()
+    for start in range(0, len(databases), size):
+        yield databases[start:start + size]
+
+
+def iter_federated(select, where="1", params=(), group_by=None, order_by=None, limit=None, accounts=None,
+                   source="{alias}.posts"):
+    """Виконує запит до таблиці posts усіх баз як UNION ALL
+
+    Для кожної приєднаної бази формується підзапит
+    "SELECT <select> FROM dbN.posts WHERE <where>" з тими самими параметрами.
+    Якщо задано accounts, до умови додається фільтр за акаунтом, бо одна база
+    може містити записи кількох акаунтів. Якщо задано order_by, результати
+    пакетів зливаються з збереженням порядку.
+
+    Args:
+        select (str): Список виразів SELECT
+        where (str, optional): Умова WHERE. Defaults to "1".
+        params (tuple, optional): Параметри умови WHERE. Defaults to ().
+        group_by (str, optional): GROUP BY для кожного підзапиту. Defaults to None.
+        order_by (list, optional): Пари (назва стовпця результату, DESC?). Defaults to None.
+        limit (int, optional): Максимальна кількість рядків. Defaults to None.
+        accounts (list, optional): Імена акаунтів. Defaults to None (усі акаунти).
+        source (str, optional): Вираз FROM з підстановкою {alias}. Defaults to "{alias}.posts".
+
+    Yields:
+        sqlite3.Row: Рядки результату
+    """
+    if accounts:
+        where = f"({where}) AND account IN ({', '.join('?' * len(accounts))})"
+        params = tuple(params) + tuple(accounts)
+
+    def run_batch(batch):
+        with attached(batch) as (conn, aliases):
+            group = f" GROUP BY {group_by}" if group_by else ""
+            query = " UNION ALL ".join(
+                f"SELECT {select} FROM {source.format(alias=alias)} WHERE {where}{group}" for alias in aliases
+            )
+            query_params = list(params) * len(aliases)
+            if order_by:
+                query += " ORDER BY " + ", ".join(f"{column} {'DESC' if desc else 'ASC'}" for column, desc in order_by)
+            if limit:
+                query += " LIMIT ?"
+                query_params.append(limit)
+            cursor = conn.execute(query, query_params)
+            while True:
+                rows = cursor.fetchmany(FEDERATED_FETCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+
+    batches = list(_batches(get_account_databases(accounts)))
+    if len(batches) <= 1 or not order_by:
+        count = 0
+        for batch in batches:
+            for row in run_batch(batch):
+                yield row
+                count += 1
+                if limit and count >= limit:
+                    return
+        return
+
+    # Кожен пакет вже впорядкований, тому зливаємо їх без повного сортування в пам'яті
+    def sort_key(row):
+        return tuple(_Descending(row[column]) if desc else _Ascending(row[column]) for column, desc in order_by)
+
+    merged = heapq.merge(*(run_batch(batch) for batch in batches), key=sort_key)
+    for count, row in enumerate(merged, 1):
+        yield row
+        if limit and count >= limit:
+            return
+
+
+class _Ascending:
+    """Ключ сортування, для якого NULL менший за будь-яке значення (як у SQLite)"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        if self.value is None or other.value is None:
+            return self.value is None and other.value is not None
+        return self.value < other.value
+
+
+class _Descending(_Ascending):
+    def __lt__(self, other):
+        return _Ascending.__lt__(other, self)
+
+
+def federated_stats(accounts=None):
+    """Рахує статистику всіх акаунтів одним запитом на пакет баз
+
+    Args:
+        accounts (list, optional): Імена акаунтів. Defaults to None (усі акаунти).
+
+    Returns:
+        list: Словники статистики для кожного акаунту в базах
+    """
+    rows = iter_federated(f"account, {STATS_AGGREGATES}", group_by="account", accounts=accounts)
+
+    # Акаунт може мати записи в кількох базах (наприклад, старі записи в базі за замовчуванням)
+    stats = {}
+    for row in rows:
+        entry = stats.get(row["account"])
+        if entry is None:
+            stats[row["account"]] = dict(row)
+            continue
+        for key in ("total_posts", "regular_posts", "reels", "local_images"):
+            entry[key] += row[key]
+        entry["last_update"] = max(entry["last_update"], row["last_update"])
+    return list(stats.values())
+
+
+def federated_search(text, accounts=None, post_type=None, limit=50):
+    """Шукає пости за текстом опису в усіх акаунтах
+
+    Args:
+        text (str): Текст для пошуку
+        accounts (list, optional): Імена акаунтів. Defaults to None (усі акаунти).
+        post_type (str, optional): Тип постів (post, reel). Defaults to None (усі).
+        limit (int, optional): Максимальна кількість результатів. Defaults to 50.
+
+    Returns:
+        list: Словники постів, від новіших до старших
+    """
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    where = "description LIKE ? ESCAPE '\\'"
+    params = [f"%{escaped}%"]
+    if post_type in ("post", "reel"):
+        where += " AND post_type = ?"
+        params.append(post_type)
+    rows = iter_federated(", ".join(POST_COLUMNS), where, params,
+                          order_by=[("parsed_date", True), ("id", True)], limit=limit, accounts=accounts)
+    return [dict(row) for row in rows]
+
+
+def iter_federated_posts(where="1", params=(), accounts=None):
+    """Повертає пости всіх акаунтів для експорту
+
+    Args:
+        where (str, optional): Умова WHERE. Defaults to "1".
+        params (tuple, optional): Параметри умови. Defaults to ().
+        accounts (list, optional): Імена акаунтів. Defaults to None (усі акаунти).
+
+    Yields:
+        tuple: Спочатку список назв стовпців, потім кортежі значень рядків
+    """
+    yield list(POST_COLUMNS)
+    for row in iter_federated(", ".join(POST_COLUMNS), where, params, accounts=accounts):
+        yield tuple(row)
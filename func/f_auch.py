@@ -1,14 +1,17 @@
 import os
+import json
 from time import sleep
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
 # Абсолютний імпорт з пакету func
 from func.f_time import random_sleep
+from func.f_media import get_media_key
+from run_metrics import timed_stage, stage_add, stage_failed
 import logging
-from datetime import datetime
 import time
 import os
 from dotenv import load_dotenv
@@ -19,9 +22,33 @@ load_dotenv()
 # Ініціалізуємо логер
 logger = logging.getLogger(__name__)
 
-def init_selenium():
+# Налаштування адаптивного скролу
+SCROLL_MAX_SCROLLS = int(os.getenv('SCROLL_MAX_SCROLLS', '30'))  # Верхня межа кількості скролів
+SCROLL_IDLE_LIMIT = int(os.getenv('SCROLL_IDLE_LIMIT', '3'))  # Скролів без нового контенту до зупинки
+SCROLL_WAIT_TIMEOUT = float(os.getenv('SCROLL_WAIT_TIMEOUT', '6'))  # Очікування нового контенту, секунди
+SCROLL_PINNED_ITEMS = int(os.getenv('SCROLL_PINNED_ITEMS', '3'))  # Перші медіа сітки (закріплені), що не зупиняють скрол
+SCROLL_STOP_KNOWN = int(os.getenv('SCROLL_STOP_KNOWN', '3'))  # Відомих медіа поспіль у кінці сітки для зупинки
+
+# Перехоплення JSON/GraphQL відповідей стрічки через журнал продуктивності Chrome (CDP)
+CAPTURE_JSON = os.getenv('CAPTURE_JSON', 'False').lower() == 'true'
+CAPTURE_URL_MARKERS = ("/graphql/query", "/api/graphql", "/api/v1/feed/", "/api/v1/clips/")
+
+# Поточний стан стрічки: висота сторінки та кількість медіа
+SNAPSHOT_JS = "return [document.body.scrollHeight, document.querySelectorAll('img, video').length];"
+
+# src медіа в сітці постів/reels (без аватара та обкладинок highlights)
+GRID_MEDIA_JS = """
+let items = document.querySelectorAll('a[href*="/p/"] img, a[href*="/reel/"] img, a[href*="/reel/"] video');
+if (!items.length) { items = document.querySelectorAll('img, video'); }
+return Array.from(items, e => e.getAttribute('src')).filter(Boolean);
+"""
+
+@timed_stage("init_selenium")
+def init_selenium(user_data_dir=None):
     """
     Ініціалізує драйвер Selenium
+    :param user_data_dir: Директорія профілю Chrome; cookie в ній зберігаються між запусками
+    :return: driver
     """
     options = Options()
     
@@ -41,12 +68,42 @@ def init_selenium():
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--disable-blink-features=AutomationControlled")
     
+    if CAPTURE_JSON:
+        # Події мережі Chrome потрапляють у журнал performance, звідки їх читає collect_json_responses
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        logger.info("Увімкнено перехоплення JSON відповідей Instagram")
+    
+    if user_data_dir:
+        os.makedirs(user_data_dir, exist_ok=True)
+        options.add_argument(f"--user-data-dir={os.path.abspath(user_data_dir)}")
+        logger.info(f"Використовуємо профіль Chrome: {user_data_dir}")
+    
     logger.info("Ініціалізація драйвера Chrome...")
     driver = webdriver.Chrome(options=options)
     logger.info("Драйвер Chrome успішно ініціалізовано")
     return driver
 
 
+def is_logged_in(driver):
+    """
+    Перевіряє, чи збережена в профілі сесія Instagram ще дійсна
+    :param driver: Selenium WebDriver
+    :return: True, якщо повторний вхід не потрібен
+    """
+    try:
+        driver.get("https://www.instagram.com/")
+        WebDriverWait(driver, 15).until(
+            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        )
+        if driver.get_cookie("sessionid") and "accounts/login" not in driver.current_url.lower():
+            logger.info("Знайдено дійсну сесію Instagram, вхід пропущено")
+            return True
+    except Exception as e:
+        logger.info(f"Не вдалося перевірити сесію Instagram: {str(e)}")
+    return False
+
+
+@timed_stage("login_to_instagram", check=bool)
 def login_to_instagram(driver):
     """Авторизація в Instagram"""
     try:
@@ -152,14 +209,155 @@ def login_to_instagram(driver):
     except Exception as e:
         logger.error(f"Загальна помилка при авторизації: {str(e)}")
         return False
-def save_page(driver, url, is_posts=False, is_reels=False):
+class JsonCapture:
+    """
+    Перехоплює JSON відповіді стрічки Instagram з журналу продуктивності Chrome
+    
+    Журнал очищується при кожному читанні, тому collect() треба викликати під час
+    скролу. Тіло відповіді забирається через CDP після події Network.loadingFinished.
+    """
+    
+    def __init__(self, driver):
+        self.driver = driver
+        self.responses = []
+        self._pending = {}  # requestId -> url
+    
+    def collect(self):
+        """
+        Обробляє нові події журналу
+        :return: Кількість нових перехоплених відповідей
+        """
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            logger.warning(f"Журнал продуктивності недоступний: {str(e)}")
+            return 0
+        
+        before = len(self.responses)
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+                method = message.get("method")
+                params = message.get("params", {})
+                if method == "Network.responseReceived":
+                    url = params["response"].get("url", "")
+                    if any(marker in url for marker in CAPTURE_URL_MARKERS):
+                        self._pending[params["requestId"]] = url
+                elif method == "Network.loadingFinished" and params.get("requestId") in self._pending:
+                    url = self._pending.pop(params["requestId"])
+                    body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": params["requestId"]})
+                    self.responses.append({"url": url, "payload": json.loads(body["body"])})
+            except Exception as e:
+                # Тіло відповіді може бути вже недоступним або не JSON
+                logger.debug(f"Пропущено мережеву подію: {str(e)}")
+        
+        captured = len(self.responses) - before
+        if captured:
+            logger.info(f"Перехоплено {captured} JSON відповідей")
+        return captured
+    
+    def save(self, filename):
+        """Зберігає перехоплені відповіді у JSON файл"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.responses, f, ensure_ascii=False)
+        logger.info(f"JSON відповіді сторінки ({len(self.responses)}) збережено у файл: {filename}")
+
+
+def wait_for_growth(driver, last_snapshot, timeout=SCROLL_WAIT_TIMEOUT):
+    """
+    Чекає, поки на сторінці з'явиться новий контент (нові медіа або збільшиться висота)
+    :param driver: Selenium WebDriver
+    :param last_snapshot: Попередній стан [висота, кількість медіа]
+    :param timeout: Максимальний час очікування в секундах
+    :return: Новий стан або None, якщо контент не змінився
+    """
+    def grown(d):
+        snapshot = d.execute_script(SNAPSHOT_JS)
+        if snapshot[0] > last_snapshot[0] or snapshot[1] > last_snapshot[1]:
+            return snapshot
+        return False
+    
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.25).until(grown)
+    except TimeoutException:
+        return None
+
+
+def scroll_feed(driver, max_scrolls=SCROLL_MAX_SCROLLS, idle_limit=SCROLL_IDLE_LIMIT,
+                target_items=None, stop_keys=None, on_scroll=None, stop_known=SCROLL_STOP_KNOWN):
+    """
+    Прокручує стрічку, поки з'являється новий контент
+    :param driver: Selenium WebDriver
+    :param max_scrolls: Верхня межа кількості скролів
+    :param idle_limit: Зупинитися після стількох скролів поспіль без нового контенту
+    :param target_items: Зупинитися, коли в сітці стільки медіа
+    :param stop_keys: Ключі вже відомих медіа; зупинитися, коли сітка закінчується stop_known відомими медіа поспіль
+    :param stop_known: Скільки відомих медіа поспіль у кінці сітки означають, що нові пости вже пройдено
+    :param on_scroll: Викликається після кожного скролу (напр. для перехоплення JSON)
+    :return: Кількість виконаних скролів
+    """
+    def should_stop():
+        if not target_items and not stop_keys:
+            return False
+        sources = driver.execute_script(GRID_MEDIA_JS)
+        if target_items and len(sources) >= target_items:
+            logger.info(f"Досягнуто цільової кількості медіа: {len(sources)}")
+            return True
+        if stop_keys:
+            # Закріплені пости стоять на початку сітки і можуть бути давно відомими, тому
+            # їх пропускаємо і зупиняємось, лише коли відомими є останні медіа сітки
+            known = 0
+            for src in reversed(sources[SCROLL_PINNED_ITEMS:]):
+                if get_media_key(src) not in stop_keys:
+                    break
+                known += 1
+            if known >= stop_known:
+                logger.info(f"Сітка закінчується {known} вже відомими медіа, зупиняємо скрол")
+                return True
+        return False
+    
+    snapshot = driver.execute_script(SNAPSHOT_JS)
+    idle = 0
+    scrolls = 0
+    
+    while scrolls < max_scrolls and not should_stop():
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        scrolls += 1
+        
+        new_snapshot = wait_for_growth(driver, snapshot)
+        if on_scroll:
+            on_scroll()
+        if new_snapshot is None:
+            idle += 1
+            logger.info(f"Скрол {scrolls}: новий контент не з'явився ({idle}/{idle_limit})")
+            if idle >= idle_limit:
+                logger.info("Стрічку вичерпано")
+                break
+            continue
+        
+        idle = 0
+        snapshot = new_snapshot
+        logger.info(f"Скрол {scrolls}: медіа на сторінці {snapshot[1]}")
+    
+    return scrolls
+
+
+@timed_stage("save_page")
+def save_page(driver, url, is_posts=False, is_reels=False, max_scrolls=SCROLL_MAX_SCROLLS,
+              target_items=None, stop_keys=None, filename=None, capture_file=None, on_scroll=None):
     """
     Зберігає HTML сторінки Instagram після скролу
     :param driver: Selenium WebDriver
     :param url: URL сторінки для збереження
     :param is_posts: Чи це сторінка з дописами
     :param is_reels: Чи це сторінка з reels
-    :return: driver
+    :param max_scrolls: Верхня межа кількості скролів
+    :param target_items: Скролити, поки в сітці не буде стільки медіа
+    :param stop_keys: Ключі вже відомих медіа, на яких скрол зупиняється
+    :param filename: Файл для збереження HTML (за замовчуванням визначається типом сторінки)
+    :param capture_file: Файл для перехоплених JSON відповідей (працює лише з CAPTURE_JSON)
+    :param on_scroll: Викликається після кожного скролу (напр. для перевірки скасування завдання)
+    :return: True, якщо HTML збережено, інакше False
     """
     try:
         logger.info(f"Початок обробки сторінки: {url}")
@@ -167,60 +365,59 @@ def save_page(driver, url, is_posts=False, is_reels=False):
         # Переходимо на цільову сторінку
         logger.info("Завантаження сторінки...")
         driver.get(url)
-        time.sleep(5)  # Чекаємо завантаження сторінки
         
-        # Очікуємо завантаження тіла сторінки
+        # Очікуємо завантаження тіла сторінки та перших медіа
         WebDriverWait(driver, 15).until(
             EC.presence_of_element_located((By.TAG_NAME, "body"))
         )
+        try:
+            WebDriverWait(driver, 15, poll_frequency=0.25).until(
+                lambda d: d.execute_script(SNAPSHOT_JS)[1] > 0
+            )
+        except TimeoutException:
+            logger.warning("Медіа на сторінці не з'явилися за 15 секунд")
         
-        # Визначаємо кількість скролів залежно від типу сторінки
-        scroll_count = 10 if is_posts else 11 if is_reels else 3
-        scroll_pause_time = 2  # Час очікування між скролами
+        # Відповіді, отримані до початку скролу, теж належать цій сторінці
+        capture = JsonCapture(driver) if CAPTURE_JSON and capture_file else None
+        if capture:
+            capture.collect()
         
-        logger.info(f"Виконуємо {scroll_count} скролів...")
+        def after_scroll():
+            if capture:
+                capture.collect()
+            if on_scroll:
+                on_scroll()
         
-        # Виконуємо скрол сторінки
-        last_height = driver.execute_script("return document.body.scrollHeight")
+        # Прокручуємо, поки стрічка росте
+        scrolls = scroll_feed(driver, max_scrolls=max_scrolls, target_items=target_items,
+                              stop_keys=stop_keys, on_scroll=after_scroll)
+        logger.info(f"Виконано {scrolls} скролів")
         
-        for i in range(scroll_count):
-            # Прокручуємо до низу
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            
-            # Очікуємо завантаження нових елементів
-            time.sleep(scroll_pause_time)
-            
-            # Оновлюємо висоту сторінки після скролу
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            
-            # Якщо висота не змінилася, дочекаємося ще трохи
-            if new_height == last_height:
-                time.sleep(1)
-                
-            last_height = new_height
-            logger.info(f"Виконано скрол {i+1}/{scroll_count}")
+        if capture:
+            capture.collect()
+            capture.save(capture_file)
         
         # Отримуємо HTML після всіх скролів
         html_content = driver.page_source
         
-        # Визначаємо ім'я файлу на основі типу контенту
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        if is_posts:
-            filename = f"instagram_posts.html"
-        elif is_reels:
-            filename = f"instagram_reels.html"
-        else:
-            filename = f"instagram_other.html"
+        # Визначаємо ім'я файлу на основі типу контенту, якщо його не передано
+        if not filename:
+            if is_posts:
+                filename = f"instagram_posts.html"
+            elif is_reels:
+                filename = f"instagram_reels.html"
+            else:
+                filename = f"instagram_other.html"
         
         # Зберігаємо HTML у файл
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(html_content)
+        stage_add(bytes=os.path.getsize(filename))
         
         logger.info(f"HTML сторінки збережено у файл: {filename}")
-        return driver
+        return True
         
     except Exception as e:
         logger.error(f"Помилка при збереженні сторінки {url}: {str(e)}")
-        return driver
-        
-    
\ No newline at end of file
+        stage_failed()
+        return False
@@ -0,0 +1,147 @@
+import os
+import queue
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+from func.f_auch import init_selenium, login_to_instagram, is_logged_in
+
+# Завантажуємо змінні середовища з .env файлу
+load_dotenv()
+
+# Ініціалізуємо логер
+logger = logging.getLogger(__name__)
+
+# Налаштування пулу браузерів
+DRIVER_POOL_SIZE = int(os.getenv('DRIVER_POOL_SIZE', '1'))  # Кількість авторизованих браузерів
+DRIVER_MAX_PAGES = int(os.getenv('DRIVER_MAX_PAGES', '50'))  # Сторінок до перезапуску браузера
+DRIVER_ACQUIRE_TIMEOUT = int(os.getenv('DRIVER_ACQUIRE_TIMEOUT', '900'))  # Очікування вільного браузера, секунди
+CHROME_PROFILES_DIR = os.getenv('CHROME_PROFILES_DIR', 'chrome_profiles')  # Профілі Chrome з cookie
+
+
+class DriverLease:
+    """
+    Браузер, виданий пулом на час одного скрапінгу
+    """
+
+    def __init__(self, slot):
+        self.slot = slot
+        self.driver = None
+        self.pages = 0
+        self.authenticated = False
+
+    @property
+    def profile_dir(self):
+        return os.path.join(CHROME_PROFILES_DIR, f"slot_{self.slot}")
+
+    def page_done(self):
+        """Фіксує оброблену сторінку для підрахунку перезапуску браузера"""
+        self.pages += 1
+
+
+class DriverPool:
+    """
+    Пул довгоживучих авторизованих браузерів Chrome
+
+    Кожен слот має власний профіль Chrome, тому cookie сесії Instagram переживають
+    перезапуск браузера і процесу, а вхід виконується лише коли сесія недійсна.
+    Перед кожною видачею браузер і сесія Instagram перевіряються (сесію можуть
+    завершити між запусками), а після max_pages сторінок браузер перезапускається.
+    """
+
+    def __init__(self, size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES):
+        self.size = 0
+        self.max_pages = max_pages
+        self._idle = queue.LifoQueue()  # Першим видається щойно використаний (теплий) браузер
+        self._leases = []
+        self._lock = threading.Lock()
+        self.resize(size)
+
+    def resize(self, size):
+        """Збільшує кількість слотів пулу до size (зменшення не підтримується)"""
+        with self._lock:
+            while self.size < size:
+                lease = DriverLease(self.size)
+                self._leases.append(lease)
+                self._idle.put(lease)
+                self.size += 1
+        logger.info(f"Розмір пулу браузерів: {self.size}")
+
+    @contextmanager
+    def session(self):
+        """
+        Видає авторизований браузер і повертає його в пул після використання
+        :return: DriverLease або None, якщо авторизуватися не вдалося
+        """
+        lease = self._idle.get(timeout=DRIVER_ACQUIRE_TIMEOUT)
+        try:
+            yield lease if self._prepare(lease) else None
+        finally:
+            self._idle.put(lease)
+
+    def _prepare(self, lease):
+        """Перевіряє, за потреби перезапускає та авторизує браузер слоту"""
+        if lease.driver is not None:
+            if lease.pages >= self.max_pages:
+                logger.info(f"Браузер слоту {lease.slot} обробив {lease.pages} сторінок, перезапускаємо")
+                self._quit(lease)
+            elif not self._is_healthy(lease.driver):
+                logger.warning(f"Браузер слоту {lease.slot} не відповідає, перезапускаємо")
+                self._quit(lease)
+
+        if lease.driver is None:
+            lease.driver = init_selenium(user_data_dir=lease.profile_dir)
+            lease.pages = 0
+            lease.authenticated = False
+
+        # Сесію перевіряємо при кожній видачі, а не лише після перезапуску: Instagram може
+        # завершити її, поки браузер чекав у пулі, і тоді скрапінг збереже сторінку входу
+        logged_in = is_logged_in(lease.driver)
+        if lease.authenticated and not logged_in:
+            logger.warning(f"Сесія Instagram браузера слоту {lease.slot} недійсна, виконуємо вхід")
+        lease.authenticated = logged_in or bool(login_to_instagram(lease.driver))
+        if not lease.authenticated:
+            logger.error(f"Не вдалося авторизувати браузер слоту {lease.slot}")
+        return lease.authenticated
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            driver.execute_script("return document.readyState")
+            return bool(driver.window_handles)
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(lease):
+        try:
+            lease.driver.quit()
+        except Exception as e:
+            logger.warning(f"Помилка при закритті браузера слоту {lease.slot}: {str(e)}")
+        lease.driver = None
+        lease.authenticated = False
+
+    def shutdown(self):
+        """Закриває всі браузери пулу (профілі з cookie залишаються на диску)"""
+        for lease in self._leases:
+            if lease.driver is not None:
+                self._quit(lease)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """
+    Повертає спільний для процесу пул браузерів
+    :return: DriverPool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.shutdown)
+    return _pool
@@ -0,0 +1,45 @@
+import re
+import hashlib
+import urllib.parse
+
+# Хости CDN, з яких Instagram віддає медіа
+CDN_HOST_SUFFIXES = ("fbcdn.net", "cdninstagram.com")
+
+# Ідентифікатор ресурсу в шляху CDN, напр. 491496438_922080123227613_1240067864154182127_n.jpg
+ASSET_ID_RE = re.compile(r"^(\d+_\d+_\d+_n)\.[a-z0-9]+$", re.IGNORECASE)
+
+# Параметри запиту, які змінюються при кожному скрапінгу (підписи, сесії, кеш)
+VOLATILE_PARAMS = {"oh", "oe", "ccb", "edm", "efg", "stp", "_nc_sid"}
+
+
+def get_media_key(url):
+    """
+    Повертає стабільний ключ медіа, який не залежить від підписів у URL
+
+    Для URL з CDN Instagram ключем є ідентифікатор ресурсу з шляху, тому той самий
+    пост з різними параметрами oh=/oe=/_nc_ohc= дає однаковий ключ. Для інших URL
+    ключ - хеш від адреси без змінних параметрів запиту.
+
+    :param url: URL медіа
+    :return: Ключ медіа або None для порожнього URL
+    """
+    if not url:
+        return None
+
+    parsed = urllib.parse.urlparse(url)
+    host = parsed.netloc.lower()
+    basename = parsed.path.rsplit("/", 1)[-1]
+
+    if host.endswith(CDN_HOST_SUFFIXES):
+        match = ASSET_ID_RE.match(basename)
+        if match:
+            return match.group(1)
+
+    # Запасний варіант: хеш від хоста, шляху та стабільних параметрів запиту
+    stable_params = sorted(
+        (name, value)
+        for name, value in urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)
+        if name not in VOLATILE_PARAMS and not name.startswith("_nc_")
+    )
+    canonical = f"{host}{parsed.path}?{urllib.parse.urlencode(stable_params)}"
+    return hashlib.md5(canonical.encode()).hexdigest()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Потоковий екстрактор постів та reels із збережених HTML сторінок Instagram
+
+Замість побудови повного дерева BeautifulSoup (html.parser) та кількох обходів
+по ньому, сторінка читається частинами і подається в lxml.etree.HTMLParser з
+target-обробником. Обробник за один прохід збирає зображення, відео, контейнери
+постів з описами та заголовки reels, не будуючи дерево в пам'яті.
+
+Результат має ту саму схему, що й parser.parse_posts / parser.parse_reels:
+```python
+from html_extractor import iter_posts, iter_reels
+
+for post in iter_posts("instagram_posts.html"):
+    print(post["media_url"], post["description"])
+```
+"""
+
+from lxml import etree
+
+# Класи елементів сторінки Instagram
+POST_CONTAINER_CLASS = "x1lliihq x1n2onr6 xh8yej3"
+POST_CAPTION_CLASS = "_aacl _aaco _aacu _aacx _aad7 _aade"
+REEL_TITLE_CLASS = "_ap3a _aaco _aacu _aacx _aad7 _aade"
+
+# Розмір частини файлу, що подається в парсер
+CHUNK_SIZE = 64 * 1024
+
+
+def _has_class(attrib, class_name):
+    """Перевіряє, чи атрибут class елемента дорівнює заданому набору класів"""
+    value = attrib.get("class")
+    return value is not None and " ".join(value.split()) == class_name
+
+
+class _TextCapture:
+    """Накопичує текст елемента разом з текстом усіх його нащадків"""
+
+    def __init__(self, depth, on_done):
+        self.depth = depth
+        self.parts = []
+        self.on_done = on_done
+
+
+class PageTarget:
+    """Target-обробник для lxml, що збирає дані сторінки за один прохід
+
+    Attributes:
+        images (list): Пари (src, alt) усіх зображень, крім .ico
+        videos (list): src усіх відео з непорожнім src
+        captions (list): Опис для кожного контейнера посту (None, якщо опису немає)
+        titles (list): Тексти заголовків reels
+    """
+
+    def __init__(self):
+        self.images = []
+        self.videos = []
+        self.captions = []
+        self.titles = []
+        # Кількість контейнерів з початку списку, які вже закрились
+        self.closed_containers = 0
+        self._closed = []
+        self._open_containers = []  # (depth, index)
+        self._captures = []
+        self._depth = 0
+
+    def start(self, tag, attrib):
+        self._depth += 1
+
+        if tag == "img":
+            src = attrib.get("src")
+            if src and not src.endswith(".ico"):
+                self.images.append((src, attrib.get("alt") or ""))
+        elif tag == "video":
+            src = attrib.get("src")
+            if src:
+                self.videos.append(src)
+        elif tag == "div" and _has_class(attrib, POST_CONTAINER_CLASS):
+            self._open_containers.append((self._depth, len(self.captions)))
+            self.captions.append(None)
+            self._closed.append(False)
+        elif tag == "span" and self._open_containers and _has_class(attrib, POST_CAPTION_CLASS):
+            # Перший опис усередині контейнера належить усім відкритим контейнерам без опису
+            owners = [index for _, index in self._open_containers if self.captions[index] is None]
+            if owners:
+                for index in owners:
+                    self.captions[index] = ""
+                self._captures.append(_TextCapture(self._depth, lambda text: self._set_captions(owners, text)))
+        elif tag == "h1" and _has_class(attrib, REEL_TITLE_CLASS):
+            self._captures.append(_TextCapture(self._depth, self.titles.append))
+
+    def end(self, tag):
+        while self._captures and self._captures[-1].depth == self._depth:
+            capture = self._captures.pop()
+            capture.on_done("".join(capture.parts).strip())
+        while self._open_containers and self._open_containers[-1][0] == self._depth:
+            _, index = self._open_containers.pop()
+            self._closed[index] = True
+            while self.closed_containers < len(self._closed) and self._closed[self.closed_containers]:
+                self.closed_containers += 1
+        self._depth -= 1
+
+    def data(self, data):
+        for capture in self._captures:
+            capture.parts.append(data)
+
+    def close(self):
+        return self
+
+    def _set_captions(self, owners, text):
+        for index in owners:
+            self.captions[index] = text
+
+
+def _feed(source, target):
+    """Подає сторінку в парсер частинами
+
+    Генератор повертає управління після кожної частини, щоб викликаючий код міг
+    віддати готові елементи, не чекаючи кінця файлу.
+
+    Args:
+        source (str | file): Шлях до HTML файлу або файловий об'єкт у бінарному режимі
+        target (PageTarget): Обробник подій парсера
+    """
+    parser = etree.HTMLParser(target=target, encoding="utf-8")
+    stream = open(source, "rb") if isinstance(source, (str, bytes)) or hasattr(source, "__fspath__") else source
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            parser.feed(chunk)
+            yield
+        parser.close()
+    finally:
+        if stream is not source:
+            stream.close()
+
+
+def _make_post(post_type, media_url, description, is_video):
+    return {
+        'post_type': post_type,
+        'media_url': media_url,
+        'description': description,
+        'timestamp': '',
+        'username': '',
+        'is_video': is_video
+    }
+
+
+def iter_posts(source):
+    """Повертає пости зі сторінки профілю по мірі їх знаходження
+
+    Кожне зображення стає постом з alt як описом. Якщо i-й контейнер посту містить
+    опис, він замінює опис i-го зображення (так само, як у parser.parse_posts).
+
+    Args:
+        source (str | file): Шлях до HTML файлу або файловий об'єкт у бінарному режимі
+
+    Yields:
+        dict: Пост у форматі parser.parse_posts
+    """
+    target = PageTarget()
+    emitted = 0
+
+    def ready(limit):
+        nonlocal emitted
+        while emitted < limit:
+            src, alt = target.images[emitted]
+            caption = target.captions[emitted] if emitted < len(target.captions) else None
+            emitted += 1
+            yield _make_post('post', src, caption if caption is not None else alt, False)
+
+    for _ in _feed(source, target):
+        # Пост готовий, коли його контейнер (якщо він буде) вже закрився
+        yield from ready(min(len(target.images), target.closed_containers))
+    yield from ready(len(target.images))
+
+
+def iter_reels(source):
+    """Повертає reels зі сторінки reels по мірі їх знаходження
+
+    Якщо на сторінці є відео з src, кожне відео стає reel. Інакше reels будуються
+    з превʼю-зображень. i-й заголовок стає описом i-го reel.
+
+    Args:
+        source (str | file): Шлях до HTML файлу або файловий об'єкт у бінарному режимі
+
+    Yields:
+        dict: Reel у форматі parser.parse_reels
+    """
+    target = PageTarget()
+    emitted = 0
+
+    for _ in _feed(source, target):
+        # Поки що віддаємо лише відео, для яких вже відомий заголовок
+        while emitted < min(len(target.videos), len(target.titles)):
+            yield _make_post('reel', target.videos[emitted], target.titles[emitted], True)
+            emitted += 1
+
+    if target.videos:
+        media = [(src, "") for src in target.videos]
+    else:
+        media = target.images
+    for index in range(emitted, len(media)):
+        src, alt = media[index]
+        description = target.titles[index] if index < len(target.titles) else alt
+        yield _make_post('reel', src, description, True)
@@ -13,16 +13,8 @@ import configparser
 import sqlite3
 from datetime import datetime
 from pathlib import Path
+from log_config import setup_logging
 
-# Налаштування логування
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("parser.log", encoding="utf-8")
-    ]
-)
 logger = logging.getLogger("InstagramImprover")
 
 def create_config_file(config_path="config.ini"):
@@ -132,8 +124,8 @@ def download_media(url, output_dir, filename=None):
     """
     Завантажує медіа за URL та зберігає його локально
     """
-    import requests
     from urllib.parse import urlparse
+    from media_client import fetch_media
     
     try:
         if not filename:
@@ -147,12 +139,10 @@ def download_media(url, output_dir, filename=None):
         file_path = os.path.join(output_dir, filename)
         
         # Завантажуємо файл
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        
-        with open(file_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        with fetch_media(url, stream=True) as response:
+            with open(file_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    f.write(chunk)
                 
         logger.info(f"Завантажено медіа: {file_path}")
         return file_path
@@ -248,4 +238,5 @@ def main():
     logger.info("Покращення для універсальності проекту успішно демонстровано")
 
 if __name__ == "__main__":
+    setup_logging("parser.log")
     main()
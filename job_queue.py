@@ -0,0 +1,601 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Надійна черга завдань скрапінгу на SQLite з окремими процесами-воркерами
+
+Веб-інтерфейс лише додає завдання до таблиці jobs (база JOB_QUEUE_DB) і читає
+їхній стан, а скрапінг та парсинг виконують окремі процеси-воркери. Тому
+завдання та їхній прогрес переживають перезапуск веб-процесу, важка робота не
+ділить GIL з Flask, а воркерів можна запускати скільки завгодно і на окремих
+машинах зі спільним диском.
+
+Стани завдання: queued -> running -> completed / failed / cancelled.
+Завдання, що завершилося помилкою, повертається в чергу з експоненційною
+затримкою, поки не вичерпано max_attempts. Воркер періодично оновлює
+heartbeat_at, тому завдання воркера, що аварійно завершився, після
+JOB_STALE_TIMEOUT секунд знову потрапляє в чергу. Скасування кооперативне:
+завдання в черзі скасовується одразу, а виконуване - при наступній перевірці
+обробника (після кожного скролу сторінки та перед кожним типом сторінки в
+парсері).
+
+Приклад використання:
+```python
+from job_queue import enqueue, get_job, cancel_job
+
+job_id = enqueue("scrape", "dliavsikhta", {"incremental": True})
+print(get_job(job_id)["state"], get_job(job_id)["progress"])
+cancel_job(job_id)
+```
+
+```bash
+python job_queue.py worker --processes 2
+python job_queue.py enqueue --account dliavsikhta --incremental
+python job_queue.py list
+```
+"""
+
+import os
+import sys
+import glob
+import json
+import signal
+import socket
+import sqlite3
+import logging
+import argparse
+import threading
+import subprocess
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+
+from db_pool import configure_connection
+from log_config import setup_logging, log_context
+
+logger = logging.getLogger("JobQueue")
+
+# Налаштування черги (можна перевизначити через .env)
+JOB_QUEUE_DB = os.getenv("JOB_QUEUE_DB", "jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))  # Процесів-воркерів, що запускає веб-інтерфейс
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "30"))  # Затримка перед першим повтором, секунди
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))  # Опитування черги вільним воркером, секунди
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "10"))
+JOB_STALE_TIMEOUT = float(os.getenv("JOB_STALE_TIMEOUT", "120"))  # Без heartbeat завдання вважається покинутим
+JOB_UNCLAIMED_WARNING = float(os.getenv("JOB_UNCLAIMED_WARNING", "60"))  # Завдання без воркера довше - попередження
+JOB_LOG_FILE = os.getenv("JOB_LOG_FILE", "jobs.log")  # Базове ім'я логу воркерів: воркер N пише в jobs.N.log
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class JobCancelled(BaseException):
+    """Виникає в обробнику завдання, якщо завдання скасовано
+
+    Успадковується від BaseException, щоб загальні обробники except Exception
+    у скрапері та парсері не поглинали скасування.
+    """
+
+
+def _now(offset_seconds=0):
+    return (datetime.now() + timedelta(seconds=offset_seconds)).strftime(DATE_FORMAT)
+
+
+@contextmanager
+def _connect():
+    conn = configure_connection(sqlite3.connect(JOB_QUEUE_DB, isolation_level=None))
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def init_queue():
+    """Створює таблицю завдань, якщо її ще немає"""
+    with _connect() as conn:
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            account TEXT,
+            params TEXT NOT NULL DEFAULT '{}',
+            state TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 1,
+            progress INTEGER NOT NULL DEFAULT 0,
+            message TEXT,
+            result TEXT,
+            error TEXT,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            created_at TEXT NOT NULL,
+            run_after TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT,
+            heartbeat_at TEXT
+        )
+        ''')
+        # Вибір наступного завдання воркером та пошук активних завдань акаунту
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, run_after, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_kind_account ON jobs(kind, account, id)")
+
+
+def _to_job(row):
+    if row is None:
+        return None
+    job = dict(row)
+    job["params"] = json.loads(job["params"] or "{}")
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
+
+
+def enqueue(kind, account_username="default", params=None, max_attempts=None):
+    """Додає завдання до черги
+
+    Args:
+        kind (str): Тип завдання (ключ JOB_HANDLERS)
+        account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
+        params (dict, optional): Параметри обробника. Defaults to None.
+        max_attempts (int, optional): Кількість спроб. Defaults to JOB_MAX_ATTEMPTS.
+
+    Returns:
+        int: Ідентифікатор завдання
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Невідомий тип завдання: {kind}")
+    now = _now()
+    with _connect() as conn:
+        cursor = conn.execute('''
+        INSERT INTO jobs (kind, account, params, max_attempts, message, created_at, run_after)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (kind, account_username, json.dumps(params or {}, ensure_ascii=False),
+              max_attempts or JOB_MAX_ATTEMPTS, "Очікує вільного воркера", now, now))
+        job_id = cursor.lastrowid
+    logger.info(f"Додано завдання {job_id} ({kind}) для акаунту {account_username}")
+    return job_id
+
+
+def get_job(job_id):
+    """Повертає завдання за ідентифікатором
+
+    Args:
+        job_id (int): Ідентифікатор завдання
+
+    Returns:
+        dict: Завдання або None, якщо його немає
+    """
+    with _connect() as conn:
+        return _to_job(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+
+def list_jobs(state=None, kind=None, account_username=None, limit=50):
+    """Повертає останні завдання, від новіших до старших
+
+    Args:
+        state (str, optional): Стан завдань. Defaults to None (усі).
+        kind (str, optional): Тип завдань. Defaults to None (усі).
+        account_username (str, optional): Ім'я акаунту. Defaults to None (усі).
+        limit (int, optional): Максимальна кількість. Defaults to 50.
+
+    Returns:
+        list: Словники завдань
+    """
+    where, params = [], []
+    for column, value in (("state", state), ("kind", kind), ("account", account_username)):
+        if value:
+            where.append(f"{column} = ?")
+            params.append(value)
+    query = "SELECT * FROM jobs"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += " ORDER BY id DESC LIMIT ?"
+    with _connect() as conn:
+        return [_to_job(row) for row in conn.execute(query, params + [limit])]
+
+
+def find_unclaimed_jobs(older_than=None):
+    """Повертає завдання, які чекають на воркер довше older_than секунд
+
+    Такі завдання означають, що жоден воркер не запущений (або всі зайняті).
+
+    Args:
+        older_than (float, optional): Секунд після run_after. Defaults to JOB_UNCLAIMED_WARNING.
+
+    Returns:
+        list: Словники завдань від старших до новіших
+    """
+    cutoff = _now(-(JOB_UNCLAIMED_WARNING if older_than is None else older_than))
+    with _connect() as conn:
+        rows = conn.execute("SELECT * FROM jobs WHERE state = ? AND run_after <= ? ORDER BY id", (QUEUED, cutoff))
+        return [_to_job(row) for row in rows]
+
+
+def find_active_job(kind, account_username=None):
+    """Повертає завдання в черзі або у виконанні
+
+    Args:
+        kind (str): Тип завдання
+        account_username (str, optional): Ім'я акаунту. Defaults to None (будь-який).
+
+    Returns:
+        dict: Найстаріше активне завдання або None
+    """
+    query = f"SELECT * FROM jobs WHERE kind = ? AND state IN ({', '.join('?' * len(ACTIVE_STATES))})"
+    params = [kind, *ACTIVE_STATES]
+    if account_username:
+        query += " AND account = ?"
+        params.append(account_username)
+    with _connect() as conn:
+        return _to_job(conn.execute(query + " ORDER BY id LIMIT 1", params).fetchone())
+
+
+def cancel_job(job_id):
+    """Скасовує завдання
+
+    Завдання в черзі скасовується одразу, а виконуване отримує запит на
+    скасування, який обробник перевіряє при оновленні прогресу.
+
+    Args:
+        job_id (int): Ідентифікатор завдання
+
+    Returns:
+        bool: False, якщо завдання вже завершене або не існує
+    """
+    now = _now()
+    with _connect() as conn:
+        cursor = conn.execute('''
+        UPDATE jobs SET state = ?, cancel_requested = 1, finished_at = ?, message = ?
+        WHERE id = ? AND state = ?
+        ''', (CANCELLED, now, "Скасовано", job_id, QUEUED))
+        if cursor.rowcount:
+            logger.info(f"Завдання {job_id} скасовано")
+            return True
+        cursor = conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND state = ?", (job_id, RUNNING))
+        if cursor.rowcount:
+            logger.info(f"Запит на скасування завдання {job_id}")
+            return True
+    return False
+
+
+def _claim(conn, worker_name):
+    """Атомарно бере наступне завдання з черги"""
+    now = _now()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute('''
+        SELECT id FROM jobs WHERE state = ? AND run_after <= ? ORDER BY id LIMIT 1
+        ''', (QUEUED, now)).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute('''
+        UPDATE jobs SET state = ?, attempts = attempts + 1, worker = ?, started_at = ?, heartbeat_at = ?,
+                        finished_at = NULL, error = NULL
+        WHERE id = ?
+        ''', (RUNNING, worker_name, now, now, row["id"]))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return _to_job(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+
+def requeue_stale_jobs(conn=None):
+    """Повертає в чергу завдання воркерів, що перестали оновлювати heartbeat
+
+    Returns:
+        int: Кількість повернутих завдань
+    """
+    if conn is None:
+        with _connect() as conn:
+            return requeue_stale_jobs(conn)
+    now = _now()
+    cursor = conn.execute('''
+    UPDATE jobs SET state = CASE WHEN attempts < max_attempts THEN ? ELSE ? END,
+                    finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE ? END,
+                    run_after = ?, worker = NULL, error = ?
+    WHERE state = ? AND heartbeat_at < ?
+    ''', (QUEUED, FAILED, now, now, "Воркер перестав відповідати", RUNNING, _now(-JOB_STALE_TIMEOUT)))
+    if cursor.rowcount:
+        logger.warning(f"Повернуто в чергу {cursor.rowcount} покинутих завдань")
+    return cursor.rowcount
+
+
+class JobContext:
+    """Доступ обробника до свого завдання: параметри, прогрес та скасування"""
+
+    def __init__(self, job):
+        self.job = job
+        self.id = job["id"]
+        self.account = job["account"]
+        self.params = job["params"]
+
+    def progress(self, progress, message=None):
+        """Оновлює прогрес завдання
+
+        Args:
+            progress (int): Прогрес у відсотках
+            message (str, optional): Повідомлення для інтерфейсу. Defaults to None.
+
+        Raises:
+            JobCancelled: Якщо завдання скасовано
+        """
+        with _connect() as conn:
+            conn.execute('''
+            UPDATE jobs SET progress = ?, message = COALESCE(?, message), heartbeat_at = ? WHERE id = ?
+            ''', (progress, message, _now(), self.id))
+        self.check_cancelled()
+
+    def check_cancelled(self, *args):
+        """Перериває обробник, якщо завдання скасовано
+
+        Приймає довільні аргументи, тому підходить як зворотний виклик
+        (on_scroll скрапера, on_page парсера).
+
+        Raises:
+            JobCancelled: Якщо завдання скасовано
+        """
+        with _connect() as conn:
+            cancelled = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (self.id,)).fetchone()[0]
+        if cancelled:
+            raise JobCancelled(f"Завдання {self.id} скасовано")
+
+
+def _heartbeat(job_id, stop_event):
+    while not stop_event.wait(JOB_HEARTBEAT_INTERVAL):
+        try:
+            with _connect() as conn:
+                conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND state = ?", (_now(), job_id, RUNNING))
+        except sqlite3.Error as e:
+            logger.warning(f"Не вдалося оновити heartbeat завдання {job_id}: {str(e)}")
+
+
+def _finish(job_id, state, message, result=None, error=None, retry_delay=None):
+    with _connect() as conn:
+        if retry_delay is not None:
+            conn.execute('''
+            UPDATE jobs SET state = ?, run_after = ?, message = ?, error = ?, worker = NULL WHERE id = ?
+            ''', (QUEUED, _now(retry_delay), message, error, job_id))
+        else:
+            conn.execute('''
+            UPDATE jobs SET state = ?, finished_at = ?, message = ?, error = ?, worker = NULL,
+                            result = ?, progress = CASE WHEN ? = 'completed' THEN 100 ELSE progress END
+            WHERE id = ?
+            ''', (state, _now(), message, error,
+                  json.dumps(result, ensure_ascii=False) if result is not None else None, state, job_id))
+
+
+def run_job(job):
+    """Виконує взяте з черги завдання та записує його результат
+
+    Args:
+        job (dict): Завдання у стані running
+
+    Returns:
+        str: Кінцевий стан завдання (або queued, якщо його заплановано повторити)
+    """
+    handler = JOB_HANDLERS[job["kind"]]
+    stop_event = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(job["id"], stop_event), daemon=True)
+    heartbeat.start()
+    try:
+        # Записи логу завдання позначаються акаунтом та run_id, за якими їх можна відфільтрувати
+        with log_context(account=job["account"], run_id=f"job-{job['id']}"):
+            logger.info(f"Виконання завдання {job['id']} ({job['kind']}, спроба {job['attempts']}/{job['max_attempts']})")
+            result = handler(JobContext(job))
+        _finish(job["id"], COMPLETED, (result or {}).get("message", "Завершено"), result=result)
+        return COMPLETED
+    except JobCancelled:
+        logger.info(f"Завдання {job['id']} скасовано під час виконання")
+        _finish(job["id"], CANCELLED, "Скасовано")
+        return CANCELLED
+    except Exception as e:
+        logger.error(f"Помилка виконання завдання {job['id']}: {str(e)}")
+        if job["attempts"] < job["max_attempts"]:
+            delay = JOB_RETRY_DELAY * 2 ** (job["attempts"] - 1)
+            _finish(job["id"], QUEUED, f"Помилка: {str(e)}. Повтор через {delay:.0f} с", error=str(e), retry_delay=delay)
+            return QUEUED
+        _finish(job["id"], FAILED, f"Помилка: {str(e)}", error=str(e))
+        return FAILED
+    except BaseException:
+        # Воркер зупиняють: повертаємо завдання в чергу, спроба не зараховується
+        with _connect() as conn:
+            conn.execute('''
+            UPDATE jobs SET state = ?, attempts = attempts - 1, run_after = ?, worker = NULL, message = ?
+            WHERE id = ? AND state = ?
+            ''', (QUEUED, _now(), "Воркер зупинено, завдання повернуто в чергу", job["id"], RUNNING))
+        raise
+    finally:
+        stop_event.set()
+
+
+def worker_loop(worker_name=None, stop_event=None):
+    """Бере завдання з черги та виконує їх, поки не буде зупинено
+
+    Args:
+        worker_name (str, optional): Ім'я воркера для поля worker. Defaults to None (host:pid).
+        stop_event (threading.Event, optional): Подія зупинки. Defaults to None (працює до SIGTERM).
+    """
+    worker_name = worker_name or f"{socket.gethostname()}:{os.getpid()}"
+    stop_event = stop_event or threading.Event()
+    init_queue()
+    logger.info(f"Воркер {worker_name} запущено")
+    while not stop_event.is_set():
+        with _connect() as conn:
+            requeue_stale_jobs(conn)
+            job = _claim(conn, worker_name)
+        if job is None:
+            stop_event.wait(JOB_POLL_INTERVAL)
+            continue
+        run_job(job)
+    logger.info(f"Воркер {worker_name} зупинено")
+
+
+def worker_log_file(index):
+    """Лог-файл воркера з номером index (jobs.log -> jobs.0.log)
+
+    Кожен воркер пише у власний файл, бо ротацію одного файлу кількома
+    процесами виконати безпечно неможливо.
+    """
+    root, ext = os.path.splitext(JOB_LOG_FILE)
+    return f"{root}.{index}{ext}"
+
+
+def worker_log_pattern():
+    """Шаблон glob лог-файлів усіх воркерів, у тому числі запущених окремо"""
+    root, ext = os.path.splitext(JOB_LOG_FILE)
+    return f"{glob.escape(root)}.[0-9]*{ext}"
+
+
+def worker_log_files():
+    """Поточні лог-файли воркерів (без ротованих копій)"""
+    return sorted(glob.glob(worker_log_pattern()))
+
+
+def _worker_process(index):
+    """Точка входу процесу-воркера"""
+    setup_logging(worker_log_file(index))
+    # Окремий каталог профілів Chrome для кожного воркера, щоб браузери не ділили профіль.
+    # Модулі скрапера імпортуються лише в обробнику завдання, тобто вже після цього
+    base_dir = os.getenv("CHROME_PROFILES_DIR", "chrome_profiles")
+    os.environ["CHROME_PROFILES_DIR"] = os.path.join(base_dir, f"worker_{index}")
+
+    def stop(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        worker_loop(f"{socket.gethostname()}:{os.getpid()}")
+    except (SystemExit, KeyboardInterrupt):
+        pass
+
+
+_workers = []
+
+
+def start_workers(count=None):
+    """Запускає процеси-воркери поруч з поточним процесом
+
+    Кожен воркер - окремий інтерпретатор (python job_queue.py worker), а не
+    дочірній процес multiprocessing: той заново імпортує головний модуль
+    (наприклад, app.py з пулами, логуванням та потоками подій), і модулі
+    скрапера прочитали б CHROME_PROFILES_DIR до того, як воркер його змінить.
+
+    Args:
+        count (int, optional): Кількість процесів. Defaults to JOB_WORKERS.
+
+    Returns:
+        list: Запущені процеси (subprocess.Popen)
+    """
+    init_queue()
+    for index in range(count if count is not None else JOB_WORKERS):
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "worker", "--index", str(index)])
+        _workers.append(process)
+    if _workers:
+        logger.info(f"Запущено {len(_workers)} процесів-воркерів черги завдань")
+    return list(_workers)
+
+
+def stop_workers(timeout=10):
+    """Зупиняє процеси, запущені start_workers (завдання повертаються в чергу)"""
+    for process in _workers:
+        if process.poll() is None:
+            process.terminate()
+    for process in _workers:
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    _workers.clear()
+
+
+def run_scrape_job(ctx):
+    """Обробник завдання scrape: скрапінг та парсинг акаунту"""
+    from selen import get_page_with_pagination
+    from parser import main_parser
+    from run_metrics import record_run
+
+    account_username = ctx.account
+    incremental = bool(ctx.params.get("incremental"))
+
+    # Тривалість етапів запуску зберігається в базу акаунту (run_metrics)
+    with record_run(account_username, run_id=f"job-{ctx.id}"):
+        ctx.progress(10, f"Скрапінг Instagram для акаунту {account_username}...")
+        # Скасування перевіряється після кожного скролу та перед кожним типом сторінки
+        if not get_page_with_pagination(account_username, incremental=incremental, on_scroll=ctx.check_cancelled):
+            raise RuntimeError("не вдалося отримати сторінки (див. лог)")
+
+        ctx.progress(60, f"Парсинг HTML для акаунту {account_username}...")
+        added_count, skipped_count = main_parser(account_username, incremental=incremental,
+                                                 on_page=ctx.check_cancelled)
+
+    return {
+        "added_count": added_count,
+        "duplicates_skipped": skipped_count,
+        "message": f"Скрапінг та парсинг для акаунту {account_username} успішно завершено. "
+                   f"Додано: {added_count}, пропущено: {skipped_count} дублікатів."
+    }
+
+
+# Обробники завдань: тип -> функція(JobContext), що повертає словник результату
+JOB_HANDLERS = {
+    "scrape": run_scrape_job,
+}
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description="Черга завдань скрапінгу")
+    subparsers = args_parser.add_subparsers(dest="command", required=True)
+
+    worker_parser = subparsers.add_parser("worker", help="Запустити воркери")
+    worker_parser.add_argument("--processes", type=int, default=1, help="Кількість процесів")
+    worker_parser.add_argument("--index", type=int, default=0,
+                               help="Номер воркера (каталог профілів Chrome та лог-файл)")
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="Додати завдання скрапінгу")
+    enqueue_parser.add_argument("--account", default="default", help="Ім'я акаунту")
+    enqueue_parser.add_argument("--incremental", action="store_true", help="Лише нові пости")
+
+    list_parser = subparsers.add_parser("list", help="Показати останні завдання")
+    list_parser.add_argument("--state", choices=[QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED])
+
+    cancel_parser = subparsers.add_parser("cancel", help="Скасувати завдання")
+    cancel_parser.add_argument("job_id", type=int)
+
+    args = args_parser.parse_args()
+    init_queue()
+
+    if args.command == "worker":
+        if args.processes <= 1:
+            _worker_process(args.index)
+            return
+        processes = start_workers(args.processes)
+        try:
+            for process in processes:
+                process.wait()
+        except KeyboardInterrupt:
+            stop_workers()
+    elif args.command == "enqueue":
+        job_id = enqueue("scrape", args.account, {"incremental": args.incremental})
+        logger.info(f"Завдання {job_id} додано до черги")
+    elif args.command == "list":
+        for job in list_jobs(state=args.state):
+            logger.info(f"{job['id']} {job['kind']} {job['account']} {job['state']} {job['progress']}% "
+                        f"(спроба {job['attempts']}/{job['max_attempts']}): {job['message']}")
+    elif args.command == "cancel":
+        if not cancel_job(args.job_id):
+            logger.warning(f"Завдання {args.job_id} вже завершене або не існує")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Налаштування логування з ротацією файлів та читання логів з кінця
+
+Кожна точка входу (веб-інтерфейс, воркер черги, скрипти командного рядка)
+викликає setup_logging один раз зі своїм лог-файлом; модулі лише отримують
+власний logger і не налаштовують логування під час імпорту. Кожен процес пише
+в окремий файл, бо ротацію одного файлу кількома процесами виконати безпечно
+неможливо.
+
+Файли ротуються за розміром (LOG_ROTATE_WHEN=size) або за часом (midnight,
+h, ...), тому не ростуть без меж. З LOG_JSON=True записи у файлі зберігаються
+як JSON-рядки з полями account та run_id; консоль завжди отримує текстовий
+формат. Контекст запуску задається через log_context і додається до всіх
+записів потоку, у тому числі з інших модулів.
+
+Читання (tail_lines, read_logs) йде блоками від кінця файлу, тому останні N
+рядків коштують O(N) байт незалежно від розміру історії, а фільтр за рівнем,
+акаунтом чи запуском зупиняється, щойно знайшов потрібну кількість записів
+(або переглянув LOG_SCAN_BYTES).
+
+Приклад використання:
+```python
+from log_config import setup_logging, log_context, read_logs
+
+setup_logging("parser.log")
+with log_context(account="dliavsikhta", run_id="job-12"):
+    logger.info("Парсинг...")
+
+errors = read_logs("parser.log", limit=20, level="ERROR", account="dliavsikhta")
+```
+"""
+
+import os
+import re
+import json
+import glob
+import logging
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+
+# Налаштування логування (можна перевизначити через .env)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE", "flask_app.log")  # Лог веб-інтерфейсу
+LOG_JSON = os.getenv("LOG_JSON", "False").lower() == "true"  # JSON-рядки у файлі замість тексту
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "size")  # size або інтервал TimedRotatingFileHandler (midnight, h, d)
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))  # Розмір файлу для ротації за розміром
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))  # Кількість старих файлів, що зберігаються
+LOG_SCAN_BYTES = int(os.getenv("LOG_SCAN_BYTES", str(16 * 1024 * 1024)))  # Максимум байт, що переглядає фільтр
+LOG_BLOCK_SIZE = 64 * 1024
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(context)s%(message)s'
+
+# Рядок логу у текстовому форматі
+LOG_LINE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - (.+?) - ([A-Z]+) - (.*)$")
+# Контекст запуску на початку повідомлення: [account=... run_id=...]
+CONTEXT_RE = re.compile(r"^\[((?:\w+=\S+ ?)+)\] ")
+
+CONTEXT_FIELDS = ("account", "run_id")
+
+_context = contextvars.ContextVar("log_context", default={})
+
+
+@contextmanager
+def log_context(**fields):
+    """Додає поля (account, run_id) до всіх записів логу всередині блоку
+
+    Контекст діє в поточному потоці; вкладені блоки доповнюють зовнішній.
+
+    Args:
+        **fields: Значення полів; None не змінює поле
+    """
+    current = dict(_context.get())
+    current.update({key: value for key, value in fields.items() if value is not None})
+    token = _context.set(current)
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Додає до запису поля контексту та готовий префікс record.context
+
+    Поля, передані явно через extra, мають перевагу над log_context.
+    """
+
+    def filter(self, record):
+        context = _context.get()
+        for field in CONTEXT_FIELDS:
+            if getattr(record, field, None) is None:
+                setattr(record, field, context.get(field))
+        parts = [f"{field}={getattr(record, field)}" for field in CONTEXT_FIELDS if getattr(record, field)]
+        record.context = f"[{' '.join(parts)}] " if parts else ""
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматує запис як один JSON-рядок"""
+
+    def format(self, record):
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "name": record.name,
+            "message": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            if getattr(record, field, None):
+                data[field] = getattr(record, field)
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _file_handler(log_file, json_lines):
+    if LOG_ROTATE_WHEN == "size":
+        handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                                      encoding="utf-8", delay=True)
+    else:
+        handler = TimedRotatingFileHandler(log_file, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT,
+                                           encoding="utf-8", delay=True)
+    handler.setFormatter(JsonFormatter() if json_lines else logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def setup_logging(log_file=None, level=None, json_lines=None):
+    """Налаштовує кореневий logger процесу: консоль та (за потреби) лог-файл з ротацією
+
+    Повторний виклик замінює обробники, додані попереднім викликом.
+
+    Args:
+        log_file (str, optional): Шлях до лог-файлу. Defaults to None (лише консоль).
+        level (str, optional): Рівень логування. Defaults to LOG_LEVEL.
+        json_lines (bool, optional): Писати у файл JSON-рядки. Defaults to LOG_JSON.
+    """
+    root = logging.getLogger()
+    for handler in [handler for handler in root.handlers if getattr(handler, "_log_config", False)]:
+        root.removeHandler(handler)
+        handler.close()
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(LOG_FORMAT))
+    handlers = [console]
+    if log_file:
+        handlers.append(_file_handler(log_file, LOG_JSON if json_lines is None else json_lines))
+
+    for handler in handlers:
+        handler._log_config = True
+        handler.addFilter(ContextFilter())
+        root.addHandler(handler)
+    root.setLevel(level or LOG_LEVEL)
+
+
+def parse_log_line(line):
+    """Розбирає рядок логу в текстовому або JSON форматі
+
+    Args:
+        line (str): Рядок лог-файлу
+
+    Returns:
+        dict: Поля time, level, name, message, account, run_id та line (текстовий вигляд);
+            None, якщо рядок не є початком запису (наприклад, рядок traceback)
+    """
+    if line.startswith("{"):
+        try:
+            data = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(data, dict) or "level" not in data:
+            return None
+        record = {
+            "time": data.get("time"),
+            "level": data["level"],
+            "name": data.get("name", ""),
+            "message": data.get("message", ""),
+            "account": data.get("account"),
+            "run_id": data.get("run_id"),
+        }
+        context = " ".join(f"{field}={record[field]}" for field in CONTEXT_FIELDS if record[field])
+        prefix = f"[{context}] " if context else ""
+        record["line"] = f"{record['time']} - {record['name']} - {record['level']} - {prefix}{record['message']}"
+        if data.get("exc_info"):
+            record["line"] += "\n" + data["exc_info"]
+        return record
+
+    match = LOG_LINE_RE.match(line)
+    if not match:
+        return None
+    record = {"time": match.group(1), "name": match.group(2), "level": match.group(3),
+              "message": match.group(4), "account": None, "run_id": None, "line": line}
+    context = CONTEXT_RE.match(record["message"])
+    if context:
+        for part in context.group(1).split():
+            field, _, value = part.partition("=")
+            if field in CONTEXT_FIELDS:
+                record[field] = value
+        record["message"] = record["message"][context.end():]
+    return record
+
+
+def _log_files(log_file):
+    """Поточний лог-файл та його ротовані копії від новіших до старших"""
+    backups = [path for path in glob.glob(glob.escape(log_file) + ".*") if not path.endswith(".lock")]
+    backups.sort(key=os.path.getmtime, reverse=True)
+    return ([log_file] if os.path.exists(log_file) else []) + backups
+
+
+def iter_lines_reversed(path, block_size=LOG_BLOCK_SIZE):
+    """Повертає рядки файлу від останнього до першого, читаючи його блоками з кінця
+
+    Рядки розділяються за байтом \\n, який не зустрічається всередині
+    багатобайтових символів UTF-8, тому кожен рядок декодується повністю.
+
+    Args:
+        path (str): Шлях до файлу
+        block_size (int, optional): Розмір блоку читання. Defaults to LOG_BLOCK_SIZE.
+
+    Yields:
+        str: Рядки без символу кінця рядка (порожні пропускаються)
+    """
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        head = b""
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            lines = (f.read(step) + head).split(b"\n")
+            # Перший рядок блоку може продовжуватись у попередньому блоці
+            head = lines.pop(0)
+            for raw in reversed(lines):
+                if raw.strip():
+                    yield raw.decode("utf-8", errors="replace").rstrip("\r")
+        if head.strip():
+            yield head.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def tail_lines(log_file, count=50):
+    """Повертає останні рядки лог-файлу
+
+    Args:
+        log_file (str): Шлях до лог-файлу
+        count (int, optional): Кількість рядків. Defaults to 50.
+
+    Returns:
+        list: Рядки від старших до новіших
+    """
+    lines = []
+    if count <= 0 or not os.path.exists(log_file):
+        return lines
+    for line in iter_lines_reversed(log_file):
+        lines.append(line)
+        if len(lines) >= count:
+            break
+    return lines[::-1]
+
+
+def _level_number(level):
+    number = logging.getLevelName(level.upper())
+    return number if isinstance(number, int) else 0
+
+
+def read_logs(log_file, limit=100, level=None, account=None, run_id=None, name=None, max_bytes=LOG_SCAN_BYTES):
+    """Повертає останні записи логу, що відповідають фільтрам
+
+    Файли (поточний, потім ротовані копії) читаються від кінця, поки не знайдено
+    limit записів або не переглянуто max_bytes. Рядки traceback належать запису,
+    після якого вони йдуть.
+
+    Якщо передано список файлів (наприклад, логи кількох воркерів), кожен
+    читається окремо, а записи об'єднуються за часом.
+
+    Args:
+        log_file (str or list): Шлях до лог-файлу або список шляхів
+        limit (int, optional): Максимальна кількість записів. Defaults to 100.
+        level (str, optional): Мінімальний рівень (INFO, WARNING, ERROR). Defaults to None.
+        account (str, optional): Ім'я акаунту. Defaults to None.
+        run_id (str, optional): Ідентифікатор запуску. Defaults to None.
+        name (str, optional): Ім'я logger. Defaults to None.
+        max_bytes (int, optional): Максимум байт для перегляду. Defaults to LOG_SCAN_BYTES.
+
+    Returns:
+        list: Записи (словники parse_log_line) від старших до новіших
+    """
+    if not isinstance(log_file, str):
+        records = []
+        for path in log_file:
+            records.extend(read_logs(path, limit, level, account, run_id, name, max_bytes))
+        records.sort(key=lambda record: record["time"] or "")
+        return records[max(len(records) - limit, 0):]
+
+    min_level = _level_number(level) if level else None
+    if min_level == 0:
+        raise ValueError(f"Невідомий рівень логування: {level}")
+
+    records = []
+    scanned = 0
+    for path in _log_files(log_file):
+        continuation = []
+        for line in iter_lines_reversed(path):
+            scanned += len(line.encode("utf-8")) + 1
+            record = parse_log_line(line)
+            if record is None:
+                continuation.append(line)
+            else:
+                if continuation:
+                    record["line"] = "\n".join([record["line"]] + continuation[::-1])
+                    continuation = []
+                if ((min_level is None or _level_number(record["level"]) >= min_level)
+                        and (account is None or record["account"] == account)
+                        and (run_id is None or record["run_id"] == run_id)
+                        and (name is None or record["name"] == name)):
+                    records.append(record)
+                    if len(records) >= limit:
+                        return records[::-1]
+            if scanned >= max_bytes:
+                return records[::-1]
+    return records[::-1]
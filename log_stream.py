@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Потік подій для веб-інтерфейсу: стан скрапінгу та нові записи логу (SSE)
+
+Записи логу веб-процесу потрапляють у кільцевий буфер у пам'яті через
+RingBufferHandler, а записи процесів-воркерів черги - через LogFollower, який
+дочитує лише нові байти їхніх лог-файлів (шаблон glob, бо кожен воркер пише у
+власний файл). Окремий потік StatusWatcher раз на STATUS_POLL_INTERVAL секунд
+перевіряє стан скрапінгу і додає подію лише коли стан змінився.
+
+Кожен глядач /events лише чекає на нові події буфера, тому відкриті вкладки
+не читають лог-файл і не опитують базу, а вартість оновлення не залежить від
+розміру логу.
+
+Приклад використання:
+```python
+from log_stream import install, iter_sse
+
+install(status_fn=get_status, follow_files=["jobs.[0-9]*.log"])
+return Response(iter_sse(request.headers.get("Last-Event-ID")), mimetype="text/event-stream")
+```
+"""
+
+import os
+import glob
+import json
+import logging
+import threading
+from collections import deque
+
+from log_config import LOG_FORMAT, ContextFilter, parse_log_line
+
+logger = logging.getLogger("LogStream")
+
+# Налаштування потоку подій (можна перевизначити через .env)
+LOG_BUFFER_SIZE = int(os.getenv("LOG_BUFFER_SIZE", "1000"))  # Подій у кільцевому буфері
+LOG_BACKLOG = int(os.getenv("LOG_BACKLOG", "50"))  # Останніх записів логу для нового глядача
+STATUS_POLL_INTERVAL = float(os.getenv("STATUS_POLL_INTERVAL", "1"))
+LOG_FOLLOW_INTERVAL = float(os.getenv("LOG_FOLLOW_INTERVAL", "0.5"))
+SSE_KEEPALIVE = float(os.getenv("SSE_KEEPALIVE", "15"))  # Коментар keep-alive для проксі, секунди
+
+
+class EventBuffer:
+    """Кільцевий буфер подій з послідовними ідентифікаторами"""
+
+    def __init__(self, size=LOG_BUFFER_SIZE):
+        self._events = deque(maxlen=size)
+        self._condition = threading.Condition()
+        self._last_id = 0
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def publish(self, event, data):
+        """Додає подію та будить глядачів
+
+        Args:
+            event (str): Тип події (log, status)
+            data (dict): Дані події
+
+        Returns:
+            int: Ідентифікатор події
+        """
+        with self._condition:
+            self._last_id += 1
+            self._events.append((self._last_id, event, data))
+            self._condition.notify_all()
+            return self._last_id
+
+    def since(self, last_id, timeout=None):
+        """Повертає події, новіші за last_id, чекаючи на них до timeout секунд
+
+        Args:
+            last_id (int): Ідентифікатор останньої отриманої події
+            timeout (float, optional): Максимальне очікування. Defaults to None (без очікування).
+
+        Returns:
+            list: Кортежі (id, event, data)
+        """
+        with self._condition:
+            if timeout and self._last_id <= last_id:
+                self._condition.wait_for(lambda: self._last_id > last_id, timeout)
+            if self._last_id <= last_id:
+                return []
+            # Події йдуть підряд, тому потрібні лише останні (last_id - id) елементів
+            count = min(self._last_id - last_id, len(self._events))
+            return list(self._events)[-count:]
+
+    def latest(self, event, limit=1):
+        """Повертає останні події заданого типу
+
+        Args:
+            event (str): Тип події
+            limit (int, optional): Кількість подій. Defaults to 1.
+
+        Returns:
+            list: Кортежі (id, event, data) від старших до новіших
+        """
+        with self._condition:
+            found = []
+            for item in reversed(self._events):
+                if item[1] == event:
+                    found.append(item)
+                    if len(found) >= limit:
+                        break
+        return found[::-1]
+
+
+events = EventBuffer()
+
+
+def _record_data(line, level, name, message, source, account=None, run_id=None):
+    return {"line": line, "level": level, "name": name, "message": message, "source": source,
+            "account": account, "run_id": run_id}
+
+
+class RingBufferHandler(logging.Handler):
+    """Обробник логування, що додає записи процесу в буфер подій"""
+
+    def __init__(self, buffer=None, level=logging.INFO):
+        super().__init__(level)
+        self.buffer = buffer or events
+        self.setFormatter(logging.Formatter(LOG_FORMAT))
+        self.addFilter(ContextFilter())
+
+    def emit(self, record):
+        try:
+            self.buffer.publish("log", _record_data(self.format(record), record.levelname, record.name,
+                                                    record.getMessage(), "web", record.account, record.run_id))
+        except Exception:
+            self.handleError(record)
+
+
+class LogFollower(threading.Thread):
+    """Дочитує нові рядки лог-файлу іншого процесу та додає їх у буфер подій
+
+    Читання починається з кінця файлу (або з початку, якщо from_start); якщо
+    файл став меншим (ротація або очищення), читання починається спочатку.
+    Рядки можуть бути як у текстовому форматі, так і JSON-рядками (LOG_JSON).
+    """
+
+    def __init__(self, path, buffer=None, interval=LOG_FOLLOW_INTERVAL, from_start=False):
+        super().__init__(name=f"log-follower-{os.path.basename(path)}", daemon=True)
+        self.path = path
+        self.buffer = buffer or events
+        self.interval = interval
+        self._offset = os.path.getsize(path) if os.path.exists(path) and not from_start else 0
+        self._partial = b""
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def poll(self):
+        """Читає нові байти файлу
+
+        Returns:
+            int: Кількість доданих записів
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0
+        if size < self._offset:
+            self._offset, self._partial = 0, b""
+        if size == self._offset:
+            return 0
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+        self._offset += len(chunk)
+
+        lines = (self._partial + chunk).split(b"\n")
+        self._partial = lines.pop()
+        for raw in lines:
+            line = raw.decode("utf-8", errors="replace").rstrip("\r")
+            if not line:
+                continue
+            record = parse_log_line(line)
+            if record:
+                data = _record_data(record["line"], record["level"], record["name"], record["message"], "worker",
+                                    record["account"], record["run_id"])
+            else:
+                data = _record_data(line, "INFO", "", line, "worker")
+            self.buffer.publish("log", data)
+        return len(lines)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Помилка читання лог-файлу {self.path}: {str(e)}")
+
+
+class LogGlobFollower(threading.Thread):
+    """Дочитує всі лог-файли за шаблоном glob, у тому числі ті, що з'явились пізніше
+
+    Файли, що вже були при запуску, читаються з кінця, а нові (наприклад, лог
+    щойно запущеного воркера) - з початку. Усі файли опитує один потік.
+    """
+
+    def __init__(self, pattern, buffer=None, interval=LOG_FOLLOW_INTERVAL):
+        super().__init__(name=f"log-follower-{os.path.basename(pattern)}", daemon=True)
+        self.pattern = pattern
+        self.buffer = buffer or events
+        self.interval = interval
+        self._followers = {path: LogFollower(path, self.buffer) for path in glob.glob(pattern)}
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def poll(self):
+        """Шукає нові файли та читає нові байти кожного
+
+        Returns:
+            int: Кількість доданих записів
+        """
+        for path in glob.glob(self.pattern):
+            if path not in self._followers:
+                self._followers[path] = LogFollower(path, self.buffer, from_start=True)
+        added = 0
+        for follower in self._followers.values():
+            try:
+                added += follower.poll()
+            except Exception as e:
+                logger.warning(f"Помилка читання лог-файлу {follower.path}: {str(e)}")
+        return added
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.poll()
+
+
+class StatusWatcher(threading.Thread):
+    """Періодично отримує стан і додає подію status, коли він змінився"""
+
+    def __init__(self, status_fn, buffer=None, interval=STATUS_POLL_INTERVAL):
+        super().__init__(name="status-watcher", daemon=True)
+        self.status_fn = status_fn
+        self.buffer = buffer or events
+        self.interval = interval
+        self._last = None
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def poll(self):
+        """Перевіряє стан один раз
+
+        Returns:
+            bool: True, якщо стан змінився і подію додано
+        """
+        status = json.loads(json.dumps(self.status_fn(), default=str))
+        if status == self._last:
+            return False
+        self._last = status
+        self.buffer.publish("status", status)
+        return True
+
+    def run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Помилка отримання стану: {str(e)}")
+            if self._stop_event.wait(self.interval):
+                break
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install(status_fn=None, follow_files=(), level=logging.INFO):
+    """Підключає буфер подій до логування та запускає фонові потоки (один раз на процес)
+
+    Args:
+        status_fn (callable, optional): Функція без аргументів, що повертає стан. Defaults to None.
+        follow_files (list, optional): Лог-файли інших процесів (шаблони glob). Defaults to ().
+        level (int, optional): Мінімальний рівень записів. Defaults to logging.INFO.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        _installed = True
+
+    logging.getLogger().addHandler(RingBufferHandler(events, level))
+    for pattern in follow_files:
+        LogGlobFollower(pattern, events).start()
+    if status_fn is not None:
+        StatusWatcher(status_fn, events).start()
+
+
+def recent_logs(limit=LOG_BACKLOG):
+    """Повертає останні записи логу з буфера
+
+    Args:
+        limit (int, optional): Кількість записів. Defaults to LOG_BACKLOG.
+
+    Returns:
+        list: Рядки логу від старших до новіших
+    """
+    return [data["line"] for _, _, data in events.latest("log", limit)]
+
+
+def _format_sse(event_id, event, data):
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def iter_sse(last_event_id=None, backlog=LOG_BACKLOG):
+    """Генерує потік Server-Sent Events
+
+    Новий глядач спочатку отримує поточний стан та останні backlog записів логу,
+    а глядач, що перепідключився з Last-Event-ID, - лише пропущені події.
+
+    Args:
+        last_event_id (str, optional): Заголовок Last-Event-ID. Defaults to None.
+        backlog (int, optional): Записів логу для нового глядача. Defaults to LOG_BACKLOG.
+
+    Yields:
+        str: Повідомлення у форматі text/event-stream
+    """
+    try:
+        last_id = int(last_event_id)
+    except (TypeError, ValueError):
+        last_id = None
+
+    if last_id is None or last_id > events.last_id:
+        last_id = events.last_id
+        initial = events.latest("status") + events.latest("log", backlog)
+        for event_id, event, data in sorted(initial, key=lambda item: item[0]):
+            yield _format_sse(event_id, event, data)
+    yield f"retry: {int(STATUS_POLL_INTERVAL * 2000)}\n\n"
+
+    while True:
+        batch = events.since(last_id, timeout=SSE_KEEPALIVE)
+        if not batch:
+            yield ": keep-alive\n\n"
+            continue
+        for event_id, event, data in batch:
+            yield _format_sse(event_id, event, data)
+        last_id = batch[-1][0]
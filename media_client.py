@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Спільний HTTP клієнт для завантаження медіа з CDN Instagram
+
+Усі завантаження зображень та відео проходять через одну сесію requests з пулом
+з'єднань, тому TCP+TLS з'єднання з вузлом fbcdn перевикористовуються (keep-alive)
+замість відкриття нового з'єднання на кожне зображення.
+
+Клієнт повторює запити з експоненційною затримкою та випадковим розкидом (jitter)
+при відповідях 429/5xx та мережевих помилках, а також збирає метрики по запитах.
+
+Приклад використання:
+```python
+from media_client import fetch_media, get_metrics
+
+response = fetch_media("https://instagram.fxxx.fna.fbcdn.net/v/...jpg")
+data = response.content
+
+print(get_metrics())
+```
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("MediaClient")
+
+# Налаштування клієнта (можна перевизначити через .env)
+MEDIA_POOL_SIZE = int(os.getenv("MEDIA_POOL_SIZE", "16"))  # Кількість з'єднань з одним хостом
+MEDIA_MAX_RETRIES = int(os.getenv("MEDIA_MAX_RETRIES", "3"))  # Повторних спроб після першої
+MEDIA_BACKOFF_BASE = float(os.getenv("MEDIA_BACKOFF_BASE", "0.5"))  # Базова затримка, секунди
+MEDIA_BACKOFF_MAX = float(os.getenv("MEDIA_BACKOFF_MAX", "10"))  # Максимальна затримка, секунди
+MEDIA_TIMEOUT = float(os.getenv("MEDIA_TIMEOUT", "10"))  # Таймаут запиту, секунди
+
+# Статуси, при яких запит варто повторити
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Accept": "image/avif,image/webp,image/apng,image/*,video/*,*/*;q=0.8",
+    "Connection": "keep-alive",
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    "requests": 0,
+    "retries": 0,
+    "failures": 0,
+    "bytes": 0,
+    "total_seconds": 0.0,
+    "max_seconds": 0.0,
+}
+
+
+def get_session():
+    """Повертає спільну сесію requests з пулом з'єднань
+
+    Сесія створюється один раз на процес. Повтори запитів виконує fetch_media,
+    тому адаптер налаштовано без власних повторів.
+
+    Returns:
+        requests.Session: Сесія для завантаження медіа
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=MEDIA_POOL_SIZE,
+                    pool_maxsize=MEDIA_POOL_SIZE,
+                    max_retries=0,
+                    pool_block=True
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _session = session
+                logger.info(f"Створено HTTP сесію для медіа (пул {MEDIA_POOL_SIZE} з'єднань)")
+    return _session
+
+
+def _backoff_delay(attempt, response=None):
+    """Обчислює затримку перед повторною спробою
+
+    Використовує повний jitter: випадкове значення від 0 до base * 2^attempt,
+    але поважає заголовок Retry-After, якщо сервер його повернув.
+
+    Args:
+        attempt (int): Номер спроби, починаючи з 0
+        response (requests.Response, optional): Відповідь сервера. Defaults to None.
+
+    Returns:
+        float: Затримка в секундах
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MEDIA_BACKOFF_MAX)
+    return random.uniform(0, min(MEDIA_BACKOFF_MAX, MEDIA_BACKOFF_BASE * (2 ** attempt)))
+
+
+def _record(elapsed, size, retries, failed):
+    """Оновлює метрики клієнта"""
+    with _metrics_lock:
+        _metrics["requests"] += 1
+        _metrics["retries"] += retries
+        _metrics["failures"] += 1 if failed else 0
+        _metrics["bytes"] += size
+        _metrics["total_seconds"] += elapsed
+        _metrics["max_seconds"] = max(_metrics["max_seconds"], elapsed)
+
+
+def fetch_media(url, timeout=None, stream=False):
+    """Завантажує медіа за URL через спільну сесію з повторами
+
+    Args:
+        url (str): URL медіа
+        timeout (float, optional): Таймаут запиту. Defaults to MEDIA_TIMEOUT.
+        stream (bool, optional): Не читати тіло відповіді одразу. Defaults to False.
+
+    Returns:
+        requests.Response: Успішна відповідь
+
+    Raises:
+        requests.RequestException: Якщо всі спроби завершились помилкою
+    """
+    session = get_session()
+    timeout = timeout or MEDIA_TIMEOUT
+    started = time.perf_counter()
+    attempt = 0
+
+    while True:
+        try:
+            response = session.get(url, timeout=timeout, stream=stream)
+            if response.status_code in RETRY_STATUSES and attempt < MEDIA_MAX_RETRIES:
+                delay = _backoff_delay(attempt, response)
+                logger.warning(f"Відповідь {response.status_code} для {url[:50]}..., повтор через {delay:.2f} с")
+                response.close()
+                time.sleep(delay)
+                attempt += 1
+                continue
+            response.raise_for_status()
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt < MEDIA_MAX_RETRIES:
+                delay = _backoff_delay(attempt)
+                logger.warning(f"Мережева помилка для {url[:50]}...: {str(e)}, повтор через {delay:.2f} с")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            _record(time.perf_counter() - started, 0, attempt, True)
+            raise
+        except requests.RequestException:
+            _record(time.perf_counter() - started, 0, attempt, True)
+            raise
+
+        elapsed = time.perf_counter() - started
+        if stream:
+            size = int(response.headers.get("Content-Length") or 0)
+        else:
+            size = len(response.content)
+        _record(elapsed, size, attempt, False)
+        logger.debug(f"Завантажено {size} байт за {elapsed:.3f} с (повторів: {attempt}): {url[:50]}...")
+        return response
+
+
+def get_metrics():
+    """Повертає знімок метрик клієнта
+
+    Returns:
+        dict: Кількість запитів, повторів, помилок, байтів та час завантаження
+    """
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+    snapshot["avg_seconds"] = snapshot["total_seconds"] / snapshot["requests"] if snapshot["requests"] else 0.0
+    return snapshot
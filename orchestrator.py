@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Паралельний скрапінг та парсинг кількох акаунтів Instagram
+
+Оркестратор запускає скрапінг та парсинг обраних акаунтів (або всіх з
+accounts_config.py) у кількох потоках-воркерах. Кожен воркер працює з власним
+браузером з пулу func.f_driver_pool, а кожен акаунт зберігає сторінки в окремі
+файли, тому акаунти не заважають один одному.
+
+Приклад використання:
+```bash
+python orchestrator.py --workers 2 --incremental
+python orchestrator.py --accounts club_okinawa_karate dliavsikhta
+```
+"""
+
+import os
+import time
+import logging
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from accounts_config import get_all_accounts
+from func.f_driver_pool import get_driver_pool
+from selen import get_page_with_pagination
+from parser import main_parser
+from log_config import setup_logging, log_context
+from run_metrics import record_run
+
+logger = logging.getLogger("ScrapeOrchestrator")
+
+# Кількість акаунтів, що обробляються одночасно (кожен воркер - окремий браузер)
+ORCHESTRATOR_WORKERS = int(os.getenv("ORCHESTRATOR_WORKERS", "2"))
+
+
+class ScrapeOrchestrator:
+    """Запускає скрапінг кількох акаунтів паралельно та відстежує прогрес кожного"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._run_id = None
+        self._status = {
+            "is_running": False,
+            "start_time": None,
+            "end_time": None,
+            "workers": 0,
+            "accounts": {},
+            "summary": {}
+        }
+
+    def get_status(self):
+        """Повертає копію поточного стану оркестратора
+
+        Returns:
+            dict: Загальний стан, стан кожного акаунту та підсумок
+        """
+        with self._lock:
+            status = dict(self._status)
+            status["accounts"] = {name: dict(entry) for name, entry in self._status["accounts"].items()}
+            status["summary"] = dict(self._status["summary"])
+        return status
+
+    def _update(self, account_username, **fields):
+        with self._lock:
+            self._status["accounts"][account_username].update(fields)
+
+    def start(self, accounts=None, workers=None, incremental=False):
+        """Запускає оркестрацію у фоновому потоці
+
+        Args:
+            accounts (list, optional): Імена акаунтів. Defaults to None (усі акаунти).
+            workers (int, optional): Кількість воркерів. Defaults to ORCHESTRATOR_WORKERS.
+            incremental (bool, optional): Обробляти лише нові пости. Defaults to False.
+
+        Returns:
+            bool: False, якщо оркестрація вже виконується
+        """
+        with self._lock:
+            if self._status["is_running"]:
+                return False
+            self._status["is_running"] = True
+
+        thread = threading.Thread(target=self.run, args=(accounts, workers, incremental), daemon=True)
+        thread.start()
+        return True
+
+    def run(self, accounts=None, workers=None, incremental=False):
+        """Скрапить та парсить акаунти паралельно і чекає завершення
+
+        Args:
+            accounts (list, optional): Імена акаунтів. Defaults to None (усі акаунти).
+            workers (int, optional): Кількість воркерів. Defaults to ORCHESTRATOR_WORKERS.
+            incremental (bool, optional): Обробляти лише нові пости. Defaults to False.
+
+        Returns:
+            dict: Підсумок по всіх акаунтах
+        """
+        accounts = accounts or [account["username"] for account in get_all_accounts()]
+        workers = max(1, min(workers or ORCHESTRATOR_WORKERS, len(accounts)))
+        started = time.perf_counter()
+        self._run_id = datetime.now().strftime("orch-%Y%m%d-%H%M%S")
+
+        with self._lock:
+            self._status.update({
+                "is_running": True,
+                "start_time": datetime.now(),
+                "end_time": None,
+                "workers": workers,
+                "summary": {},
+                "accounts": {
+                    name: {"status": "queued", "message": "Очікує вільного воркера", "progress": 0,
+                           "added_count": 0, "duplicates_skipped": 0, "start_time": None, "end_time": None}
+                    for name in accounts
+                }
+            })
+
+        # Один браузер на воркер
+        get_driver_pool().resize(workers)
+        logger.info(f"Запуск оркестрації для {len(accounts)} акаунтів з {workers} воркерами")
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scrape") as executor:
+                list(executor.map(lambda name: self._process_account(name, incremental), accounts))
+        finally:
+            summary = self._summarize(time.perf_counter() - started)
+            with self._lock:
+                self._status["summary"] = summary
+                self._status["end_time"] = datetime.now()
+                self._status["is_running"] = False
+
+        logger.info(f"Оркестрацію завершено: {summary}")
+        return summary
+
+    def _process_account(self, account_username, incremental):
+        """Скрапить та парсить один акаунт, оновлюючи його запис прогресу"""
+        with log_context(account=account_username, run_id=self._run_id):
+            self._update(account_username, status="running", progress=10, start_time=datetime.now(),
+                         message=f"Скрапінг Instagram для акаунту {account_username}...")
+            try:
+                with record_run(account_username, run_id=self._run_id):
+                    if not get_page_with_pagination(account_username, incremental=incremental):
+                        raise RuntimeError("не вдалося отримати сторінки (див. лог)")
+
+                    self._update(account_username, progress=60,
+                                 message=f"Парсинг HTML для акаунту {account_username}...")
+                    added_count, skipped_count = main_parser(account_username, incremental=incremental)
+
+                self._update(account_username, status="completed", progress=100, end_time=datetime.now(),
+                             added_count=added_count, duplicates_skipped=skipped_count,
+                             message=f"Додано: {added_count}, пропущено: {skipped_count} дублікатів")
+            except Exception as e:
+                logger.error(f"Помилка при обробці акаунту {account_username}: {e}")
+                self._update(account_username, status="error", progress=0, end_time=datetime.now(),
+                             message=f"Помилка: {str(e)}")
+
+    def _summarize(self, seconds):
+        with self._lock:
+            entries = list(self._status["accounts"].values())
+        return {
+            "accounts": len(entries),
+            "completed": sum(1 for entry in entries if entry["status"] == "completed"),
+            "failed": sum(1 for entry in entries if entry["status"] == "error"),
+            "added_count": sum(entry["added_count"] for entry in entries),
+            "duplicates_skipped": sum(entry["duplicates_skipped"] for entry in entries),
+            "seconds": round(seconds, 1)
+        }
+
+
+# Спільний оркестратор для веб-інтерфейсу та командного рядка
+orchestrator = ScrapeOrchestrator()
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description="Паралельний скрапінг кількох акаунтів Instagram")
+    args_parser.add_argument("--accounts", nargs="*", help="Імена акаунтів (за замовчуванням - усі)")
+    args_parser.add_argument("--workers", type=int, default=ORCHESTRATOR_WORKERS, help="Кількість воркерів")
+    args_parser.add_argument("--incremental", action="store_true", help="Обробляти лише нові пости")
+    args = args_parser.parse_args()
+
+    summary = orchestrator.run(args.accounts, args.workers, args.incremental)
+    for name, entry in orchestrator.get_status()["accounts"].items():
+        logger.info(f"{name}: {entry['status']} - {entry['message']}")
+    logger.info(f"Підсумок: {summary}")
+
+
+if __name__ == "__main__":
+    setup_logging("parser.log")
+    main()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Архів сирих сторінок Instagram, збережених скрапером
+
+Перед видаленням HTML сторінок та JSON відповідей парсер додає їх до архіву.
+Кожен файл стискається (zstd, якщо встановлено zstandard, інакше gzip) і
+зберігається один раз за хешем вмісту (SHA-256), тому однакові сторінки з різних
+запусків не займають місце повторно. Індекс знімків (акаунт, тип сторінки, час)
+зберігається в SQLite базі поруч з архівом. Політика зберігання застосовується
+автоматично після парсингу (не частіше за PAGE_ARCHIVE_PRUNE_INTERVAL годин)
+або вручну командою prune.
+
+Архів дозволяє повторно розпарсити історію після виправлень парсера:
+```bash
+python page_archive.py list --account dliavsikhta
+python page_archive.py reparse --account dliavsikhta --since 2025-01-01
+python page_archive.py prune --days 30 --keep 5
+```
+"""
+
+import os
+import io
+import gzip
+import shutil
+import sqlite3
+import hashlib
+import logging
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from log_config import setup_logging
+
+logger = logging.getLogger("PageArchive")
+
+# Налаштування архіву (можна перевизначити через .env)
+PAGE_ARCHIVE_ENABLED = os.getenv("PAGE_ARCHIVE_ENABLED", "True").lower() == "true"
+PAGE_ARCHIVE_DIR = os.getenv("PAGE_ARCHIVE_DIR", "page_archive")
+PAGE_ARCHIVE_COMPRESSION = os.getenv("PAGE_ARCHIVE_COMPRESSION", "zstd" if zstandard else "gzip")
+PAGE_ARCHIVE_RETENTION_DAYS = int(os.getenv("PAGE_ARCHIVE_RETENTION_DAYS", "30"))
+PAGE_ARCHIVE_KEEP_LATEST = int(os.getenv("PAGE_ARCHIVE_KEEP_LATEST", "5"))  # Знімків на акаунт і тип, що не видаляються
+PAGE_ARCHIVE_PRUNE_INTERVAL = float(os.getenv("PAGE_ARCHIVE_PRUNE_INTERVAL", "24"))  # Автоочищення не частіше, години
+
+# Розширення стиснених файлів
+COMPRESSED_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _index_path():
+    return os.path.join(PAGE_ARCHIVE_DIR, "index.db")
+
+
+def _connect():
+    """Відкриває індекс архіву, створюючи його за потреби"""
+    os.makedirs(PAGE_ARCHIVE_DIR, exist_ok=True)
+    conn = sqlite3.connect(_index_path())
+    conn.row_factory = sqlite3.Row
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS blobs (
+        content_hash TEXT PRIMARY KEY,
+        path TEXT NOT NULL,
+        compression TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        stored_size INTEGER NOT NULL
+    )
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS captures (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account TEXT NOT NULL,
+        page_type TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        captured_at TEXT NOT NULL,
+        content_hash TEXT NOT NULL REFERENCES blobs(content_hash)
+    )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_captures_account ON captures(account, page_type, captured_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_captures_hash ON captures(content_hash)')
+    conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+    return conn
+
+
+def _file_hash(file_path):
+    """Обчислює SHA-256 файлу частинами"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _compress(file_path, target_path, compression):
+    """Стискає файл у тимчасовий файл поруч з цільовим і атомарно перейменовує його"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw, open(file_path, "rb") as src:
+            if compression == "zstd":
+                with zstandard.ZstdCompressor(level=10).stream_writer(raw) as writer:
+                    shutil.copyfileobj(src, writer, HASH_CHUNK_SIZE)
+            else:
+                with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) as writer:
+                    shutil.copyfileobj(src, writer, HASH_CHUNK_SIZE)
+        os.replace(tmp_path, target_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def archive_page(account_username, page_type, file_path, captured_at=None):
+    """Додає збережену сторінку або JSON відповіді до архіву
+
+    Args:
+        account_username (str): Ім'я акаунту Instagram
+        page_type (str): Тип сторінки (posts, reels)
+        file_path (str): Шлях до HTML або JSON файлу
+        captured_at (str, optional): Час знімка. Defaults to None (час зміни файлу).
+
+    Returns:
+        int: ID знімка в архіві або None, якщо архівування вимкнено чи не вдалося
+    """
+    if not PAGE_ARCHIVE_ENABLED:
+        return None
+    if not os.path.exists(file_path):
+        logger.warning(f"Файл {file_path} не знайдено для архівування")
+        return None
+
+    compression = PAGE_ARCHIVE_COMPRESSION
+    if compression == "zstd" and zstandard is None:
+        compression = "gzip"
+    kind = "json" if file_path.endswith(".json") else "html"
+    captured_at = captured_at or datetime.fromtimestamp(os.path.getmtime(file_path)).strftime(DATE_FORMAT)
+
+    try:
+        content_hash = _file_hash(file_path)
+        conn = _connect()
+        try:
+            if conn.execute('SELECT 1 FROM blobs WHERE content_hash = ?', (content_hash,)).fetchone() is None:
+                blob_dir = os.path.join(PAGE_ARCHIVE_DIR, "blobs", content_hash[:2])
+                os.makedirs(blob_dir, exist_ok=True)
+                blob_path = os.path.join(blob_dir, content_hash + COMPRESSED_EXTENSIONS[compression])
+                _compress(file_path, blob_path, compression)
+                size = os.path.getsize(file_path)
+                stored_size = os.path.getsize(blob_path)
+                with conn:
+                    conn.execute(
+                        'INSERT OR IGNORE INTO blobs (content_hash, path, compression, size, stored_size) VALUES (?, ?, ?, ?, ?)',
+                        (content_hash, os.path.relpath(blob_path, PAGE_ARCHIVE_DIR), compression, size, stored_size)
+                    )
+                logger.info(f"Архівовано {file_path}: {size} -> {stored_size} байт ({compression})")
+            else:
+                logger.info(f"Вміст {file_path} вже є в архіві, зберігаємо лише посилання")
+
+            with conn:
+                cursor = conn.execute(
+                    'INSERT INTO captures (account, page_type, kind, captured_at, content_hash) VALUES (?, ?, ?, ?, ?)',
+                    (account_username, page_type, kind, captured_at, content_hash)
+                )
+            return cursor.lastrowid
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.error(f"Помилка при архівуванні {file_path}: {str(e)}")
+        return None
+
+
+def list_captures(account_username=None, page_type=None, since=None, until=None):
+    """Повертає знімки з архіву, від старших до новіших
+
+    Args:
+        account_username (str, optional): Фільтр за акаунтом. Defaults to None.
+        page_type (str, optional): Фільтр за типом сторінки. Defaults to None.
+        since (str, optional): Початок періоду (YYYY-MM-DD[ HH:MM:SS]). Defaults to None.
+        until (str, optional): Кінець періоду, не включно. Defaults to None.
+
+    Returns:
+        list: Словники з полями знімка та розмірами блоба
+    """
+    conditions = []
+    params = []
+    for column, op, value in (("account", "=", account_username), ("page_type", "=", page_type),
+                              ("captured_at", ">=", since), ("captured_at", "<", until)):
+        if value:
+            conditions.append(f"c.{column} {op} ?")
+            params.append(value)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    conn = _connect()
+    try:
+        rows = conn.execute(f'''
+        SELECT c.id, c.account, c.page_type, c.kind, c.captured_at, c.content_hash,
+               b.path, b.compression, b.size, b.stored_size
+        FROM captures c JOIN blobs b ON b.content_hash = c.content_hash
+        {where}
+        ORDER BY c.captured_at, c.id
+        ''', params).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+@contextmanager
+def open_capture(capture):
+    """Відкриває розпакований вміст знімка як бінарний файловий об'єкт
+
+    Args:
+        capture (dict): Знімок з list_captures
+
+    Yields:
+        file: Потік розпакованого вмісту
+    """
+    path = os.path.join(PAGE_ARCHIVE_DIR, capture["path"])
+    if capture["compression"] == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Для читання знімків zstd потрібен пакет zstandard")
+        with open(path, "rb") as raw:
+            with zstandard.ZstdDecompressor().stream_reader(raw) as reader:
+                yield io.BufferedReader(reader)
+    else:
+        with gzip.open(path, "rb") as reader:
+            yield reader
+
+
+def apply_retention(days=None, keep_latest=None):
+    """Видаляє старі знімки та блоби, на які більше ніхто не посилається
+
+    Знімки, старші за days днів, видаляються, але для кожного акаунту та типу
+    сторінки завжди залишаються keep_latest найновіших запусків.
+
+    Args:
+        days (int, optional): Скільки днів зберігати знімки. Defaults to PAGE_ARCHIVE_RETENTION_DAYS.
+        keep_latest (int, optional): Мінімум запусків на акаунт і тип. Defaults to PAGE_ARCHIVE_KEEP_LATEST.
+
+    Returns:
+        tuple: Кількість видалених знімків та звільнених байтів
+    """
+    days = PAGE_ARCHIVE_RETENTION_DAYS if days is None else days
+    keep_latest = PAGE_ARCHIVE_KEEP_LATEST if keep_latest is None else keep_latest
+    cutoff = (datetime.now() - timedelta(days=days)).strftime(DATE_FORMAT)
+
+    conn = _connect()
+    try:
+        with conn:
+            removed = conn.execute('''
+            DELETE FROM captures WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, captured_at,
+                           DENSE_RANK() OVER (PARTITION BY account, page_type ORDER BY captured_at DESC) AS run_rank
+                    FROM captures
+                ) WHERE captured_at < ? AND run_rank > ?
+            )
+            ''', (cutoff, keep_latest)).rowcount
+
+            orphans = conn.execute('''
+            SELECT content_hash, path, stored_size FROM blobs
+            WHERE content_hash NOT IN (SELECT content_hash FROM captures)
+            ''').fetchall()
+            conn.executemany('DELETE FROM blobs WHERE content_hash = ?', [(row["content_hash"],) for row in orphans])
+
+        freed = 0
+        for row in orphans:
+            path = os.path.join(PAGE_ARCHIVE_DIR, row["path"])
+            if os.path.exists(path):
+                os.remove(path)
+                freed += row["stored_size"]
+
+        logger.info(f"Очищення архіву: видалено {removed} знімків, звільнено {freed} байт")
+        return removed, freed
+    finally:
+        conn.close()
+
+
+def apply_retention_if_due(interval_hours=None):
+    """Застосовує політику зберігання, якщо з попереднього очищення минуло interval_hours годин
+
+    Час останнього очищення зберігається в індексі архіву й оновлюється одним
+    умовним UPDATE, тому з кількох процесів очищення запускає лише один.
+
+    Args:
+        interval_hours (float, optional): Мінімальний інтервал. Defaults to PAGE_ARCHIVE_PRUNE_INTERVAL.
+
+    Returns:
+        tuple: Результат apply_retention або None, якщо очищення ще не потрібне
+    """
+    if not PAGE_ARCHIVE_ENABLED or not os.path.exists(_index_path()):
+        return None
+    interval_hours = PAGE_ARCHIVE_PRUNE_INTERVAL if interval_hours is None else interval_hours
+    now = datetime.now()
+
+    try:
+        conn = _connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('last_pruned_at', '')")
+                due = conn.execute(
+                    "UPDATE meta SET value = ? WHERE key = 'last_pruned_at' AND value <= ?",
+                    (now.strftime(DATE_FORMAT), (now - timedelta(hours=interval_hours)).strftime(DATE_FORMAT))
+                ).rowcount
+        finally:
+            conn.close()
+        return apply_retention() if due else None
+    except Exception as e:
+        logger.error(f"Помилка при очищенні архіву: {str(e)}")
+        return None
+
+
+def reparse(account_username=None, page_type=None, since=None, until=None):
+    """Повторно парсить знімки з архіву та зберігає пости в бази акаунтів
+
+    Знімки одного запуску (HTML та JSON з однаковим часом) парсяться разом так само,
+    як у parser.main_parser: перевага віддається JSON відповідям. Повторний запуск
+    безпечний, бо дублікати відсіюються за ключем медіа.
+
+    Args:
+        account_username (str, optional): Фільтр за акаунтом. Defaults to None (усі).
+        page_type (str, optional): Фільтр за типом сторінки. Defaults to None (усі).
+        since (str, optional): Початок періоду. Defaults to None.
+        until (str, optional): Кінець періоду, не включно. Defaults to None.
+
+    Returns:
+        dict: Кількість оброблених запусків, доданих та пропущених постів для кожного акаунту
+    """
+    from accounts_config import get_account_config
+    from parser import init_db, parse_page_sources, save_to_db
+
+    runs = {}
+    for capture in list_captures(account_username, page_type, since, until):
+        key = (capture["account"], capture["page_type"], capture["captured_at"])
+        runs.setdefault(key, {})[capture["kind"]] = capture
+
+    results = {}
+    connections = {}
+    try:
+        for (account, run_page_type, captured_at), captures in runs.items():
+            if account not in connections:
+                connections[account] = init_db(get_account_config(account)["database"])
+            logger.info(f"Повторний парсинг {account}/{run_page_type} від {captured_at}")
+
+            with _open_optional(captures.get("html")) as html_source, _open_optional(captures.get("json")) as json_source:
+                items = parse_page_sources(run_page_type, html_source, json_source)
+            added, skipped = save_to_db(items, connections[account], account)
+
+            result = results.setdefault(account, {"runs": 0, "added": 0, "skipped": 0})
+            result["runs"] += 1
+            result["added"] += added
+            result["skipped"] += skipped
+    finally:
+        for conn in connections.values():
+            conn.close()
+
+    logger.info(f"Повторний парсинг завершено: {results}")
+    return results
+
+
+@contextmanager
+def _open_optional(capture):
+    if capture is None:
+        yield None
+    else:
+        with open_capture(capture) as stream:
+            yield stream
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description="Архів сирих сторінок Instagram")
+    commands = args_parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("list", "Показати знімки"), ("reparse", "Повторно розпарсити знімки")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--account", help="Ім'я акаунту (за замовчуванням - усі)")
+        command.add_argument("--page-type", choices=["posts", "reels"], help="Тип сторінки")
+        command.add_argument("--since", help="Початок періоду, YYYY-MM-DD")
+        command.add_argument("--until", help="Кінець періоду, YYYY-MM-DD")
+
+    prune = commands.add_parser("prune", help="Застосувати політику зберігання")
+    prune.add_argument("--days", type=int, default=PAGE_ARCHIVE_RETENTION_DAYS, help="Скільки днів зберігати")
+    prune.add_argument("--keep", type=int, default=PAGE_ARCHIVE_KEEP_LATEST, help="Мінімум запусків на акаунт і тип")
+
+    args = args_parser.parse_args()
+
+    if args.command == "list":
+        for capture in list_captures(args.account, args.page_type, args.since, args.until):
+            logger.info(f"{capture['id']:>6}  {capture['captured_at']}  {capture['account']:<24} {capture['page_type']:<5} "
+                        f"{capture['kind']:<4} {capture['size']:>10} -> {capture['stored_size']:>9}  {capture['content_hash'][:12]}")
+    elif args.command == "reparse":
+        reparse(args.account, args.page_type, args.since, args.until)
+    elif args.command == "prune":
+        apply_retention(args.days, args.keep)
+
+
+if __name__ == "__main__":
+    setup_logging()
+    main()
@@ -3,12 +3,12 @@ import sqlite3
 import json
 import logging
 import time
-import requests
-import hashlib
 import urllib.parse
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -21,17 +21,18 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 load_dotenv()
 
 # Імпортуємо конфігурацію акаунтів
-from accounts_config import get_account_config, get_all_accounts
+from accounts_config import get_account_config, get_all_accounts, get_page_file, get_capture_file
+from media_client import fetch_media
+from func.f_media import get_media_key
+from html_extractor import iter_posts, iter_reels
+from page_archive import archive_page, apply_retention_if_due
+from db_pool import configure_connection
+from db_schema import apply_migrations, get_database_account
+from post_stats import compute_stats, invalidate_stats
+from thumbnails import generate_thumbnails
+from log_config import setup_logging
+from run_metrics import record_run, timed_stage, stage_add, stage_failed
 
-# Налаштування логування
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("flask_app.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger('InstagramParser')
 
 # Створюємо базову директорію для зображень
@@ -49,6 +50,11 @@ def ensure_account_directories():
 # Створюємо директорії при запуску
 ensure_account_directories()
 
+# Налаштування паралельного завантаження медіа
+MEDIA_DOWNLOAD_WORKERS = int(os.getenv("MEDIA_DOWNLOAD_WORKERS", "8"))  # Загальна кількість потоків
+MEDIA_PER_HOST_LIMIT = int(os.getenv("MEDIA_PER_HOST_LIMIT", "4"))  # Одночасних запитів до одного хоста
+
+@timed_stage("download_and_save_image", check=lambda path: path is not None)
 def download_and_save_image(url, post_type, post_id=None, account_username="default"):
     """
     Завантажує зображення за URL та зберігає його локально
@@ -56,7 +62,7 @@ def download_and_save_image(url, post_type, post_id=None, account_username="defa
     Args:
         url (str): URL зображення для завантаження
         post_type (str): Тип посту (post, reel)
-        post_id (str, optional): Ідентифікатор посту. Defaults to None.
+        post_id (str, optional): Ідентифікатор посту (використовується лише для логування). Defaults to None.
         account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
         
     Returns:
@@ -71,8 +77,8 @@ def download_and_save_image(url, post_type, post_id=None, account_username="defa
         account_config = get_account_config(account_username)
         images_folder = account_config["images_folder"]
         
-        # Генеруємо унікальне ім'я файлу на основі URL
-        url_hash = hashlib.md5(url.encode()).hexdigest()
+        # Генеруємо ім'я файлу на основі стабільного ключа медіа, а не підписаного URL
+        media_key = get_media_key(url)
         file_ext = '.jpg'  # За замовчуванням
         
         # Спробуємо отримати розширення з URL
@@ -84,10 +90,7 @@ def download_and_save_image(url, post_type, post_id=None, account_username="defa
                 file_ext = '.jpg'
         
         # Формуємо шлях для збереження
-        if post_id:
-            filename = f"{post_type}_{post_id}_{url_hash[:8]}{file_ext}"
-        else:
-            filename = f"{post_type}_{url_hash}{file_ext}"
+        filename = f"{post_type}_{media_key}{file_ext}"
         
         # Використовуємо папку для зображень конкретного акаунту
         local_path = BASE_IMAGE_DIR / images_folder / filename
@@ -98,13 +101,13 @@ def download_and_save_image(url, post_type, post_id=None, account_username="defa
             return str(local_path).replace('\\', '/')
             
         # Завантажуємо зображення
-        logger.info(f"Завантажуємо зображення з URL: {url[:50]}... для акаунту {account_username}")
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()  # Перевіряємо на помилки HTTP
+        logger.info(f"Завантажуємо зображення з URL: {url[:50]}... для акаунту {account_username}" + (f" (запис ID: {post_id})" if post_id else ""))
+        response = fetch_media(url, timeout=10)
         
         # Зберігаємо зображення
         with open(local_path, 'wb') as f:
             f.write(response.content)
+        stage_add(bytes=len(response.content), items=1)
             
         logger.info(f"Зображення успішно збережено: {local_path}")
         return str(local_path).replace('\\', '/')
@@ -113,9 +116,66 @@ def download_and_save_image(url, post_type, post_id=None, account_username="defa
         logger.error(f"Помилка при завантаженні зображення: {str(e)}")
         return None
 
-# Функція для створення бази даних
+def download_images_concurrently(jobs, account_username="default", on_complete=None,
+                                 max_workers=None, per_host_limit=None):
+    """
+    Паралельно завантажує зображення для пакету записів з обмеженням на кількість
+    одночасних запитів до одного хоста
+    
+    Args:
+        jobs (list): Список кортежів (row_id, url, post_type, post_id) для завантаження
+        account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
+        on_complete (callable, optional): Викликається в потоці, що викликав функцію,
+            як on_complete(row_id, local_path) одразу після завершення кожного завантаження
+        max_workers (int, optional): Кількість потоків. Defaults to MEDIA_DOWNLOAD_WORKERS.
+        per_host_limit (int, optional): Ліміт запитів на хост. Defaults to MEDIA_PER_HOST_LIMIT.
+        
+    Returns:
+        dict: Відповідність row_id -> локальний шлях (None у разі помилки)
+    """
+    if not jobs:
+        return {}
+    
+    max_workers = max_workers or MEDIA_DOWNLOAD_WORKERS
+    per_host_limit = per_host_limit or MEDIA_PER_HOST_LIMIT
+    
+    # Окремий семафор для кожного хоста, щоб не перевантажувати один CDN-вузол
+    host_limits = {}
+    for _, url, _, _ in jobs:
+        host = urllib.parse.urlparse(url).netloc
+        if host not in host_limits:
+            host_limits[host] = threading.BoundedSemaphore(per_host_limit)
+    
+    def fetch(url, post_type, post_id):
+        with host_limits[urllib.parse.urlparse(url).netloc]:
+            return download_and_save_image(url, post_type, post_id, account_username)
+    
+    results = {}
+    logger.info(f"Паралельне завантаження {len(jobs)} зображень ({max_workers} потоків, до {per_host_limit} на хост) для акаунту {account_username}")
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+        futures = {
+            # Копія контексту потоку: записи логу та метрики завантажень належать поточному запуску
+            executor.submit(contextvars.copy_context().run, fetch, url, post_type, post_id): row_id
+            for row_id, url, post_type, post_id in jobs
+        }
+        for future in as_completed(futures):
+            row_id = futures[future]
+            try:
+                local_path = future.result()
+            except Exception as e:
+                logger.error(f"Помилка при завантаженні зображення для запису ID {row_id}: {str(e)}")
+                local_path = None
+            results[row_id] = local_path
+            if on_complete and local_path:
+                on_complete(row_id, local_path)
+    
+    downloaded = sum(1 for path in results.values() if path)
+    logger.info(f"Завантажено {downloaded} з {len(jobs)} зображень для акаунту {account_username}")
+    return results
+
+# Функція для відкриття бази даних
 def init_db(database_name='instagram_data.db'):
-    """Створює базу даних, якщо вона не існує
+    """Відкриває базу даних, створюючи її та оновлюючи схему за потреби
     
     Args:
         database_name (str): Назва файлу бази даних
@@ -123,141 +183,260 @@ def init_db(database_name='instagram_data.db'):
     Returns:
         sqlite3.Connection: З'єднання з базою даних
     """
-    conn = sqlite3.connect(database_name)
-    cursor = conn.cursor()
-    
-    # Створюємо таблицю для постів
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS posts (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        post_type TEXT,
-        media_url TEXT,
-        description TEXT,
-        timestamp TEXT,
-        username TEXT,
-        is_video INTEGER,
-        parsed_date TEXT,
-        local_path TEXT,
-        account TEXT
-    )
-    ''')
-    
-    conn.commit()
-    logger.info(f"Таблицю постів створено успішно в базі даних {database_name}")
+    conn = configure_connection(sqlite3.connect(database_name))
+    apply_migrations(conn, get_database_account(database_name))
     return conn
 
 # Функція для парсингу HTML сторінки з дописами
-def parse_posts():
+@timed_stage("parse_posts", items=len)
+def parse_posts(file_path="instagram_posts.html"):
+    """Парсить збережену сторінку з дописами за один потоковий прохід
+    
+    Args:
+        file_path (str, optional): Шлях до HTML файлу. Defaults to "instagram_posts.html".
+        
+    Returns:
+        list: Список постів
+    """
     logger.info("Починаємо парсинг постів...")
     try:
-        with open("instagram_posts.html", "r", encoding="utf-8") as f:
-            html_content = f.read()
-        
-        soup = BeautifulSoup(html_content, "html.parser")
-        
-        # Знаходимо всі дописи на сторінці
         all_posts = []
-        
-        # Знаходимо всі зображення
-        images = soup.find_all("img")
-        logger.info(f"Знайдено {len(images)} зображень на сторінці")
-        
-        for img in images:
-            if img.get('src') and not img.get('src').endswith('.ico'):
-                # Це потенційно допис
-                post = {
-                    'post_type': 'post',
-                    'media_url': img.get('src'),
-                    'description': img.get('alt', '') if img.get('alt') else '',
-                    'timestamp': '',
-                    'username': '',
-                    'is_video': False
-                }
-                all_posts.append(post)
-                logger.info(f"Знайдено зображення: {post['media_url'][:50]}...")
-        
-        # Знаходимо всі блоки з дописами
-        post_containers = soup.find_all("div", class_="x1lliihq x1n2onr6 xh8yej3") 
-        logger.info(f"Знайдено {len(post_containers)} контейнерів з дописами")
-        
-        # Якщо знайшли контейнери, додаткова обробка
-        for i, container in enumerate(post_containers):
-            # Шукаємо опис
-            caption = container.find("span", class_="_aacl _aaco _aacu _aacx _aad7 _aade")
-            if caption and i < len(all_posts):
-                all_posts[i]['description'] = caption.text.strip()
-                logger.info(f"Додано опис до посту {i+1}: {caption.text[:30]}...")
+        for post in iter_posts(file_path):
+            all_posts.append(post)
+            logger.info(f"Знайдено зображення: {post['media_url'][:50]}...")
         
         logger.info(f"Всього знайдено {len(all_posts)} постів")
         return all_posts
     
     except Exception as e:
         logger.error(f"Помилка під час парсингу постів: {str(e)}")
+        stage_failed()
         return []
 
 # Функція для парсингу HTML сторінки з reels
-def parse_reels():
+@timed_stage("parse_reels", items=len)
+def parse_reels(file_path="instagram_reels.html"):
+    """Парсить збережену сторінку з reels за один потоковий прохід
+    
+    Args:
+        file_path (str, optional): Шлях до HTML файлу. Defaults to "instagram_reels.html".
+        
+    Returns:
+        list: Список reels
+    """
     logger.info("Починаємо парсинг reels...")
     try:
-        with open("instagram_reels.html", "r", encoding="utf-8") as f:
-            html_content = f.read()
+        all_reels = []
+        for reel in iter_reels(file_path):
+            all_reels.append(reel)
+            logger.info(f"Знайдено reel: {reel['media_url'][:50]}...")
         
-        soup = BeautifulSoup(html_content, "html.parser")
+        logger.info(f"Всього знайдено {len(all_reels)} reels")
+        return all_reels
+    
+    except Exception as e:
+        logger.error(f"Помилка під час парсингу reels: {str(e)}")
+        stage_failed()
+        return []
+
+def _format_taken_at(value):
+    """Перетворює unix-час публікації в рядок формату бази даних"""
+    if not value:
+        return ''
+    return datetime.fromtimestamp(int(value)).strftime("%Y-%m-%d %H:%M:%S")
+
+def _json_media_to_item(node):
+    """Перетворює вузол медіа з JSON відповіді Instagram у пост
+    
+    Підтримує формат API v1 / xdt GraphQL (code, image_versions2, caption.text, taken_at)
+    та старий формат GraphQL (shortcode, display_url, edge_media_to_caption, taken_at_timestamp).
+    """
+    candidates = (node.get('image_versions2') or {}).get('candidates') or []
+    media_url = candidates[0].get('url') if candidates else node.get('display_url') or node.get('thumbnail_src')
+    if not media_url:
+        return None
+    
+    caption = node.get('caption')
+    if isinstance(caption, dict):
+        description = caption.get('text') or ''
+    else:
+        edges = (node.get('edge_media_to_caption') or {}).get('edges') or []
+        description = edges[0].get('node', {}).get('text', '') if edges else ''
+    if not description:
+        description = node.get('accessibility_caption') or ''
+    
+    owner = node.get('user') or node.get('owner') or {}
+    is_video = node.get('media_type') == 2 or bool(node.get('is_video'))
+    return {
+        'post_type': 'reel' if node.get('product_type') == 'clips' else 'post',
+        'media_url': media_url,
+        'description': description,
+        'timestamp': _format_taken_at(node.get('taken_at') or node.get('taken_at_timestamp')),
+        'username': owner.get('username') or '',
+        'is_video': is_video,
+        'shortcode': node.get('code') or node.get('shortcode')
+    }
+
+@timed_stage("parse_json_payloads", items=len)
+def parse_json_payloads(source):
+    """Витягує пости з перехоплених JSON/GraphQL відповідей Instagram
+    
+    Обходить відповіді рекурсивно та знаходить вузли медіа за наявністю shortcode
+    і зображення, тому не залежить від назв конкретних запитів GraphQL.
+    
+    Args:
+        source (str | file | list): Шлях до JSON файлу, збереженого func.f_auch.JsonCapture,
+            бінарний файловий об'єкт з ним або список вже завантажених відповідей
         
-        # Знаходимо всі reels на сторінці
-        all_reels = []
+    Returns:
+        list: Список постів у форматі parse_posts з додатковим полем shortcode
+    """
+    logger.info("Починаємо парсинг JSON відповідей...")
+    try:
+        if isinstance(source, str):
+            with open(source, "r", encoding="utf-8") as f:
+                source = json.load(f)
+        elif hasattr(source, "read"):
+            source = json.load(source)
         
-        # Шукаємо відео або превью відео
-        videos = soup.find_all("video")
-        logger.info(f"Знайдено {len(videos)} відео")
+        items = []
+        seen_codes = set()
+        stack = [source]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(reversed(node))
+            elif isinstance(node, dict):
+                code = node.get('code') or node.get('shortcode')
+                if code and ('image_versions2' in node or 'display_url' in node):
+                    # Вкладені медіа каруселі не обходимо: пост представлений першим зображенням
+                    if code not in seen_codes:
+                        item = _json_media_to_item(node)
+                        if item:
+                            seen_codes.add(code)
+                            items.append(item)
+                    continue
+                stack.extend(reversed(list(node.values())))
         
-        for video in videos:
-            if video.get('src'):
-                reel = {
-                    'post_type': 'reel',
-                    'media_url': video.get('src'),
-                    'description': '',
-                    'timestamp': '',
-                    'username': '',
-                    'is_video': True
-                }
-                all_reels.append(reel)
-                logger.info(f"Знайдено відео: {reel['media_url'][:50]}...")
+        logger.info(f"Всього знайдено {len(items)} постів у JSON відповідях")
+        return items
+    
+    except Exception as e:
+        logger.error(f"Помилка під час парсингу JSON відповідей: {str(e)}")
+        stage_failed()
+        return []
+
+def parse_page_sources(page_type, html_source=None, json_source=None):
+    """Парсить сторінку, віддаючи перевагу перехопленим JSON відповідям
+    
+    Args:
+        page_type (str): Тип сторінки (posts, reels)
+        html_source (str | file, optional): HTML сторінка. Defaults to None.
+        json_source (str | file, optional): JSON відповіді. Defaults to None.
         
-        # Якщо відео не знайшли, шукаємо превью зображення
-        if not all_reels:
-            images = soup.find_all("img")
-            logger.info(f"Знайдено {len(images)} зображень (превью reels)")
-            
-            for img in images:
-                if img.get('src') and not img.get('src').endswith('.ico'):
-                    reel = {
-                        'post_type': 'reel',
-                        'media_url': img.get('src'),
-                        'description': img.get('alt', '') if img.get('alt') else '',
-                        'timestamp': '',
-                        'username': '',
-                        'is_video': True
-                    }
-                    all_reels.append(reel)
+    Returns:
+        list: Список постів
+    """
+    items = parse_json_payloads(json_source) if json_source is not None else []
+    if not items and html_source is not None:
+        items = parse_posts(html_source) if page_type == "posts" else parse_reels(html_source)
+    return items
+
+def load_page_items(account_username, page_type):
+    """Парсить збережену сторінку акаунту, архівує та видаляє її файли
+    
+    Якщо під час скрапінгу були перехоплені JSON відповіді, пости беруться з них,
+    інакше - з HTML сторінки. Обидва файли додаються до архіву page_archive.
+    
+    Args:
+        account_username (str): Ім'я акаунту Instagram
+        page_type (str): Тип сторінки (posts, reels)
         
-        # Знаходимо заголовки і описи
-        titles = soup.find_all("h1", class_="_ap3a _aaco _aacu _aacx _aad7 _aade")
-        logger.info(f"Знайдено {len(titles)} заголовків")
+    Returns:
+        list: Список постів або None, якщо файлів сторінки немає
+    """
+    html_file = get_page_file(account_username, page_type)
+    json_file = get_capture_file(account_username, page_type)
+    html_source = html_file if os.path.exists(html_file) else None
+    json_source = json_file if os.path.exists(json_file) else None
+    if html_source is None and json_source is None:
+        return None
+    
+    items = parse_page_sources(page_type, html_source, json_source)
+    
+    # Файли одного запуску архівуються з однаковим часом, щоб reparse обробив їх разом
+    captured_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for file_path in (html_source, json_source):
+        if file_path:
+            archive_page(account_username, page_type, file_path, captured_at)
+            # Видаляємо файл після парсингу
+            remove_html_file(file_path)
+    
+    return items
+
+# Максимальна кількість параметрів в одному запиті IN (...)
+SQL_IN_CHUNK_SIZE = 500
+
+def fetch_existing_media(cursor, media_keys):
+    """Повертає записи, що вже існують в базі, для набору ключів медіа
+    
+    Ключі перевіряються частинами по SQL_IN_CHUNK_SIZE через індекс idx_posts_media_key,
+    тому кількість запитів не залежить від кількості записів в базі.
+    
+    Args:
+        cursor (sqlite3.Cursor): Курсор бази даних
+        media_keys (list): Список ключів медіа
         
-        for i, title in enumerate(titles):
-            if i < len(all_reels):
-                all_reels[i]['description'] = title.text.strip()
-                logger.info(f"Додано опис до reel {i+1}: {title.text[:30]}...")
+    Returns:
+        dict: Відповідність media_key -> (id, local_path)
+    """
+    existing = {}
+    for start in range(0, len(media_keys), SQL_IN_CHUNK_SIZE):
+        chunk = media_keys[start:start + SQL_IN_CHUNK_SIZE]
+        placeholders = ", ".join("?" * len(chunk))
+        cursor.execute(f"SELECT media_key, id, local_path FROM posts WHERE media_key IN ({placeholders})", chunk)
+        for media_key, post_id, local_path in cursor.fetchall():
+            existing[media_key] = (post_id, local_path)
+    return existing
+
+def load_known_media_keys(account_username="default"):
+    """Завантажує ключі всіх медіа, що вже збережені в базі акаунту
+    
+    Використовується в інкрементальному режимі, щоб зупиняти скрол на вже відомих
+    постах та обробляти лише нові.
+    
+    Args:
+        account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
         
-        logger.info(f"Всього знайдено {len(all_reels)} reels")
-        return all_reels
+    Returns:
+        set: Множина ключів медіа
+    """
+    account_config = get_account_config(account_username)
+    conn = init_db(account_config["database"])
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT media_key FROM posts WHERE media_key IS NOT NULL")
+        known_keys = {row[0] for row in cursor.fetchall()}
+    finally:
+        conn.close()
+    logger.info(f"Завантажено {len(known_keys)} відомих ключів медіа для акаунту {account_username}")
+    return known_keys
+
+def filter_new_items(items, known_keys):
+    """Відкидає елементи, ключі медіа яких вже відомі
     
-    except Exception as e:
-        logger.error(f"Помилка під час парсингу reels: {str(e)}")
-        return []
+    Args:
+        items (list): Список постів
+        known_keys (set): Множина відомих ключів медіа
+        
+    Returns:
+        tuple: Список нових постів та кількість відкинутих
+    """
+    new_items = [item for item in items if get_media_key(item.get('media_url')) not in known_keys]
+    return new_items, len(items) - len(new_items)
 
 # Функція для збереження даних у базу
+@timed_stage("save_to_db", items=lambda result: result[0])
 def save_to_db(items, conn=None, account_username="default"):
     """Зберігає дані у базу
     
@@ -282,62 +461,74 @@ def save_to_db(items, conn=None, account_username="default"):
         conn = init_db(database_name)
     
     cursor = conn.cursor()
-    added_count = 0
     skipped_count = 0
+    # Завантаження медіа виконуються після вставки записів: (row_id, url, post_type, post_id)
+    download_jobs = []
+    parsed_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
+    # Готуємо записи пакету, відкидаючи дублікати всередині пакету
+    batch = {}
     for item in items:
-        try:
-            post_type = item.get('post_type')
-            media_url = item.get('media_url')
-            description = item.get('description')
-            timestamp = item.get('timestamp')
-            username = item.get('username')
-            is_video = item.get('is_video', False)
-            parsed_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            if not media_url:
-                logger.warning("Пропускаємо запис без URL медіа")
-                continue
-            
-            # Ефективна перевірка по індексу
-            cursor.execute("SELECT id FROM posts WHERE media_url = ? LIMIT 1", (media_url,))
-            existing_post = cursor.fetchone()
-            if existing_post:
-                logger.info(f"URL вже існує в базі: {media_url[:30]}...")
-                skipped_count += 1
-                
-                # Спробуємо завантажити зображення для існуючого запису, якщо воно ще не завантажено
-                post_id = existing_post[0]
-                cursor.execute("SELECT local_path FROM posts WHERE id = ?", (post_id,))
-                local_path_result = cursor.fetchone()
-                local_path = local_path_result[0] if local_path_result and local_path_result[0] else None
-                
-                if not local_path or not os.path.exists(local_path):
-                    logger.info(f"Завантажуємо зображення для існуючого запису ID: {post_id}")
-                    local_path = download_and_save_image(media_url, post_type, post_id, account_username)
-                    if local_path:
-                        cursor.execute("UPDATE posts SET local_path = ?, account = ? WHERE id = ?", (local_path, account_username, post_id))
-                        conn.commit()
-                        logger.info(f"Оновлено локальний шлях для запису ID: {post_id}")
-                
-                continue
-            
-            # Завантажуємо зображення
-            local_path = download_and_save_image(media_url, post_type, None, account_username)
-            
-            # Додаємо запис у базу даних
-            cursor.execute('''
-            INSERT INTO posts (post_type, media_url, description, timestamp, username, is_video, parsed_date, local_path, account)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (post_type, media_url, description, timestamp, username, is_video, parsed_date, local_path, account_username))
-            
-            added_count += 1
-            
-        except Exception as e:
-            logger.error(f"Помилка при збереженні в базу: {str(e)}")
+        media_url = item.get('media_url')
+        if not media_url:
+            logger.warning("Пропускаємо запис без URL медіа")
+            continue
+        
+        # Дедуплікація за стабільним ключем медіа, а не за підписаним URL
+        media_key = get_media_key(media_url)
+        if media_key in batch:
+            skipped_count += 1
+            continue
+        batch[media_key] = item
+    
+    # Одним проходом по індексу визначаємо, які ключі пакету вже є в базі
+    existing = fetch_existing_media(cursor, list(batch))
+    for media_key, (post_id, local_path) in existing.items():
+        item = batch.pop(media_key)
+        skipped_count += 1
+        # Завантажимо зображення для існуючого запису, якщо воно ще не завантажено
+        if not local_path or not os.path.exists(local_path):
+            download_jobs.append((post_id, item.get('media_url'), item.get('post_type'), post_id))
+    if existing:
+        logger.info(f"Знайдено {len(existing)} записів, що вже існують в базі, з них {len(download_jobs)} без локального зображення")
+    
+    # Вставляємо нові записи одним executemany, локальний шлях заповнимо після завантаження
+    rows = [
+        (item.get('post_type'), item.get('media_url'), item.get('description'), item.get('timestamp'),
+         item.get('username'), item.get('is_video', False), parsed_date, None, account_username, media_key)
+        for media_key, item in batch.items()
+    ]
+    added_count = 0
+    try:
+        with conn:
+            cursor.executemany('''
+            INSERT OR IGNORE INTO posts (post_type, media_url, description, timestamp, username, is_video, parsed_date, local_path, account, media_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            added_count = max(cursor.rowcount, 0) if rows else 0
+        # Записи, вставлені паралельним процесом між перевіркою та вставкою, вважаємо дублікатами
+        skipped_count += len(rows) - added_count
+        
+        inserted = fetch_existing_media(cursor, list(batch))
+        for media_key, item in batch.items():
+            if media_key in inserted and not inserted[media_key][1]:
+                download_jobs.append((inserted[media_key][0], item.get('media_url'), item.get('post_type'), None))
+    except Exception as e:
+        logger.error(f"Помилка при збереженні в базу: {str(e)}")
+        stage_failed()
     
-    conn.commit()
     logger.info(f"Збережено {added_count} нових елементів у базу даних {database_name}, пропущено {skipped_count} дублікатів")
+    invalidate_stats(account_username)
+    
+    def update_local_path(row_id, local_path):
+        cursor.execute("UPDATE posts SET local_path = ?, account = ? WHERE id = ?", (local_path, account_username, row_id))
+        conn.commit()
+    
+    downloaded = download_images_concurrently(download_jobs, account_username, on_complete=update_local_path)
+    if download_jobs:
+        invalidate_stats(account_username)
+        # Мініатюри WebP для сітки постів (і конвертація HEIC) у пулі процесів
+        generate_thumbnails([path for path in downloaded.values() if path])
     return added_count, skipped_count
 
 # Функція для виведення статистики
@@ -348,34 +539,14 @@ def print_stats(conn, account_username="default"):
         conn (sqlite3.Connection): З'єднання з базою даних
         account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
     """
-    cursor = conn.cursor()
-    
-    # Отримуємо конфігурацію акаунту
-    account_config = get_account_config(account_username)
-    
-    # Статистика для конкретного акаунту
-    cursor.execute("SELECT COUNT(*) FROM posts WHERE account = ?", (account_username,))
-    account_total = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM posts WHERE post_type = 'post' AND account = ?", (account_username,))
-    post_count = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM posts WHERE post_type = 'reel' AND account = ?", (account_username,))
-    reel_count = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM posts WHERE local_path IS NOT NULL AND local_path != '' AND account = ?", (account_username,))
-    local_images_count = cursor.fetchone()[0]
-    
-    # Загальна статистика
-    cursor.execute("SELECT COUNT(*) FROM posts")
-    total_count = cursor.fetchone()[0]
+    stats = compute_stats(conn, account_username)
     
     logger.info(f"=== Статистика бази даних для акаунту {account_username} ===")
-    logger.info(f"Всього записів для акаунту: {account_total}")
-    logger.info(f"Дописів: {post_count}")
-    logger.info(f"Reels: {reel_count}")
-    logger.info(f"Локальних зображень: {local_images_count}")
-    logger.info(f"Всього записів в базі: {total_count}")
+    logger.info(f"Всього записів для акаунту: {stats['total_posts']}")
+    logger.info(f"Дописів: {stats['regular_posts']}")
+    logger.info(f"Reels: {stats['reels']}")
+    logger.info(f"Локальних зображень: {stats['local_images']}")
+    logger.info(f"Останнє оновлення: {stats['last_update']}")
     logger.info("===========================")
 
 # Функція для видалення HTML файлів
@@ -390,11 +561,14 @@ def remove_html_file(file_path):
         logger.error(f"Помилка при видаленні файлу {file_path}: {str(e)}")
 
 # Головна функція
-def main_parser(account_username="default"):
+def main_parser(account_username="default", incremental=False, on_page=None):
     """Головна функція парсера
     
     Args:
         account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
+        incremental (bool, optional): Обробляти лише медіа, яких ще немає в базі. Defaults to False.
+        on_page (callable, optional): Викликається як on_page(page_type) перед кожним типом сторінки;
+            виняток з нього перериває парсинг (так черга завдань перевіряє скасування). Defaults to None.
         
     Returns:
         tuple: Кількість доданих та пропущених записів
@@ -412,27 +586,27 @@ def main_parser(account_username="default"):
     total_added = 0
     total_skipped = 0
     
-    # Парсимо пости
-    posts_file = "instagram_posts.html"
-    if os.path.exists(posts_file):
-        posts = parse_posts()
-        added, skipped = save_to_db(posts, conn, account_username)
-        total_added += added
-        total_skipped += skipped
-        # Видаляємо HTML файл після парсингу
-        remove_html_file(posts_file)
-    else:
-        logger.warning(f"Файл {posts_file} не знайдено")
+    # В інкрементальному режимі відомі медіа не зберігаються і не завантажуються повторно
+    known_keys = load_known_media_keys(account_username) if incremental else None
     
-    # Парсимо reels
-    reels_file = "instagram_reels.html"
-    if os.path.exists(reels_file):
-        reels = parse_reels()
-        added, skipped = save_to_db(reels, conn, account_username)
+    # Парсимо пости та reels
+    for page_type in ("posts", "reels"):
+        if on_page:
+            on_page(page_type)
+        items = load_page_items(account_username, page_type)
+        if items is None:
+            logger.warning(f"Файл {get_page_file(account_username, page_type)} не знайдено")
+            continue
+        if known_keys:
+            items, known = filter_new_items(items, known_keys)
+            total_skipped += known
+            logger.info(f"Інкрементальний режим ({page_type}): нових {len(items)}, відомих пропущено {known}")
+        added, skipped = save_to_db(items, conn, account_username)
         total_added += added
         total_skipped += skipped
-        # Видаляємо HTML файл після парсингу
-        remove_html_file(reels_file)
+    
+    # Старі знімки архіву сторінок видаляються за політикою зберігання (не частіше раз на добу)
+    apply_retention_if_due()
     
     # Виводимо статистику
     print_stats(conn, account_username)
@@ -445,4 +619,6 @@ def main_parser(account_username="default"):
 
 # Запускаємо парсер, якщо скрипт запущений напряму
 if __name__ == "__main__":
-    main_parser()
\ No newline at end of file
+    setup_logging("parser.log")
+    with record_run("default"):
+        main_parser()
\ No newline at end of file
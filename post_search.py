@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Повнотекстовий пошук постів за описами
+
+Пошук працює по індексу FTS5 posts_fts (див. db_schema), який тригери
+тримають синхронним з таблицею posts. Результати впорядковуються за
+релевантністю (bm25) та розбиваються на сторінки. Можна шукати в одному
+акаунті або одразу в усіх (через federated).
+
+Якщо SQLite зібрано без FTS5, міграція не створює posts_fts, і пошук
+виконується через LIKE: усі слова мають зустрічатися в описі, результати
+впорядковані від новіших до старших (без score). LIKE ігнорує регістр лише
+для латиниці, тому кириличне слово шукається в нижньому регістрі та з великої
+літери.
+
+Приклад використання:
+```python
+from post_search import search_posts
+
+results, total = search_posts("карате тренування", account="club_okinawa_karate")
+for post in results:
+    print(post["score"], post["snippet"])
+```
+"""
+
+import re
+import html
+import logging
+
+from db_pool import db_connection
+from federated import ALL_ACCOUNTS, POST_COLUMNS, attached, get_account_databases, iter_federated
+
+logger = logging.getLogger("PostSearch")
+
+# Кількість слів у фрагменті опису з підсвіченими збігами
+SNIPPET_TOKENS = 16
+
+# Службові символи для позначення збігів у фрагменті до екранування HTML
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+
+# CROSS JOIN фіксує порядок обходу: спочатку збіги з індексу FTS, потім рядки posts.
+# Інакше планувальник може обрати індекс за акаунтом і виконувати MATCH для кожного поста.
+_FTS_SOURCE = "{alias}.posts_fts CROSS JOIN {alias}.posts ON posts.id = posts_fts.rowid"
+_FTS_SELECT = ", ".join(f"posts.{column}" for column in POST_COLUMNS) + (
+    ", posts_fts.rank AS score"
+    f", snippet(posts_fts, 0, '{_MARK_START}', '{_MARK_END}', '…', {SNIPPET_TOKENS}) AS snippet"
+)
+
+
+def build_match_query(text):
+    """Перетворює введений користувачем текст у запит FTS5
+
+    Кожне слово шукається як префікс ("карат" знаходить "карате"), всі слова
+    мають бути присутні. Спеціальний синтаксис FTS5 у введеному тексті ігнорується.
+
+    Args:
+        text (str): Текст пошуку
+
+    Returns:
+        str: Вираз MATCH або порожній рядок, якщо в тексті немає слів
+    """
+    terms = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def fts_available(account="default"):
+    """Перевіряє, що в базах акаунту є повнотекстовий індекс posts_fts
+
+    Args:
+        account (str, optional): Ім'я акаунту або "all" для всіх акаунтів. Defaults to "default".
+
+    Returns:
+        bool: False, якщо хоча б одна база не має posts_fts (SQLite без FTS5)
+    """
+    query = "SELECT 1 FROM {alias}.sqlite_master WHERE type = 'table' AND name = 'posts_fts'"
+    if account != ALL_ACCOUNTS:
+        with db_connection(account) as conn:
+            return conn.execute(query.format(alias="main")).fetchone() is not None
+    for database_name in get_account_databases():
+        with attached([database_name]) as (conn, aliases):
+            if conn.execute(query.format(alias=aliases[0])).fetchone() is None:
+                return False
+    return True
+
+
+def _render_snippet(snippet):
+    """Екранує фрагмент опису та підсвічує збіги тегом <mark>"""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _to_result(row):
+    result = dict(row)
+    result["snippet"] = _render_snippet(result["snippet"])
+    return result
+
+
+def _like_snippet(description):
+    """Перші SNIPPET_TOKENS слів опису (для пошуку через LIKE, без підсвічування)"""
+    words = (description or "").split()
+    snippet = " ".join(words[:SNIPPET_TOKENS]) + ("…" if len(words) > SNIPPET_TOKENS else "")
+    return html.escape(snippet)
+
+
+def _search_like(terms, account, post_type, page, per_page):
+    """Пошук через LIKE для баз без posts_fts; повертає те саме, що search_posts"""
+    where = " AND ".join("(description LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')" for _ in terms)
+    params = []
+    for term in terms:
+        escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        params += [f"%{escaped}%", f"%{escaped.capitalize()}%"]
+    if post_type in ("post", "reel"):
+        where += " AND post_type = ?"
+        params.append(post_type)
+    offset = (max(page, 1) - 1) * per_page
+    select = ", ".join(POST_COLUMNS)
+
+    if account == ALL_ACCOUNTS:
+        total = sum(row["total"] for row in iter_federated("COUNT(*) AS total", where, params))
+        rows = iter_federated(select, where, params, order_by=[("parsed_date", True), ("id", True)],
+                              limit=offset + per_page)
+        rows = [row for index, row in enumerate(rows) if index >= offset]
+    else:
+        where += " AND account = ?"
+        params.append(account)
+        with db_connection(account) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM posts WHERE {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {select} FROM posts WHERE {where} ORDER BY parsed_date DESC, id DESC LIMIT ? OFFSET ?",
+                params + [per_page, offset]
+            ).fetchall()
+
+    results = []
+    for row in rows:
+        result = dict(row)
+        result["score"] = None
+        result["snippet"] = _like_snippet(result["description"])
+        results.append(result)
+    return results, total
+
+
+def search_posts(text, account="default", post_type=None, page=1, per_page=20):
+    """Шукає пости за описом з ранжуванням за релевантністю
+
+    Args:
+        text (str): Текст пошуку
+        account (str, optional): Ім'я акаунту або "all" для всіх акаунтів. Defaults to "default".
+        post_type (str, optional): Тип постів (post, reel). Defaults to None (усі).
+        page (int, optional): Номер сторінки результатів. Defaults to 1.
+        per_page (int, optional): Кількість результатів на сторінці. Defaults to 20.
+
+    Returns:
+        tuple: Список знайдених постів (з полями score та snippet у HTML) і загальна кількість
+    """
+    match = build_match_query(text)
+    if not match:
+        return [], 0
+
+    if not fts_available(account):
+        logger.warning(f"Індекс posts_fts відсутній ({account}), пошук '{text}' виконується через LIKE")
+        results, total = _search_like(re.findall(r"\w+", text.lower()), account, post_type, page, per_page)
+        logger.info(f"Пошук '{text}' ({account}): знайдено {total}, сторінка {page}")
+        return results, total
+
+    where = "posts_fts MATCH ?"
+    params = [match]
+    if post_type in ("post", "reel"):
+        where += " AND post_type = ?"
+        params.append(post_type)
+    offset = (max(page, 1) - 1) * per_page
+
+    if account == ALL_ACCOUNTS:
+        total = sum(row["total"] for row in iter_federated("COUNT(*) AS total", where, params, source=_FTS_SOURCE))
+        rows = iter_federated(_FTS_SELECT, where, params, order_by=[("score", False)],
+                              limit=offset + per_page, source=_FTS_SOURCE)
+        results = [_to_result(row) for index, row in enumerate(rows) if index >= offset]
+    else:
+        where += " AND account = ?"
+        params.append(account)
+        source = _FTS_SOURCE.format(alias="main")
+        with db_connection(account) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM {source} WHERE {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {_FTS_SELECT} FROM {source} WHERE {where} ORDER BY score LIMIT ? OFFSET ?",
+                params + [per_page, offset]
+            ).fetchall()
+        results = [_to_result(row) for row in rows]
+
+    logger.info(f"Пошук '{text}' ({account}): знайдено {total}, сторінка {page}")
+    return results, total
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Статистика постів акаунту
+
+Уся статистика рахується одним агрегатним запитом з умовними сумами, який
+читає лише покриваючий індекс idx_posts_stats і не звертається до таблиці.
+Результат кешується для кожного акаунту і скидається, коли парсер зберігає
+нові пости (parser.save_to_db), або після STATS_CACHE_TTL секунд, якщо базу
+змінив інший процес.
+
+Приклад використання:
+```python
+from post_stats import get_account_stats
+
+stats = get_account_stats("dliavsikhta")
+print(stats["total_posts"], stats["reels"])
+```
+"""
+
+import os
+import time
+import logging
+import threading
+
+from db_pool import db_connection
+
+logger = logging.getLogger("PostStats")
+
+# Скільки секунд статистика вважається актуальною без явного скидання кешу
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "30"))
+
+# Агрегати статистики, спільні для запиту одного акаунту та запиту по всіх базах (federated)
+STATS_AGGREGATES = '''
+    COUNT(*) AS total_posts,
+    COALESCE(SUM(CASE WHEN post_type = 'post' THEN 1 ELSE 0 END), 0) AS regular_posts,
+    COALESCE(SUM(CASE WHEN post_type = 'reel' THEN 1 ELSE 0 END), 0) AS reels,
+    COALESCE(SUM(CASE WHEN local_path IS NOT NULL AND local_path != '' THEN 1 ELSE 0 END), 0) AS local_images,
+    COALESCE(MAX(parsed_date), '') AS last_update
+'''
+
+STATS_QUERY = f'''
+SELECT {STATS_AGGREGATES}
+FROM posts
+WHERE account = ?
+'''
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def compute_stats(conn, account_username="default"):
+    """Рахує статистику акаунту одним запитом
+
+    Args:
+        conn (sqlite3.Connection): З'єднання з базою даних
+        account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
+
+    Returns:
+        dict: total_posts, regular_posts, reels, local_images, last_update
+    """
+    row = conn.execute(STATS_QUERY, (account_username,)).fetchone()
+    return {
+        "total_posts": row[0],
+        "regular_posts": row[1],
+        "reels": row[2],
+        "local_images": row[3],
+        "last_update": row[4]
+    }
+
+
+def get_account_stats(account_username="default"):
+    """Повертає статистику акаунту з кешу або рахує її заново
+
+    Args:
+        account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
+
+    Returns:
+        dict: Копія статистики акаунту
+    """
+    with _cache_lock:
+        cached = _cache.get(account_username)
+    if cached and time.monotonic() - cached[0] < STATS_CACHE_TTL:
+        return dict(cached[1])
+
+    with db_connection(account_username) as conn:
+        stats = compute_stats(conn, account_username)
+
+    with _cache_lock:
+        _cache[account_username] = (time.monotonic(), stats)
+    return dict(stats)
+
+
+def invalidate_stats(account_username=None):
+    """Скидає кеш статистики акаунту або всіх акаунтів
+
+    Args:
+        account_username (str, optional): Ім'я акаунту Instagram. Defaults to None (усі акаунти).
+    """
+    with _cache_lock:
+        if account_username is None:
+            _cache.clear()
+        else:
+            _cache.pop(account_username, None)
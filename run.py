@@ -1,6 +1,10 @@
 from selen import  get_page_with_pagination as selen_main
 from parser import main_parser
+from log_config import setup_logging
+from run_metrics import record_run
 
 if __name__ == "__main__":
-    selen_main()
-    main_parser()
+    setup_logging("parser.log")
+    with record_run("default"):
+        selen_main()
+        main_parser()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Вимірювання етапів скрапінгу та парсингу
+
+Етапи (init_selenium, login_to_instagram, save_page, parse_posts, parse_reels,
+download_and_save_image, save_to_db) позначені декоратором timed_stage. Кожен
+виклик етапу додає до поточного запуску (record_run) тривалість, помилку, байти
+та кількість оброблених елементів. Запуском є обробка одного акаунту: завдання
+черги або акаунт в оркестраторі.
+
+Після завершення запуску його підсумок зберігається в базу акаунту (таблиця runs),
+а лічильники етапів додаються до накопичених значень (stage_metrics,
+stage_buckets). Тому /metrics бачить запуски всіх процесів-воркерів і не
+втрачає значення після перезапуску, а читає лише кілька рядків на акаунт.
+
+Поза запуском етапи не записуються, тож функції можна викликати окремо без
+накладних витрат на збереження.
+
+Приклад використання:
+```python
+from run_metrics import record_run, timed_stage, stage_add
+
+@timed_stage("download_and_save_image")
+def download(url):
+    content = fetch(url)
+    stage_add(bytes=len(content), items=1)
+
+with record_run("dliavsikhta", run_id="job-12"):
+    download(url)
+```
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import functools
+import contextvars
+from datetime import datetime
+from contextlib import contextmanager
+
+from db_pool import db_connection
+from federated import iter_federated
+
+logger = logging.getLogger("RunMetrics")
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+
+# Межі кошиків гістограми тривалості етапів, секунди (змінювати не можна: значення накопичуються в базі)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+METRIC_PREFIX = "instagram"
+
+_current_run = contextvars.ContextVar("metrics_run", default=None)
+_current_stage = contextvars.ContextVar("metrics_stage", default=None)
+
+
+class StageStats:
+    """Накопичені значення одного етапу в межах запуску"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.bytes = 0
+        self.items = 0
+        self.buckets = [0] * len(STAGE_BUCKETS)
+
+    def observe(self, seconds, failed=False, bytes=0, items=0):
+        self.calls += 1
+        self.errors += int(failed)
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.bytes += bytes
+        self.items += items
+        for index, bound in enumerate(STAGE_BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                break
+
+    def to_dict(self):
+        return {"calls": self.calls, "errors": self.errors, "seconds": round(self.seconds, 3),
+                "max_seconds": round(self.max_seconds, 3), "bytes": self.bytes, "items": self.items}
+
+
+class RunRecorder:
+    """Етапи одного запуску; записи надходять з різних потоків"""
+
+    def __init__(self, account_username, run_id):
+        self.account = account_username
+        self.run_id = run_id
+        self.started_at = datetime.now()
+        self.stages = {}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self._started
+
+    def observe(self, name, seconds, failed=False, bytes=0, items=0):
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.observe(seconds, failed, bytes, items)
+
+    def summary(self):
+        """Повертає підсумок етапів запуску
+
+        Returns:
+            dict: Етап -> словник значень (calls, errors, seconds, max_seconds, bytes, items)
+        """
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self.stages.items()}
+
+
+class _StageScope:
+    """Виклик етапу: дані, які функція етапу додає під час виконання"""
+
+    __slots__ = ("failed", "bytes", "items")
+
+    def __init__(self):
+        self.failed = False
+        self.bytes = 0
+        self.items = 0
+
+
+def current_run():
+    """Повертає поточний запуск потоку або None"""
+    return _current_run.get()
+
+
+@contextmanager
+def record_run(account_username, run_id=None):
+    """Записує етапи, виконані всередині блоку, як один запуск акаунту
+
+    Вкладений виклик приєднується до вже активного запуску. Після завершення
+    блоку підсумок зберігається в базу акаунту; помилка збереження лише логується.
+
+    Args:
+        account_username (str): Ім'я акаунту Instagram
+        run_id (str, optional): Ідентифікатор запуску. Defaults to None (cli-<час>-<pid>).
+
+    Yields:
+        RunRecorder: Запуск (або None, якщо METRICS_ENABLED=False)
+    """
+    active = _current_run.get()
+    if active is not None or not METRICS_ENABLED:
+        yield active
+        return
+
+    recorder = RunRecorder(account_username, run_id or f"cli-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}")
+    token = _current_run.set(recorder)
+    status = "failed"
+    try:
+        yield recorder
+        status = "completed"
+    finally:
+        _current_run.reset(token)
+        try:
+            save_run(recorder, status)
+        except Exception as e:
+            logger.error(f"Не вдалося зберегти метрики запуску {recorder.run_id}: {str(e)}")
+
+
+@contextmanager
+def stage(name):
+    """Вимірює один виклик етапу в поточному запуску
+
+    Args:
+        name (str): Назва етапу
+
+    Yields:
+        _StageScope: Дані виклику; виняток всередині блоку позначає виклик як помилковий
+    """
+    recorder = _current_run.get()
+    if recorder is None:
+        yield None
+        return
+
+    scope = _StageScope()
+    token = _current_stage.set(scope)
+    started = time.perf_counter()
+    try:
+        yield scope
+    except BaseException:
+        scope.failed = True
+        raise
+    finally:
+        _current_stage.reset(token)
+        recorder.observe(name, time.perf_counter() - started, scope.failed, scope.bytes, scope.items)
+
+
+def timed_stage(name, items=None, check=None):
+    """Декоратор етапу
+
+    Args:
+        name (str): Назва етапу
+        items (callable, optional): Кількість елементів за результатом функції. Defaults to None.
+        check (callable, optional): Чи успішний виклик за результатом функції. Defaults to None.
+
+    Returns:
+        callable: Декоратор
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name) as scope:
+                result = func(*args, **kwargs)
+                if scope is not None:
+                    if items is not None:
+                        scope.items += items(result)
+                    if check is not None and not check(result):
+                        scope.failed = True
+                return result
+        return wrapper
+    return decorator
+
+
+def stage_add(bytes=0, items=0):
+    """Додає байти та елементи до поточного виклику етапу (без етапу нічого не робить)"""
+    scope = _current_stage.get()
+    if scope is not None:
+        scope.bytes += bytes
+        scope.items += items
+
+
+def stage_failed():
+    """Позначає поточний виклик етапу як помилковий, коли функція перехоплює виняток сама"""
+    scope = _current_stage.get()
+    if scope is not None:
+        scope.failed = True
+
+
+def save_run(recorder, status="completed"):
+    """Зберігає підсумок запуску та додає його етапи до накопичених метрик акаунту
+
+    Args:
+        recorder (RunRecorder): Запуск
+        status (str, optional): completed або failed. Defaults to "completed".
+    """
+    stages = recorder.summary()
+    with recorder._lock:
+        buckets = {name: list(stats.buckets) for name, stats in recorder.stages.items()}
+
+    with db_connection(recorder.account) as conn:
+        with conn:
+            conn.execute('''
+            INSERT OR REPLACE INTO runs (run_id, account, started_at, finished_at, seconds, status, stages)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (recorder.run_id, recorder.account, recorder.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+                  datetime.now().strftime("%Y-%m-%d %H:%M:%S"), round(recorder.seconds, 3), status,
+                  json.dumps(stages, ensure_ascii=False)))
+            conn.executemany('''
+            INSERT INTO stage_metrics (account, stage, calls, errors, seconds, bytes, items)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(account, stage) DO UPDATE SET
+                calls = calls + excluded.calls, errors = errors + excluded.errors,
+                seconds = seconds + excluded.seconds, bytes = bytes + excluded.bytes,
+                items = items + excluded.items
+            ''', [(recorder.account, name, entry["calls"], entry["errors"], entry["seconds"], entry["bytes"],
+                   entry["items"]) for name, entry in stages.items()])
+            conn.executemany('''
+            INSERT INTO stage_buckets (account, stage, le, count) VALUES (?, ?, ?, ?)
+            ON CONFLICT(account, stage, le) DO UPDATE SET count = count + excluded.count
+            ''', [(recorder.account, name, bound, count)
+                  for name, counts in buckets.items()
+                  for bound, count in zip(STAGE_BUCKETS, counts) if count])
+
+    logger.info(f"Метрики запуску {recorder.run_id} ({recorder.account}, {status}): "
+                + ", ".join(f"{name} {entry['seconds']:.1f} с/{entry['calls']}" for name, entry in stages.items()))
+
+
+def list_runs(account_username="default", limit=20):
+    """Повертає останні запуски акаунту з підсумком етапів
+
+    Args:
+        account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
+        limit (int, optional): Кількість запусків. Defaults to 20.
+
+    Returns:
+        list: Словники запусків від новіших до старших
+    """
+    with db_connection(account_username) as conn:
+        rows = conn.execute('''
+        SELECT run_id, account, started_at, finished_at, seconds, status, stages FROM runs
+        WHERE account = ? ORDER BY started_at DESC LIMIT ?
+        ''', (account_username, limit)).fetchall()
+    runs = []
+    for row in rows:
+        run = dict(row)
+        run["stages"] = json.loads(run["stages"] or "{}")
+        runs.append(run)
+    return runs
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def prometheus_text(accounts=None):
+    """Формує накопичені метрики етапів та запусків у текстовому форматі Prometheus
+
+    Args:
+        accounts (list, optional): Імена акаунтів. Defaults to None (усі акаунти).
+
+    Returns:
+        str: Текст для відповіді /metrics
+    """
+    stages = list(iter_federated("account, stage, calls, errors, seconds, bytes, items",
+                                 accounts=accounts, source="{alias}.stage_metrics"))
+    buckets = {}
+    for row in iter_federated("account, stage, le, count", accounts=accounts, source="{alias}.stage_buckets"):
+        key = (row["account"], row["stage"])
+        buckets.setdefault(key, {})
+        buckets[key][row["le"]] = buckets[key].get(row["le"], 0) + row["count"]
+    runs = list(iter_federated("account, status, COUNT(*) AS runs",
+                               accounts=accounts, group_by="account, status", source="{alias}.runs"))
+
+    duration = f"{METRIC_PREFIX}_stage_duration_seconds"
+    lines = [f"# HELP {duration} Тривалість викликів етапу",
+             f"# TYPE {duration} histogram"]
+    for row in stages:
+        counts = buckets.get((row["account"], row["stage"]), {})
+        cumulative = 0
+        for bound in STAGE_BUCKETS:
+            cumulative += counts.get(bound, 0)
+            lines.append(f"{duration}_bucket{_labels(account=row['account'], stage=row['stage'], le=bound)} {cumulative}")
+        lines.append(f"{duration}_bucket{_labels(account=row['account'], stage=row['stage'], le='+Inf')} {row['calls']}")
+        lines.append(f"{duration}_sum{_labels(account=row['account'], stage=row['stage'])} {row['seconds']:.3f}")
+        lines.append(f"{duration}_count{_labels(account=row['account'], stage=row['stage'])} {row['calls']}")
+
+    counters = [("errors", "Викликів етапу, що завершились помилкою"),
+                ("bytes", "Байт, оброблених етапом"),
+                ("items", "Елементів, оброблених етапом")]
+    for column, help_text in counters:
+        name = f"{METRIC_PREFIX}_stage_{column}_total"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        lines += [f"{name}{_labels(account=row['account'], stage=row['stage'])} {row[column]}" for row in stages]
+
+    name = f"{METRIC_PREFIX}_runs_total"
+    lines += [f"# HELP {name} Запусків скрапінгу акаунту за результатом", f"# TYPE {name} counter"]
+    lines += [f"{name}{_labels(account=row['account'], status=row['status'])} {row['runs']}" for row in runs]
+    return "\n".join(lines) + "\n"
@@ -12,21 +12,15 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from func.f_auch import init_selenium, login_to_instagram,save_page
+from func.f_auch import save_page
+from func.f_driver_pool import get_driver_pool
+from log_config import setup_logging
+from run_metrics import record_run
 # from func.f_time import random_sleep
 
 # Завантаження змінних середовища з .env файлу
 load_dotenv()
 
-# Налаштування логування
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("parser.log", encoding="utf-8")
-    ]
-)
 logger = logging.getLogger("InstagramBot")
 
 
@@ -37,64 +31,81 @@ HEADLESS = False
 # Ініціалізація файлу для зберігання ID надісланих оголошень
 SENT_IDS_FILE = "sent_ids.txt"
 
-def get_page_with_pagination(account_username="default"):
+def get_page_with_pagination(account_username="default", incremental=False, on_scroll=None):
     """Отримуємо сторінку Instagram для конкретного акаунту
     
     Args:
         account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
+        incremental (bool, optional): Зупиняти скрол, щойно на сторінці з'являться вже відомі пости. Defaults to False.
+        on_scroll (callable, optional): Викликається після кожного скролу; виняток з нього перериває скрапінг
+            (так черга завдань перевіряє скасування). Defaults to None.
+        
+    Returns:
+        bool: True, якщо обидві сторінки збережено, інакше None
     """
-    from accounts_config import get_account_config
-    from url_manager import get_urls
+    from accounts_config import get_account_config, get_page_file, get_capture_file
+    from url_manager import get_account_urls
+    from parser import load_known_media_keys
     
-    driver = None
     try:
         # Отримуємо конфігурацію акаунту (для імені в базі та місця зберігання зображень)
         account_config = get_account_config(account_username)
         
-        # Отримуємо URL з JSON файлу
-        url_dopys, url_reels = get_urls()
+        # Отримуємо URL з конфігурації акаунту або з JSON файлу
+        url_dopys, url_reels = get_account_urls(account_username)
         
         # Детальне логування URL для діагностики
-        logger.info(f"[ДЕБАГ] Отримано URL з JSON: url_posts='{url_dopys}', url_reels='{url_reels}'")
+        logger.info(f"[ДЕБАГ] Отримано URL: url_posts='{url_dopys}', url_reels='{url_reels}'")
         
         # Перевіряємо URL на коректність
         if not url_dopys or not url_reels:
-            logger.error(f"URL не налаштовано в JSON файлі. Перевірте налаштування.")
+            logger.error(f"URL не налаштовано ні для акаунту, ні в JSON файлі. Перевірте налаштування.")
             return None
         
         # Логуємо інформацію про URL, які будемо використовувати
         logger.info(f"Використовуємо URL з налаштувань: Posts={url_dopys}, Reels={url_reels}")
         logger.info(f"Скрапінг виконується для акаунту: {account_username} (зберігання в базу {account_config['database']})")
         
-        # Ініціалізуємо драйвер
-        driver = init_selenium()
-        
-        # Спочатку авторизуємось
-        auth_success = login_to_instagram(driver)
+        # В інкрементальному режимі скролимо лише до вже відомих постів
+        stop_keys = load_known_media_keys(account_username) if incremental else None
+        if incremental and not stop_keys:
+            logger.info("Відомих постів ще немає, виконуємо повний скрапінг")
         
-        if not auth_success:
-            logger.error("Не вдалося авторизуватися в Instagram. Припиняємо виконання.")
-            return None
+        # Беремо вже запущений та авторизований браузер з пулу
+        with get_driver_pool().session() as lease:
+            if lease is None:
+                logger.error("Не вдалося авторизуватися в Instagram. Припиняємо виконання.")
+                return None
+            driver = lease.driver
             
-        # Зберігаємо сторінку з дописами
-        logger.info(f"Зберігаємо сторінку з дописами для акаунту {account_username}...")
-        save_page(driver, url_dopys, is_posts=True, is_reels=False)
-        
-        # Додатковий час між завантаженнями
-        time.sleep(5)
-        
-        # Зберігаємо сторінку з reels
-        logger.info(f"Зберігаємо сторінку з reels для акаунту {account_username}...")
-        save_page(driver, url_reels, is_posts=False, is_reels=True)
+            # Зберігаємо сторінку з дописами
+            logger.info(f"Зберігаємо сторінку з дописами для акаунту {account_username}...")
+            if not save_page(driver, url_dopys, is_posts=True, is_reels=False, stop_keys=stop_keys,
+                             filename=get_page_file(account_username, "posts"),
+                             capture_file=get_capture_file(account_username, "posts"), on_scroll=on_scroll):
+                logger.error(f"Не вдалося зберегти сторінку з дописами для акаунту {account_username}")
+                return None
+            lease.page_done()
+            
+            # Додатковий час між завантаженнями
+            time.sleep(5)
+            
+            # Зберігаємо сторінку з reels
+            logger.info(f"Зберігаємо сторінку з reels для акаунту {account_username}...")
+            if not save_page(driver, url_reels, is_posts=False, is_reels=True, stop_keys=stop_keys,
+                             filename=get_page_file(account_username, "reels"),
+                             capture_file=get_capture_file(account_username, "reels"), on_scroll=on_scroll):
+                logger.error(f"Не вдалося зберегти сторінку з reels для акаунту {account_username}")
+                return None
+            lease.page_done()
         
         logger.info("Усі сторінки успішно збережено")
+        return True
         
     except Exception as e:
         logger.error(f"Помилка під час отримання сторінки: {e}")
-    
-    finally:
-        if driver:
-            driver.quit()
 
 if __name__ == "__main__":
-    get_page_with_pagination()
\ No newline at end of file
+    setup_logging("parser.log")
+    with record_run("default"):
+        get_page_with_pagination()
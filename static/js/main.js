@@ -33,114 +33,93 @@ document.addEventListener('DOMContentLoaded', function() {
     // Запускаємо обробник при завантаженні сторінки
     handleImageErrors();
 
-    // Функція для оновлення статусу скрапінгу
-    function updateScrapingStatus() {
+    // Стан скрапінгу та логи приходять подіями сервера (/events) замість опитування
+    const STATUS_VIEW = {
+        running: ['Виконується', 'bg-warning', 'alert-warning'],
+        completed: ['Завершено', 'bg-success', 'alert-success'],
+        error: ['Помилка', 'bg-danger', 'alert-danger'],
+        cancelled: ['Скасовано', 'bg-secondary', 'alert-info']
+    };
+    const MAX_LOG_LINES = 200;
+
+    function applyScrapingStatus(data) {
         const statusBadge = document.getElementById('status-badge');
         const statusMessage = document.getElementById('status-message');
         const progressBar = document.getElementById('progress-bar');
-        
-        if (!statusBadge || !statusMessage) {
-            return;
+
+        const [statusText, badgeClass, alertClass] = STATUS_VIEW[data.status] || ['Очікування', 'bg-secondary', 'alert-info'];
+        statusBadge.textContent = data.state === 'queued' ? 'В черзі' : statusText;
+        statusBadge.className = 'badge ' + badgeClass;
+        statusMessage.textContent = data.message;
+        statusMessage.className = 'alert ' + alertClass;
+
+        if (progressBar) {
+            progressBar.style.width = data.progress + '%';
+        }
+
+        const duplicatesCount = document.getElementById('duplicates-count');
+        if (duplicatesCount && data.duplicates_skipped !== undefined) {
+            duplicatesCount.textContent = data.duplicates_skipped;
         }
-        
-        fetch('/status')
-            .then(response => response.json())
-            .then(data => {
-                // Оновлення тексту статусу
-                let statusText = 'Очікування';
-                let badgeClass = 'bg-secondary';
-                let alertClass = 'alert-info';
-                
-                if (data.status === 'running') {
-                    statusText = 'Виконується';
-                    badgeClass = 'bg-warning';
-                    alertClass = 'alert-warning';
-                } else if (data.status === 'completed') {
-                    statusText = 'Завершено';
-                    badgeClass = 'bg-success';
-                    alertClass = 'alert-success';
-                } else if (data.status === 'error') {
-                    statusText = 'Помилка';
-                    badgeClass = 'bg-danger';
-                    alertClass = 'alert-danger';
-                }
-                
-                // Оновлення класів та тексту елементів
-                statusBadge.textContent = statusText;
-                statusBadge.className = 'badge ' + badgeClass;
-                
-                statusMessage.textContent = data.message;
-                statusMessage.className = 'alert ' + alertClass;
-                
-                // Оновлення прогрес-бару, якщо він існує
-                if (progressBar) {
-                    progressBar.style.width = data.progress + '%';
-                }
-                
-                // Оновлення логів, якщо контейнер існує
-                const logContainer = document.getElementById('log-content');
-                if (logContainer) {
-                    // Отримуємо логи з сервера
-                    fetch('/get_logs')
-                        .then(response => response.json())
-                        .then(logData => {
-                            if (logData.logs && logData.logs.length > 0) {
-                                // Форматуємо логи з кольорами
-                                const formattedLogs = logData.logs.map(log => {
-                                    let logClass = 'text-light';
-                                    if (log.includes('INFO')) logClass = 'text-info';
-                                    if (log.includes('WARNING')) logClass = 'text-warning';
-                                    if (log.includes('ERROR')) logClass = 'text-danger';
-                                    if (log.includes('дублікат')) logClass = 'text-warning';
-                                    
-                                    return `<div class="${logClass}">${log}</div>`;
-                                }).join('');
-                                
-                                logContainer.innerHTML = formattedLogs;
-                                
-                                // Прокручуємо до останнього запису
-                                const logContainerParent = document.getElementById('log-container');
-                                if (logContainerParent) {
-                                    logContainerParent.scrollTop = logContainerParent.scrollHeight;
-                                }
-                            }
-                        })
-                        .catch(error => console.error('Помилка при отриманні логів:', error));
-                }
-                
-                // Оновлення лічильника дублікатів
-                const duplicatesCount = document.getElementById('duplicates-count');
-                if (duplicatesCount && data.duplicates_skipped !== undefined) {
-                    duplicatesCount.textContent = data.duplicates_skipped;
-                }
-                
-                // Якщо процес завершився, перезавантажуємо сторінку
-                if (data.is_running === false && data.status !== 'idle') {
-                    setTimeout(() => {
-                        location.reload();
-                    }, 3000);
-                }
-                
-                // Зберігаємо поточний статус
-                statusBadge.dataset.running = (data.status === 'running').toString();
-                
-                // Продовжуємо оновлювати, якщо процес все ще виконується
-                if (data.is_running) {
-                    setTimeout(updateScrapingStatus, 2000);
-                }
-            })
-            .catch(error => {
-                console.error('Помилка при оновленні статусу:', error);
-                setTimeout(updateScrapingStatus, 5000);
-            });
     }
-    
-    // Оновлення статусу кожні 3 секунди, якщо ми на головній сторінці
-    if (window.location.pathname === '/' || window.location.pathname === '/index') {
-        const statusBadge = document.getElementById('status-badge');
-        if (statusBadge && statusBadge.textContent.trim() === 'Виконується') {
-            setInterval(updateScrapingStatus, 3000);
+
+    function applyAccountsStatus(data) {
+        for (const [name, entry] of Object.entries(data.accounts || {})) {
+            const row = document.querySelector('#accounts-status tr[data-account="' + name + '"]');
+            if (row) {
+                row.querySelector('.account-status').textContent = entry.status;
+                row.querySelector('.account-progress').textContent = entry.progress + '%';
+                row.querySelector('.account-message').textContent = entry.message;
+            }
+        }
+    }
+
+    function appendLogLine(record) {
+        const logContent = document.getElementById('log-content');
+        if (!logContent) {
+            return;
         }
+
+        let logClass = 'text-light';
+        if (record.level === 'INFO') logClass = 'text-info';
+        if (record.level === 'WARNING' || record.message.includes('дублікат')) logClass = 'text-warning';
+        if (record.level === 'ERROR' || record.level === 'CRITICAL') logClass = 'text-danger';
+
+        const line = document.createElement('div');
+        line.className = logClass;
+        line.textContent = record.line;
+        logContent.appendChild(line);
+        while (logContent.childElementCount > MAX_LOG_LINES) {
+            logContent.removeChild(logContent.firstElementChild);
+        }
+
+        const logContainer = document.getElementById('log-container');
+        if (logContainer) {
+            logContainer.scrollTop = logContainer.scrollHeight;
+        }
+    }
+
+    if (document.getElementById('status-badge') && window.EventSource) {
+        const source = new EventSource('/events');
+        // Стан на момент завантаження сторінки: після його зміни сторінку перезавантажуємо
+        let wasRunning = null;
+
+        source.addEventListener('status', function(event) {
+            const data = JSON.parse(event.data);
+            applyScrapingStatus(data.scraping);
+            applyAccountsStatus(data.accounts);
+
+            const running = data.scraping.is_running || data.accounts.is_running;
+            if (wasRunning !== null && wasRunning !== running) {
+                source.close();
+                setTimeout(() => location.reload(), 1500);
+            }
+            wasRunning = running;
+        });
+
+        source.addEventListener('log', function(event) {
+            appendLogLine(JSON.parse(event.data));
+        });
     }
     
     // Обробка помилок завантаження зображень
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Мініатюри WebP для сітки постів
+
+Після завантаження зображень парсером для кожного з них створюються похідні
+WebP фіксованих розмірів (THUMBNAIL_WIDTHS) у підкаталозі thumbs/ поруч з
+оригіналом. Сторінка постів віддає мініатюри через srcset замість оригіналів
+повного розміру, а файли HEIC, які більшість браузерів не показує, стають
+видимими після конвертації.
+
+Декодування та масштабування виконуються в пулі процесів, тому не блокуються
+GIL і займають усі ядра. Для JPEG використовується зменшене декодування
+(Image.draft), тому повне зображення в пам'ять не розпаковується.
+
+Потрібен Pillow; для справжніх файлів HEIC - pillow-heif. Без Pillow етап
+мініатюр пропускається, а сторінка показує оригінали.
+
+Приклад використання:
+```bash
+python thumbnails.py                        # мініатюри для всіх зображень акаунтів
+python thumbnails.py --account dliavsikhta
+```
+"""
+
+import os
+import logging
+import argparse
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+try:
+    import pillow_heif
+except ImportError:
+    pillow_heif = None
+
+from accounts_config import get_account_config, get_all_accounts
+from log_config import setup_logging
+
+logger = logging.getLogger("Thumbnails")
+
+# Налаштування мініатюр (можна перевизначити через .env)
+THUMBNAILS_ENABLED = os.getenv("THUMBNAILS_ENABLED", "True").lower() == "true"
+THUMBNAIL_WIDTHS = [int(width) for width in os.getenv("THUMBNAIL_WIDTHS", "320,640").split(",")]
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", str(os.cpu_count() or 2)))
+THUMBNAIL_DIR_NAME = "thumbs"
+
+BASE_IMAGE_DIR = Path("static/img")
+
+# Розширення зображень, для яких створюються мініатюри (відео пропускаються)
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".heic", ".heif"}
+
+
+def thumbnail_path(local_path, width):
+    """Повертає шлях до мініатюри зображення заданої ширини
+
+    Args:
+        local_path (str): Шлях до оригіналу, як він збережений у базі
+        width (int): Ширина мініатюри в пікселях
+
+    Returns:
+        str: Шлях до файлу .webp у підкаталозі thumbs/
+    """
+    path = Path(local_path)
+    return (path.parent / THUMBNAIL_DIR_NAME / f"{path.stem}_{width}.webp").as_posix()
+
+
+def get_thumbnails(local_path):
+    """Повертає наявні мініатюри зображення
+
+    Args:
+        local_path (str): Шлях до оригіналу
+
+    Returns:
+        list: Пари (ширина, шлях) від меншої до більшої; порожній список, якщо мініатюр немає
+    """
+    if not local_path:
+        return []
+    thumbnails = []
+    for width in sorted(THUMBNAIL_WIDTHS):
+        path = thumbnail_path(local_path, width)
+        if os.path.exists(path):
+            thumbnails.append((width, path))
+    return thumbnails
+
+
+def _init_worker():
+    if pillow_heif is not None:
+        pillow_heif.register_heif_opener()
+
+
+def _make_thumbnails(local_path, widths, quality):
+    """Створює мініатюри одного зображення (виконується в процесі пулу)
+
+    Returns:
+        int: Кількість створених файлів
+    """
+    targets = [(width, thumbnail_path(local_path, width)) for width in widths]
+    source_mtime = os.path.getmtime(local_path)
+    targets = [(width, path) for width, path in targets
+               if not os.path.exists(path) or os.path.getmtime(path) < source_mtime]
+    if not targets:
+        return 0
+
+    os.makedirs(os.path.dirname(targets[0][1]), exist_ok=True)
+    with Image.open(local_path) as image:
+        largest = max(width for width, _ in targets)
+        # Для JPEG декодер одразу зменшує зображення в 2/4/8 разів
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        for width, path in sorted(targets, reverse=True):
+            if image.width > width:
+                image.thumbnail((width, width * image.height // image.width), Image.LANCZOS)
+            temp_path = f"{path}.tmp"
+            image.save(temp_path, "WEBP", quality=quality, method=4)
+            os.replace(temp_path, path)
+    return len(targets)
+
+
+def generate_thumbnails(paths, max_workers=None):
+    """Створює мініатюри для списку зображень у пулі процесів
+
+    Наявні мініатюри, новіші за оригінал, не перераховуються.
+
+    Args:
+        paths (list): Шляхи до оригіналів зображень
+        max_workers (int, optional): Кількість процесів. Defaults to THUMBNAIL_WORKERS.
+
+    Returns:
+        int: Кількість створених файлів мініатюр
+    """
+    if not THUMBNAILS_ENABLED:
+        return 0
+    if Image is None:
+        logger.warning("Pillow не встановлено, мініатюри не створюються")
+        return 0
+
+    paths = [path for path in dict.fromkeys(paths)
+             if path and os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS and os.path.exists(path)]
+    if not paths:
+        return 0
+
+    created = 0
+    workers = min(max_workers or THUMBNAIL_WORKERS, len(paths))
+    logger.info(f"Створення мініатюр для {len(paths)} зображень ({workers} процесів)")
+    # spawn: процес парсера має робочі потоки (браузери, пули з'єднань), fork з ними небезпечний
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as executor:
+        futures = {
+            path: executor.submit(_make_thumbnails, path, THUMBNAIL_WIDTHS, THUMBNAIL_QUALITY)
+            for path in paths
+        }
+        for path, future in futures.items():
+            try:
+                created += future.result()
+            except Exception as e:
+                logger.error(f"Помилка при створенні мініатюри для {path}: {str(e)}")
+
+    logger.info(f"Створено {created} мініатюр")
+    return created
+
+
+def generate_account_thumbnails(account_username="default", max_workers=None):
+    """Створює мініатюри для всіх зображень у папці акаунту
+
+    Args:
+        account_username (str, optional): Ім'я акаунту Instagram. Defaults to "default".
+        max_workers (int, optional): Кількість процесів. Defaults to THUMBNAIL_WORKERS.
+
+    Returns:
+        int: Кількість створених файлів мініатюр
+    """
+    images_dir = BASE_IMAGE_DIR / get_account_config(account_username)["images_folder"]
+    if not images_dir.is_dir():
+        return 0
+    paths = sorted(path.as_posix() for path in images_dir.iterdir() if path.is_file())
+    return generate_thumbnails(paths, max_workers)
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description="Створення мініатюр WebP для зображень постів")
+    args_parser.add_argument("--account", help="Ім'я акаунту (за замовчуванням усі)")
+    args_parser.add_argument("--workers", type=int, help="Кількість процесів")
+    args = args_parser.parse_args()
+
+    accounts = [args.account] if args.account else [account["username"] for account in get_all_accounts()]
+    for account_username in accounts:
+        created = generate_account_thumbnails(account_username, args.workers)
+        logger.info(f"{account_username}: створено {created} мініатюр")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    main()
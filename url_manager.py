@@ -96,3 +96,22 @@ def set_urls(url_posts, url_reels):
     config["url_posts"] = url_posts
     config["url_reels"] = url_reels
     save_url_config(config)
+
+def get_account_urls(account_username):
+    """Отримує URL для постів та reels конкретного акаунту
+    
+    Використовує URL з accounts_config.py, якщо вони там задані,
+    інакше - URL з JSON файлу.
+    
+    Args:
+        account_username (str): Ім'я акаунту Instagram
+        
+    Returns:
+        tuple: Кортеж (url_posts, url_reels) - адреси для скрапінгу постів та reels
+    """
+    from accounts_config import get_account_config
+    
+    account_config = get_account_config(account_username)
+    if account_config.get("url_posts") and account_config.get("url_reels"):
+        return account_config["url_posts"], account_config["url_reels"]
+    return get_urls()
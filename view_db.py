@@ -1,14 +1,7 @@
 import sqlite3
 import logging
+from log_config import setup_logging
 
-# Налаштування логування
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("DBViewer")
 
 def connect_db():
@@ -60,4 +53,5 @@ def main():
         logger.error("Не вдалося підключитися до бази даних")
 
 if __name__ == "__main__":
+    setup_logging()
     main()